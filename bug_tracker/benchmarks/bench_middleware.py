@@ -0,0 +1,115 @@
+"""Measure the per-request overhead of ServiceCheckMiddleware on a no-op route.
+
+Calls the ASGI app directly (no sockets, no HTTP client) so the numbers are
+the middleware cost alone. Compares no middleware, the previous
+``BaseHTTPMiddleware`` implementation and the current pure-ASGI one:
+
+    python -m bug_tracker.benchmarks.bench_middleware
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException, Request
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from bug_tracker.middleware.service_check import ServiceCheckMiddleware
+from bug_tracker.utils.service_health import service_health
+
+
+class BaseHTTPServiceCheckMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in ["/health", "/services/status"]:
+            return await call_next(request)
+        try:
+            service_health.raise_if_service_unavailable("bug_tracker")
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+        return await call_next(request)
+
+
+async def noop(request):
+    return PlainTextResponse("ok")
+
+
+def build_app(middleware_class=None):
+    app = Starlette(routes=[Route("/noop", noop)])
+    if middleware_class is not None:
+        app.add_middleware(middleware_class)
+    return app
+
+
+async def time_requests(app, requests: int) -> float:
+    """Run ``requests`` GET /noop calls through the app and return microseconds per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/noop",
+        "raw_path": b"/noop",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    def make_receive():
+        # Like a real server: the request body once, then block until the client disconnects
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    # Warm up
+    for _ in range(min(requests, 1000)):
+        await app(dict(scope), make_receive(), send)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def run(requests: int):
+    service_health.service_status["bug_tracker"] = True
+    results = {}
+    for name, middleware_class in (
+        ("none", None),
+        ("BaseHTTPMiddleware", BaseHTTPServiceCheckMiddleware),
+        ("pure ASGI", ServiceCheckMiddleware),
+    ):
+        results[name] = await time_requests(build_app(middleware_class), requests)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests))
+    baseline = results["none"]
+    print(f"{'middleware':>20} {'us/request':>12} {'overhead us':>12}")
+    for name, per_request in results.items():
+        print(f"{name:>20} {per_request:>12.1f} {per_request - baseline:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
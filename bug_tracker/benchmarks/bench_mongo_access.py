@@ -0,0 +1,102 @@
+"""Compare blocking pymongo access with the async repository inside async handlers.
+
+Boots a small FastAPI app in-process with two routes that read the same bug:
+one through a blocking ``MongoClient`` (the old behaviour) and one through
+``BugTrackerRepository`` (Motor). Each route is driven at several concurrency
+levels and the throughput is printed side by side.
+
+Requires a running MongoDB:
+
+    MONGODB_URL=mongodb://localhost:27017 python -m bug_tracker.benchmarks.bench_mongo_access
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from pymongo import MongoClient
+
+from bug_tracker.utils.repository import BugTrackerRepository
+
+BENCH_DB_NAME = "bugtracker_bench_db"
+BENCH_BUG_ID = "bench-bug"
+
+
+def build_app(mongodb_url: str, repository: BugTrackerRepository) -> FastAPI:
+    app = FastAPI()
+    blocking_bugs = MongoClient(mongodb_url)[BENCH_DB_NAME]["bug_collection"]
+
+    @app.get("/blocking/{bug_id}")
+    async def read_blocking(bug_id: str):
+        bug = blocking_bugs.find_one({"bug_id": bug_id})
+        return {"found": bug is not None}
+
+    @app.get("/async/{bug_id}")
+    async def read_async(bug_id: str):
+        bug = await repository.find_bug(bug_id)
+        return {"found": bug is not None}
+
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> float:
+    """Send ``total`` requests with at most ``concurrency`` in flight and return requests/sec."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def run(mongodb_url: str, levels: List[int], requests_per_level: int) -> Dict[int, Dict[str, float]]:
+    repository = BugTrackerRepository()
+    repository.connect(mongodb_url, BENCH_DB_NAME)
+    await repository.bugs.delete_many({})
+    await repository.insert_bug({
+        "bug_id": BENCH_BUG_ID,
+        "title": "Benchmark bug",
+        "description": "Used by bench_mongo_access",
+        "status": "Pending"
+    })
+
+    app = build_app(mongodb_url, repository)
+    results: Dict[int, Dict[str, float]] = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for concurrency in levels:
+                total = max(requests_per_level, concurrency)
+                results[concurrency] = {
+                    "blocking": await drive(client, f"/blocking/{BENCH_BUG_ID}", concurrency, total),
+                    "async": await drive(client, f"/async/{BENCH_BUG_ID}", concurrency, total),
+                }
+    finally:
+        await repository.client.drop_database(BENCH_DB_NAME)
+        repository.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongodb-url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.mongodb_url, args.concurrency, args.requests))
+
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14} {'speedup':>8}")
+    for concurrency, result in results.items():
+        speedup = result["async"] / result["blocking"] if result["blocking"] else float("inf")
+        print(f"{concurrency:>12} {result['blocking']:>16.1f} {result['async']:>14.1f} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
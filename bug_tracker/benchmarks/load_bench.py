@@ -0,0 +1,265 @@
+"""Load benchmark of the bug_tracker write and read paths.
+
+Boots the real application in-process (startup hooks, middleware, outbox
+worker) against mongomock or a local MongoDB, with a stub calendar/forum
+server on a local port whose latency and failure rate are configurable. The
+create, assign, update and list workloads are each driven at a fixed
+concurrency, and the results are written as JSON:
+
+    python -m bug_tracker.benchmarks.load_bench --output results.json
+    python -m bug_tracker.benchmarks.load_bench --baseline results.json
+
+With ``--baseline`` the report also contains the relative change of every
+number against the saved run. Without ``--mongodb-url`` the app runs on
+``mongomock_motor`` (``pip install mongomock-motor``), which measures the
+application code rather than the database.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import math
+import os
+import random
+import socket
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+BENCH_DB_NAME = "bugtracker_bench_db"
+BENCH_EMPLOYEE_ID = "bench-employee"
+WORKLOADS = ("create", "assign", "update", "list")
+
+
+def build_stub_app(latency: float, failure_rate: float, seed: int) -> Starlette:
+    """Calendar and forum endpoints used by bug_tracker, answering after ``latency`` seconds."""
+    rng = random.Random(seed)
+
+    async def respond(request: Request):
+        await asyncio.sleep(latency)
+        if rng.random() < failure_rate:
+            return JSONResponse({"detail": "stub failure"}, status_code=503)
+        return JSONResponse({"ok": True}, status_code=201 if request.method == "POST" else 200)
+
+    async def health(request: Request):
+        return JSONResponse({"status": "healthy"})
+
+    return Starlette(routes=[
+        Route("/api", health),
+        Route("/health", health),
+        Route("/api/events", respond, methods=["POST"]),
+        Route("/api/events/by-reference/{reference_id}", respond, methods=["PUT"]),
+        Route("/topics/", respond, methods=["POST"]),
+    ])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def stub_server(latency: float, failure_rate: float, seed: int):
+    """Serve the stub app on a free local port and yield its base URL."""
+    port = free_port()
+    config = uvicorn.Config(build_stub_app(latency, failure_rate, seed), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    # Keep Ctrl-C for the benchmark itself
+    server.install_signal_handlers = lambda: None
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Awaitable[httpx.Response]],
+    concurrency: int,
+    total: int
+) -> Dict[str, Any]:
+    """Run ``total`` requests with exactly ``concurrency`` workers and summarize their latencies."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await make_request(index)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def wait_for_outbox(repository, timeout: float) -> Dict[str, Any]:
+    """Time how long the outbox worker takes to deliver the calendar events queued by the create workload."""
+    started = time.perf_counter()
+    counts = await repository.outbox_counts()
+    while counts["pending"] and time.perf_counter() - started < timeout:
+        await asyncio.sleep(0.05)
+        counts = await repository.outbox_counts()
+    return {
+        "drained": counts["pending"] == 0,
+        "seconds": round(time.perf_counter() - started, 3),
+        "pending": counts["pending"],
+        "dead_lettered": counts["dead_lettered"],
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    async with stub_server(args.stub_latency_ms / 1000, args.stub_failure_rate, args.seed) as stub_url:
+        # main reads its configuration at import time
+        os.environ["CALENDAR_SERVICE_URL"] = stub_url
+        os.environ["FORUM_SERVICE_URL"] = stub_url
+        if args.mongodb_url:
+            os.environ["MONGODB_URL"] = args.mongodb_url
+        from bug_tracker import main
+        from bug_tracker.utils.repository import repository
+        from bug_tracker.utils.service_health import service_health
+
+        if not args.mongodb_url:
+            from mongomock_motor import AsyncMongoMockClient
+            repository.connect = functools.partial(repository.connect, client=AsyncMongoMockClient())
+        # Never touch the service's real database
+        main.MONGODB_DB_NAME = BENCH_DB_NAME
+        # bug_tracker's own status is normally set by the first /services/status call
+        service_health.service_status["bug_tracker"] = True
+
+        await main.app.router.startup()
+        try:
+            if args.mongodb_url:
+                for collection in await repository.db.list_collection_names():
+                    await repository.db[collection].delete_many({})
+            await repository.insert_employee({"employee_id": BENCH_EMPLOYEE_ID, "name": "Bench", "bugs_completed": 0, "bugs_pending": 0})
+
+            total = args.requests
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=None) as client:
+                requests = {
+                    "create": lambda i: client.post("/client/bugs/create", json={
+                        "bug_id": f"bench-{i}",
+                        "title": f"Benchmark bug {i}",
+                        "description": "Created by the load benchmark"
+                    }),
+                    # Assign and update each touch a different bug created above
+                    "assign": lambda i: client.post("/manager/bugs/assign", params={
+                        "bug_id": f"bench-{i}", "employee_id": BENCH_EMPLOYEE_ID
+                    }),
+                    "update": lambda i: client.post(f"/employee/{BENCH_EMPLOYEE_ID}/bugs/update", params={
+                        "bug_id": f"bench-{i}", "status": "In Progress"
+                    }),
+                    "list": lambda i: client.get("/manager/bugs", params={"limit": args.list_limit}),
+                }
+                results: Dict[str, Any] = {}
+                for workload in WORKLOADS:
+                    results[workload] = await drive(client, requests[workload], args.concurrency, total)
+                    if workload == "create":
+                        results["outbox_drain"] = await wait_for_outbox(repository, args.drain_timeout)
+        finally:
+            if args.mongodb_url:
+                await repository.client.drop_database(BENCH_DB_NAME)
+            await main.app.router.shutdown()
+
+    return {
+        "config": {
+            "mongodb": args.mongodb_url or "mongomock",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "stub_latency_ms": args.stub_latency_ms,
+            "stub_failure_rate": args.stub_failure_rate,
+        },
+        "results": results,
+    }
+
+
+def diff(current: Any, baseline: Any) -> Optional[Any]:
+    """Relative change (current / baseline - 1) of every number present in both reports."""
+    if isinstance(current, dict) and isinstance(baseline, dict):
+        changes = {key: diff(value, baseline[key]) for key, value in current.items() if key in baseline}
+        return {key: change for key, change in changes.items() if change is not None} or None
+    if isinstance(current, (int, float)) and isinstance(baseline, (int, float)) and not isinstance(current, bool):
+        return round(current / baseline - 1, 4) if baseline else None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongodb-url", default=None, help="Use this MongoDB instead of mongomock")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per workload")
+    parser.add_argument("--list-limit", type=int, default=50, help="Page size of the list workload")
+    parser.add_argument("--stub-latency-ms", type=float, default=20.0, help="Response latency of the stub calendar/forum server")
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0, help="Share of stub responses that are 503s")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="Seconds to wait for the outbox to drain after the create workload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Saved JSON report to compare against")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    # main resolves static files relative to the service directory
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # The app logs to stdout; keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            report["change_vs_baseline"] = diff(report["results"], json.load(f)["results"])
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,126 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header
+from fastapi.responses import StreamingResponse, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-from pymongo import MongoClient
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional, Dict
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import uvicorn
 import os
-import requests
-from datetime import datetime, timedelta
+import json
+import csv
+import io
+import httpx
+import logging
+from datetime import datetime
 from bug_tracker.utils.service_health import service_health
+from bug_tracker.utils.circuit_breaker import CircuitOpenError
+from bug_tracker.utils.repository import repository, DUPLICATE_KEY_ERROR
+from bug_tracker.utils.http_client import http_client
+from bug_tracker.utils.service_prober import ServiceProber
+from bug_tracker.utils.outbox import OutboxWorker
+from bug_tracker.utils.pagination import PageParams, page_response
+from bug_tracker.utils import indexes
+from bug_tracker.utils.rollups import WorkloadRollups
+from bug_tracker.utils.sla import SLAScheduler, DEFAULT_PRIORITY, PRIORITY_DEADLINES, deadline_for
+from bug_tracker.utils import bug_states
+from bug_tracker.utils.search import BugSearch
+from bug_tracker.utils.idempotency import IdempotencyStore
+from bug_tracker.utils.response_cache import ResponseCache
+from bug_tracker.utils.bug_events import BugEventFeed, CREATED, ASSIGNED, STATUS_CHANGED, OVERDUE
 from bug_tracker.middleware.service_check import ServiceCheckMiddleware
+from bug_tracker.middleware.metrics import MetricsMiddleware
+from bug_tracker.utils import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 # Add middleware
 app.add_middleware(ServiceCheckMiddleware)
+app.add_middleware(MetricsMiddleware, routes=app.routes)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # MongoDB setup
 mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-client = MongoClient(mongodb_url)
-db = client["bugtracker_db"]  # Use a specific DB
+MONGODB_DB_NAME = "bugtracker_db"  # Use a specific DB
 
 # Service URLs
 CALENDAR_SERVICE_URL = os.getenv("CALENDAR_SERVICE_URL", "http://localhost:5000")
 FORUM_SERVICE_URL = os.getenv("FORUM_SERVICE_URL", "http://localhost:8004")
 
+# Startup / shutdown
+@app.on_event("startup")
+async def startup_event():
+    repository.connect(mongodb_url, MONGODB_DB_NAME)
+    await repository.detect_capabilities()
+    await indexes.ensure_indexes(repository.db)
+    await bug_search.start()
+    await bug_events.start()
+    await http_client.start()
+    await metrics.event_loop_lag_monitor.start()
+    service_prober.register("calendar", lambda: check_service_availability("calendar", CALENDAR_SERVICE_URL))
+    service_prober.register("forum", lambda: check_service_availability("forum", FORUM_SERVICE_URL))
+    await service_prober.start()
+    outbox_worker.register(CALENDAR_CREATE_EVENT, create_calendar_event)
+    outbox_worker.register(CALENDAR_UPDATE_STATUS, update_calendar_status)
+    await outbox_worker.start()
+    await workload_rollups.start()
+    sla_scheduler.on_overdue(publish_overdue)
+    await sla_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await service_prober.stop()
+    await outbox_worker.stop()
+    await workload_rollups.stop()
+    await sla_scheduler.stop()
+    repository.close()
+    # Bounded by HTTP_CLOSE_TIMEOUT, so a stuck connection can't hold up shutdown
+    await http_client.close()
+    await metrics.event_loop_lag_monitor.stop()
+
 # Service status tracking
 service_status: Dict[str, bool] = {
     "calendar": True,
     "forum": True
 }
 
+# Refreshed in the background; request handlers only read the cached status
+service_prober = ServiceProber(service_status)
+
+# Outbound events are written to the outbox and delivered by a background worker
+CALENDAR_CREATE_EVENT = "calendar.create_event"
+CALENDAR_UPDATE_STATUS = "calendar.update_status"
+outbox_worker = OutboxWorker(repository)
+
+# Per-employee bug counts, updated on every transition and reconciled periodically
+workload_rollups = WorkloadRollups(repository)
+
+# Full-text search over bug titles and descriptions
+bug_search = BugSearch(repository)
+
+# Live feed of bug changes served at /bugs/events
+bug_events = BugEventFeed(repository)
+
+# Deadlines of open bugs; escalates the ones that miss them
+sla_scheduler = SLAScheduler(repository)
+
+# ETags and rendered bodies of the list endpoints, keyed by collection version
+response_cache = ResponseCache(repository)
+
+# Stored responses of /client/bugs/create, keyed by the Idempotency-Key header
+idempotency = IdempotencyStore(repository)
+
 # Helper to get service URL
 def get_service_url(service_name: str, default_url: str) -> str:
     env_url = os.getenv(f"{service_name.upper()}_SERVICE_URL", default_url)
-    print(f"Using {service_name} service URL: {env_url}")
+    logger.info(f"Using {service_name} service URL: {env_url}")
     return env_url
 
 # Helper to check service availability
@@ -46,35 +129,34 @@ async def check_service_availability(service_name: str, service_url: str) -> boo
         if service_name == "calendar":
             # For calendar service, check the root endpoint
             url = f"{service_url}/api"
-            print(f"Checking calendar service at: {url}")
-            response = requests.get(url, timeout=5)
-            print(f"Calendar service check - Status: {response.status_code}, URL: {url}")
+            logger.debug(f"Checking calendar service at: {url}")
+            response = await service_health.request("calendar", "GET", url, timeout=5)
+            logger.debug(f"Calendar service check - Status: {response.status_code}, URL: {url}")
             return response.status_code == 200
         else:
             # For other services, check their health endpoints
-            response = requests.get(f"{service_url}/health", timeout=5)
+            response = await service_health.request(service_name, "GET", f"{service_url}/health", timeout=5)
             return response.status_code == 200
-    except (requests.exceptions.RequestException, requests.exceptions.Timeout) as e:
-        print(f"Error checking {service_name} service availability: {str(e)}")
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        logger.warning(f"Error checking {service_name} service availability: {str(e)}")
         return False
 
 # Helper to get service status message
 def get_service_status_message() -> str:
-    unavailable_services = [service for service, status in service_status.items() if not status]
+    unavailable_services = [service for service, status in service_prober.snapshot().items() if not status]
     if unavailable_services:
         return f"The following services are currently unavailable: {', '.join(unavailable_services)}"
     return "All services are available"
 
-employee_collection = db["employee_collection"]
-bug_collection = db["bug_collection"]
-manager_collection = db["manager_collection"]
-client_collection = db["client_collection"]
-
 # Helper to serialize ObjectId
 def serialize_doc(doc):
     doc["_id"] = str(doc["_id"])
     return doc
 
+async def bug_page(query: Optional[dict], page: PageParams) -> dict:
+    docs = await repository.list_bugs(query, page.limit, page.after, page.projection)
+    return page_response([serialize_doc(doc) for doc in docs], page.limit)
+
 # Pydantic models
 class Employee(BaseModel):
     employee_id: str
@@ -83,10 +165,11 @@ class Employee(BaseModel):
     bugs_pending: int = 0
 
 class Bug(BaseModel):
-    bug_id: str = Field(..., min_length=1, max_length=50, pattern="^[a-zA-Z0-9_-]+$")
+    bug_id: str = Field(..., min_length=1, max_length=50, regex="^[a-zA-Z0-9_-]+$")
     title: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1)
-    status: str = Field(default="Pending", pattern="^(Pending|In Progress|Completed)$")
+    status: str = Field(default="Pending", regex="^(Pending|In Progress|Completed)$")
+    priority: str = Field(default=DEFAULT_PRIORITY, regex=f"^({'|'.join(PRIORITY_DEADLINES)})$")
 
 class Manager(BaseModel):
     manager_id: str
@@ -109,95 +192,202 @@ async def health_check():
 
 @app.get("/services/status")
 async def check_services():
-    """Check the status of all dependent services."""
+    """Check the status of all dependent services and their circuit breakers."""
     status = await service_health.check_all_services()
-    return status
+    return {"services": status, "circuit_breakers": service_health.breaker_states()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request, MongoDB, outbound-call and event-loop metrics in the Prometheus text format."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/services/http-pool")
+async def http_pool_stats():
+    """Report saturation metrics of the shared outbound HTTP connection pool."""
+    return http_client.stats()
+
+@app.get("/admin/outbox")
+async def outbox_stats():
+    """Report pending and dead-lettered outbox events."""
+    counts = await repository.outbox_counts()
+    return {**counts, "worker": outbox_worker.stats()}
+
+@app.get("/admin/indexes")
+async def index_status():
+    """Report the result of the startup index bootstrap and the indexes currently present."""
+    return {
+        "bootstrap": indexes.last_report,
+        "indexes": await indexes.describe_indexes(repository.db)
+    }
 
 # --------------------- CLIENT ---------------------
 
-async def create_calendar_event_for_bug(bug: Bug):
-    """Create a calendar event for a new bug"""
-    calendar_url = get_service_url("calendar", "http://localhost:5000")
-    print(f"Checking calendar service at {calendar_url}")
-    service_status["calendar"] = await check_service_availability("calendar", calendar_url)
-    
-    if not service_status["calendar"]:
-        print("Calendar service is marked as unavailable")
-        raise HTTPException(status_code=503, detail="Calendar service is currently unavailable")
-
-    event_data = {
-        "title": f"Bug: {bug.title}",
-        "start": datetime.now().isoformat(),
-        "end": (datetime.now() + timedelta(days=7)).isoformat(),  # Default 7-day deadline
-        "desc": bug.description,
+def bug_document(bug: Bug) -> dict:
+    """The stored form of a new bug, with its creation time and priority-based deadline"""
+    document = bug.dict()
+    now = datetime.utcnow()
+    # MongoDB stores milliseconds; keep the in-memory deadline equal to the stored one
+    document["created_at"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    document["deadline"] = deadline_for(bug.priority, document["created_at"])
+    return document
+
+def build_calendar_event(bug: dict) -> dict:
+    """Build the calendar event payload for a new bug, ending at its deadline"""
+    return {
+        "title": f"Bug: {bug['title']}",
+        "start": bug["created_at"].isoformat(),
+        "end": bug["deadline"].isoformat(),
+        "desc": bug["description"],
         "allDay": False,
         "createdBy": "bug_tracker",
         "eventType": "bug",
-        "referenceId": bug.bug_id,
-        "status": bug.status,
-        "priority": "high"  # Default priority for bugs
+        "referenceId": bug["bug_id"],
+        "status": bug["status"],
+        "priority": bug["priority"]
     }
 
-    print(f"Attempting to create calendar event at {calendar_url}/api/events")
-    print(f"Event data: {event_data}")
+async def send_to_calendar(method: str, path: str, payload: dict, action: str) -> httpx.Response:
+    """Call the calendar service from an outbox handler. Raises so the outbox retries on failure."""
+    calendar_url = get_service_url("calendar", "http://localhost:5000")
+
+    if not service_prober.is_available("calendar"):
+        raise RuntimeError("Calendar service is currently unavailable")
 
     try:
-        response = requests.post(
-            f"{calendar_url}/api/events",
-            json=event_data,
+        response = await service_health.request(
+            "calendar",
+            method,
+            f"{calendar_url}{path}",
+            json=payload,
             headers={"Content-Type": "application/json"},
             timeout=5
         )
-        print(f"Calendar service response status: {response.status_code}")
-        print(f"Calendar service response text: {response.text}")
-        
-        # Any 2xx status code is considered successful
-        if 200 <= response.status_code < 300:
-            print(f"Calendar event created for bug {bug.bug_id}")
-            return response.json()
-        else:
-            print(f"Failed to create calendar event: {response.text}")
-            service_status["calendar"] = False
-            raise HTTPException(status_code=503, detail=f"Failed to create calendar event: {response.text}")
-    except requests.exceptions.RequestException as e:
-        print(f"Request exception while creating calendar event: {str(e)}")
-        service_status["calendar"] = False
-        raise HTTPException(status_code=503, detail=f"Failed to create calendar event: {str(e)}")
-    except Exception as e:
-        print(f"Unexpected exception while creating calendar event: {str(e)}")
-        service_status["calendar"] = False
-        raise HTTPException(status_code=503, detail=f"Failed to create calendar event: {str(e)}")
+    except CircuitOpenError as e:
+        raise RuntimeError(str(e))
+    except httpx.HTTPError as e:
+        service_prober.record("calendar", False)
+        raise RuntimeError(f"Failed to {action}: {str(e)}")
+
+    # Any 2xx status code is considered successful
+    if not 200 <= response.status_code < 300:
+        raise RuntimeError(f"Failed to {action}: {response.status_code} {response.text}")
+    return response
+
+async def create_calendar_event(event_data: dict):
+    """Outbox handler: create a calendar event."""
+    response = await send_to_calendar("POST", "/api/events", event_data, "create calendar event")
+    logger.info(f"Calendar event created for bug {event_data['referenceId']}")
+    return response.json()
+
+async def update_calendar_status(event_data: dict):
+    """Outbox handler: mirror a bug's status on its calendar event."""
+    await send_to_calendar(
+        "PUT",
+        f"/api/events/by-reference/{event_data['referenceId']}",
+        {"status": event_data["status"]},
+        "update calendar event status"
+    )
+    logger.info(f"Calendar event status updated for bug {event_data['referenceId']}")
+
+async def store_bug(bug: Bug) -> dict:
+    # Insert the bug and its calendar event into the outbox in one operation;
+    # the outbox worker delivers the event, so the calendar service is off the request path
+    document = bug_document(bug)
+    event = repository.new_outbox_event(CALENDAR_CREATE_EVENT, bug.bug_id, build_calendar_event(document))
+    try:
+        await repository.insert_bug_with_outbox(document, [event])
+    except DuplicateKeyError:
+        return {"message": "Bug already exists"}
+    bug_search.on_created(bug.dict())
+    # insert_one added the ObjectId to the dict
+    bug_events.publish(CREATED, {key: value for key, value in document.items() if key != "_id"})
+    # Like SLAScheduler.rebuild, only open bugs have a deadline to watch
+    if bug.status != bug_states.COMPLETED:
+        sla_scheduler.track(bug.bug_id, document["deadline"])
+    outbox_worker.notify()
+
+    return {
+        "message": "Bug created successfully, calendar event queued",
+        "service_status": service_prober.snapshot()
+    }
 
 @app.post("/client/bugs/create")
-async def create_bug(bug: Bug):
-    # Check service availability before proceeding
-    service_status["calendar"] = await check_service_availability("calendar", CALENDAR_SERVICE_URL)
-    service_status["forum"] = await check_service_availability("forum", FORUM_SERVICE_URL)
-    
-    # Insert bug into database
-    bug_collection.insert_one(bug.dict())
-    if not bug_collection.find_one({"bug_id": bug.bug_id}):
-        return {"message": "Bug creation failed"}
-    
-    # Try to create calendar event
+async def create_bug(bug: Bug, response: Response, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    if idempotency_key is None:
+        return await store_bug(bug)
+    # Retries with the same key get the first response back instead of creating the bug again
+    result, replayed = await idempotency.execute(
+        idempotency_key, idempotency.fingerprint(bug.dict()), lambda: store_bug(bug)
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def read_bulk_items(request: Request) -> list:
+    """Read a JSON array or an NDJSON body (one JSON object per line)"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
     try:
-        calendar_event = await create_calendar_event_for_bug(bug)
-        if calendar_event:  # If we got a response back, it was successful
-            return {
-                "message": "Bug created successfully with calendar event",
-                "service_status": service_status,
-                "calendar_event": calendar_event
-            }
-    except HTTPException as e:
-        return {
-            "message": "Bug created but calendar integration failed",
-            "error": e.detail,
-            "service_status": service_status
-        }
-    
+        if content_type in NDJSON_CONTENT_TYPES:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed request body: {str(e)}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of bugs")
+    return items
+
+@app.post("/client/bugs/bulk")
+async def create_bugs_bulk(request: Request):
+    """Create many bugs at once from a JSON array or NDJSON body"""
+    items = await read_bulk_items(request)
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} bugs per request")
+
+    results = []
+    bugs, events, positions = [], [], []
+    for index, item in enumerate(items):
+        try:
+            bug = Bug.parse_obj(item)
+        except ValidationError as e:
+            results.append({"index": index, "status": "invalid", "errors": e.errors()})
+            continue
+        document = bug_document(bug)
+        bugs.append(document)
+        events.append(repository.new_outbox_event(CALENDAR_CREATE_EVENT, bug.bug_id, build_calendar_event(document)))
+        positions.append(index)
+        results.append({"index": index, "bug_id": bug.bug_id, "status": "created"})
+
+    # Unordered insert: one duplicate doesn't stop the rest of the batch
+    write_errors = await repository.insert_bugs_with_outbox(bugs, events)
+    results_by_index = {result["index"]: result for result in results}
+    for position, write_error in write_errors.items():
+        result = results_by_index[positions[position]]
+        if write_error.get("code") == DUPLICATE_KEY_ERROR:
+            result["status"] = "duplicate"
+        else:
+            result["status"] = "failed"
+            result["error"] = write_error.get("errmsg")
+    if len(write_errors) < len(bugs):
+        outbox_worker.notify()
+    for position, bug in enumerate(bugs):
+        if position not in write_errors:
+            bug_search.on_created(bug)
+            # insert_many added the ObjectId to the dict
+            bug_events.publish(CREATED, {key: value for key, value in bug.items() if key != "_id"})
+            if bug["status"] != bug_states.COMPLETED:
+                sla_scheduler.track(bug["bug_id"], bug["deadline"])
+
+    counts = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+    for result in results:
+        counts[result["status"]] += 1
     return {
-        "message": "Bug created successfully",
-        "service_status": service_status
+        **counts,
+        "results": results,
+        "service_status": service_prober.snapshot()
     }
 
 # --------------------- MANAGER ---------------------
@@ -205,13 +395,12 @@ async def create_bug(bug: Bug):
 @app.post("/manager/client/create")
 async def create_client(client_data: Client):
     try:
-        # Check if client already exists
-        if client_collection.find_one({"client_id": client_data.client_id}):
-            return {"message": "Client already exists"}
-        
-        # Convert Pydantic model to dict and insert
+        # Convert Pydantic model to dict and insert; the unique index rejects duplicates
         client_dict = client_data.dict()
-        result = client_collection.insert_one(client_dict)
+        try:
+            result = await repository.insert_client(client_dict)
+        except DuplicateKeyError:
+            return {"message": "Client already exists"}
         
         # Verify insertion
         if result.inserted_id:
@@ -224,13 +413,12 @@ async def create_client(client_data: Client):
 @app.post("/manager/employee/create")
 async def create_employee(employee: Employee):
     try:
-        # Check if employee already exists
-        if employee_collection.find_one({"employee_id": employee.employee_id}):
-            return {"message": "Employee already exists"}
-        
-        # Convert Pydantic model to dict and insert
+        # Convert Pydantic model to dict and insert; the unique index rejects duplicates
         employee_dict = employee.dict()
-        result = employee_collection.insert_one(employee_dict)
+        try:
+            result = await repository.insert_employee(employee_dict)
+        except DuplicateKeyError:
+            return {"message": "Employee already exists"}
         
         # Verify insertion
         if result.inserted_id:
@@ -241,80 +429,191 @@ async def create_employee(employee: Employee):
         raise HTTPException(status_code=500, detail=f"Error creating employee: {str(e)}")
 
 @app.get("/manager/employees")
-async def list_employees():
-    return [serialize_doc(emp) for emp in employee_collection.find()]
+async def list_employees(request: Request, page: PageParams = Depends()):
+    async def build():
+        docs = await repository.list_employees(page.limit, page.after, page.projection)
+        return page_response([serialize_doc(doc) for doc in docs], page.limit)
+    return await response_cache.respond(request, "employee_collection", build)
 
 
 @app.get("/manager/clients")
-async def list_clients():
-    return [serialize_doc(client) for client in client_collection.find()]
+async def list_clients(request: Request, page: PageParams = Depends()):
+    async def build():
+        docs = await repository.list_clients(page.limit, page.after, page.projection)
+        return page_response([serialize_doc(doc) for doc in docs], page.limit)
+    return await response_cache.respond(request, "client_collection", build)
 
 @app.post("/manager/bugs/assign")
 async def assign_bug(bug_id: str, employee_id: str):
-    if bug_collection.find_one({"bug_id": bug_id}):
-        bug_collection.update_one(
-            {"bug_id": bug_id},
-            {"$set": {"employee_id": employee_id}}
-        )
-        employee_collection.update_one(
-            {"employee_id": employee_id},
-            {"$inc": {"bugs_pending": 1}}
-        )
+    old_bug = await repository.assign_bug(bug_id, employee_id)
+    if old_bug:
+        await workload_rollups.record_assignment(old_bug, employee_id)
+        bug_search.on_updated(bug_id, employee_id=employee_id)
+        bug_events.publish(ASSIGNED, {"bug_id": bug_id, "employee_id": employee_id})
         return {"message": "Bug assigned successfully"}
     return {"message": "Bug assignment failed"}
 
 
 @app.get("/manager/bugs")
-async def list_bugs():
-    return [serialize_doc(bug) for bug in bug_collection.find()]
+async def list_bugs(request: Request, page: PageParams = Depends()):
+    return await response_cache.respond(request, "bug_collection", lambda: bug_page(None, page))
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+EXPORT_CSV_COLUMNS = ["_id", "bug_id", "title", "description", "status", "employee_id", "priority", "deadline"]
+
+async def export_ndjson(batch_size: int):
+    lines = []
+    async for bug in repository.iter_bugs(None, batch_size):
+        # Same ISO-8601 datetimes as the JSON API
+        lines.append(json.dumps(jsonable_encoder(serialize_doc(bug))))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+async def export_csv(batch_size: int):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    rows = 0
+    async for bug in repository.iter_bugs(None, batch_size):
+        writer.writerow(jsonable_encoder(serialize_doc(bug)))
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@app.get("/manager/bugs/export")
+async def export_bugs(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000)
+):
+    """Stream every bug straight from the Mongo cursor as NDJSON or CSV"""
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(batch_size),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=bugs.csv"}
+        )
+    return StreamingResponse(export_ndjson(batch_size), media_type="application/x-ndjson")
+
+@app.get("/manager/stats")
+async def workload_stats():
+    """Bug counts per employee and status, served from the workload rollups."""
+    return await workload_rollups.summary()
 
 # --------------------- EMPLOYEE ---------------------
 
 @app.get("/employee/{employee_id}/bugs")
-async def list_employee_bugs(employee_id: str):
-    return [serialize_doc(bug) for bug in bug_collection.find({"employee_id": employee_id})]
+async def list_employee_bugs(request: Request, employee_id: str, page: PageParams = Depends()):
+    query = {"employee_id": employee_id}
+    return await response_cache.respond(request, "bug_collection", lambda: bug_page(query, page))
 
 @app.get("/employee/{employee_id}/bugs/completed")
-async def list_completed_bugs(employee_id: str):
-    return [serialize_doc(bug) for bug in bug_collection.find({"employee_id": employee_id, "status": "Completed"})]
+async def list_completed_bugs(request: Request, employee_id: str, page: PageParams = Depends()):
+    query = {"employee_id": employee_id, "status": "Completed"}
+    return await response_cache.respond(request, "bug_collection", lambda: bug_page(query, page))
 
 @app.get("/employee/{employee_id}/bugs/pending")
-async def list_pending_bugs(employee_id: str):
-    return [serialize_doc(bug) for bug in bug_collection.find({"employee_id": employee_id, "status": "Pending"})]
+async def list_pending_bugs(request: Request, employee_id: str, page: PageParams = Depends()):
+    query = {"employee_id": employee_id, "status": "Pending"}
+    return await response_cache.respond(request, "bug_collection", lambda: bug_page(query, page))
 
 @app.post("/employee/{employee_id}/bugs/update")
 async def update_bug_status(employee_id: str, bug_id: str, status: str):
-    bug = bug_collection.find_one({"bug_id": bug_id})
-    if bug:
-        bug_collection.update_one(
-            {"bug_id": bug_id, "employee_id": employee_id},
-            {"$set": {"status": status}}
-        )
-        employee_collection.update_one(
-            {"employee_id": employee_id},
-            {"$inc": {"bugs_completed": 1}}
-        )
-
-        # Update calendar event status
-        try:
-            response = requests.put(
-                f"{CALENDAR_SERVICE_URL}/api/events/by-reference/{bug_id}",
-                json={"status": status}
-            )
-            if response.status_code != 200:
-                print(f"Failed to update calendar event status: {response.text}")
-        except Exception as e:
-            print(f"Error updating calendar event status: {str(e)}")
-
-        return {"message": f"Bug {bug_id} updated to status {status}"}
-    return {"message": "Bug not found"}
+    # One conditional update that only matches a valid transition; the calendar
+    # status is queued in the outbox with it instead of being sent inline
+    event = repository.new_outbox_event(CALENDAR_UPDATE_STATUS, bug_id, {"referenceId": bug_id, "status": status})
+    try:
+        old_bug = await bug_states.transition(repository, bug_id, employee_id, status, [event])
+    except bug_states.BugNotFound:
+        return {"message": "Bug not found"}
+    except bug_states.UnknownStatus as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except bug_states.NotAssigned as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except bug_states.InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if old_bug is None:
+        return {"message": f"Bug {bug_id} is already {status}"}
+    await workload_rollups.record_status_change(employee_id, old_bug.get("status"), status)
+    bug_search.on_updated(bug_id, status=status)
+    bug_events.publish(STATUS_CHANGED, {"bug_id": bug_id, "employee_id": employee_id, "status": status})
+    if status == bug_states.COMPLETED:
+        sla_scheduler.untrack(bug_id)
+    outbox_worker.notify()
+    return {"message": f"Bug {bug_id} updated to status {status}"}
+
+# --------------------- EVENTS ---------------------
+
+@app.get("/bugs/events")
+async def bug_event_stream(
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = Query(None, description="Event id to resume after, for clients that can't set Last-Event-ID")
+):
+    """Server-sent events for bug creation, assignment and status changes"""
+    return StreamingResponse(
+        bug_events.stream(last_event_id or after),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --------------------- SLA ---------------------
+
+async def publish_overdue(bug_id: str, deadline: datetime):
+    """SLA escalation handler: announce the missed deadline on /bugs/events"""
+    bug_events.publish(OVERDUE, {"bug_id": bug_id, "deadline": deadline})
+
+@app.get("/bugs/overdue")
+async def list_overdue_bugs(limit: int = Query(100, ge=1, le=1000)):
+    """Open bugs past their deadline, most overdue first, served from the in-memory deadline index"""
+    overdue = sla_scheduler.overdue(limit)
+    bugs = {bug["bug_id"]: bug for bug in await repository.find_bugs([bug_id for bug_id, _ in overdue])}
+    now = datetime.utcnow()
+    items = []
+    for bug_id, deadline in overdue:
+        if bug_id in bugs:
+            items.append({
+                **serialize_doc(bugs[bug_id]),
+                "deadline": deadline,
+                "overdue_seconds": int((now - deadline).total_seconds())
+            })
+    return {"items": items}
+
+# --------------------- SEARCH ---------------------
+
+@app.get("/bugs/search")
+async def search_bugs(
+    q: str = Query(..., min_length=1),
+    status: Optional[str] = Query(None, regex="^(Pending|In Progress|Completed)$"),
+    employee_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Search bug titles and descriptions, best matches first"""
+    filters = {}
+    if status:
+        filters["status"] = status
+    if employee_id:
+        filters["employee_id"] = employee_id
+    items, total = await bug_search.search(q, filters, limit, offset)
+    return {
+        "items": [serialize_doc(bug) for bug in items],
+        "total": total,
+        "next_offset": offset + limit if offset + limit < total else None
+    }
 
 # --------------------- FORUM INTEGRATION ---------------------
 
 @app.post("/bugs/{bug_id}/create-forum-topic")
 async def create_forum_topic_for_bug(bug_id: str, title: str, description: str):
     """Create a forum topic for discussion about a specific bug"""
-    bug = bug_collection.find_one({"bug_id": bug_id})
+    bug = await repository.find_bug(bug_id)
     if not bug:
         return {"message": "Bug not found"}
 
@@ -327,7 +626,7 @@ async def create_forum_topic_for_bug(bug_id: str, title: str, description: str):
         }
 
         # Send request to forum service
-        response = requests.post(f"{FORUM_SERVICE_URL}/topics/", json=topic_data)
+        response = await service_health.request("forum", "POST", f"{FORUM_SERVICE_URL}/topics/", json=topic_data)
 
         if response.status_code == 200:
             return {"message": "Forum topic created successfully", "topic": response.json()}
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils.metrics import http_request_duration, http_requests_in_flight
+
+UNMATCHED_ROUTE = "<unmatched>"
+MAX_CACHED_PATHS = 1024
+
+class MetricsMiddleware:
+    """Plain ASGI middleware recording latency and in-flight requests per route template."""
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute], max_cached_paths: int = MAX_CACHED_PATHS):
+        self.app = app
+        # The application's live route list, so routes added after the middleware are seen too
+        self.routes = routes
+        # Templates of recently seen (method, path) pairs, so repeated requests skip the route scan
+        self.max_cached_paths = max_cached_paths
+        self.templates: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.routes_seen = len(routes)
+
+    def match_template(self, scope: Scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", UNMATCHED_ROUTE)
+        return UNMATCHED_ROUTE
+
+    def route_template(self, scope: Scope) -> str:
+        """The path template (e.g. /employee/{employee_id}/bugs) rather than the raw path."""
+        if len(self.routes) != self.routes_seen:
+            # A route was added, cached misses may match now
+            self.templates.clear()
+            self.routes_seen = len(self.routes)
+        key = (scope["method"], scope["path"])
+        template = self.templates.get(key)
+        if template is not None:
+            self.templates.move_to_end(key)
+            return template
+        template = self.templates[key] = self.match_template(scope)
+        if len(self.templates) > self.max_cached_paths:
+            self.templates.popitem(last=False)
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_template(scope)
+        status = "500"
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc(route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(route=route)
+            http_request_duration.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status
+            )
@@ -1,23 +1,36 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Iterable
+
+from fastapi import HTTPException
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from ..utils.service_health import service_health
 
-class ServiceCheckMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Skip health checks
-        if request.url.path in ["/health", "/services/status"]:
-            return await call_next(request)
+# Paths that are served even when the service is marked unavailable
+EXEMPT_PATHS = ("/health", "/services/status", "/metrics")
+
+class ServiceCheckMiddleware:
+    """Plain ASGI middleware: one set lookup and one dict lookup per request, no extra task or stream."""
+
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] = EXEMPT_PATHS):
+        self.app = app
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip health checks and non-HTTP traffic
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
 
         # Check if the service is available
         try:
             service_health.raise_if_service_unavailable("bug_tracker")
         except HTTPException as e:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail}
             )
+            await response(scope, receive, send)
+            return
 
         # If service is available, proceed with the request
-        response = await call_next(request)
-        return response 
\ No newline at end of file
+        await self.app(scope, receive, send)
@@ -8,6 +8,7 @@ setup(
         "fastapi",
         "uvicorn",
         "pymongo",
+        "motor",
         "python-jose[cryptography]",
         "passlib[bcrypt]",
         "python-multipart",
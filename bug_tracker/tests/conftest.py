@@ -0,0 +1,73 @@
+import asyncio
+import contextlib
+import functools
+import os
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from bug_tracker.utils.repository import BugTrackerRepository
+
+BUG_TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def repository():
+    """A repository on an in-memory MongoDB."""
+    repo = BugTrackerRepository()
+    repo.connect("mongodb://localhost:27017", "bugtracker_test_db", client=AsyncMongoMockClient())
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """``bug_tracker.main`` on an in-memory MongoDB, with fresh per-process state for each test."""
+    # StaticFiles is mounted relative to the working directory
+    monkeypatch.chdir(BUG_TRACKER_DIR)
+    from bug_tracker import main
+    from bug_tracker.utils.bug_events import BugEventFeed
+    from bug_tracker.utils.idempotency import IdempotencyStore
+    from bug_tracker.utils.outbox import OutboxWorker
+    from bug_tracker.utils.response_cache import ResponseCache
+    from bug_tracker.utils.rollups import WorkloadRollups
+    from bug_tracker.utils.search import BugSearch
+    from bug_tracker.utils.service_health import service_health
+    from bug_tracker.utils.service_prober import ServiceProber
+    from bug_tracker.utils.sla import SLAScheduler
+
+    repository = main.repository
+    monkeypatch.setattr(repository, "connect", functools.partial(
+        BugTrackerRepository.connect, repository, client=AsyncMongoMockClient()
+    ))
+    monkeypatch.setattr(main, "MONGODB_DB_NAME", "bugtracker_test_db")
+    monkeypatch.setitem(service_health.service_status, "bug_tracker", True)
+    monkeypatch.setattr(main, "service_prober", ServiceProber(main.service_status))
+    for name, cls in [
+        ("outbox_worker", OutboxWorker),
+        ("workload_rollups", WorkloadRollups),
+        ("bug_search", BugSearch),
+        ("bug_events", BugEventFeed),
+        ("sla_scheduler", SLAScheduler),
+        ("response_cache", ResponseCache),
+        ("idempotency", IdempotencyStore),
+    ]:
+        monkeypatch.setattr(main, name, cls(repository))
+    return main
+
+
+@contextlib.asynccontextmanager
+async def serve(main):
+    """Run the app's startup hooks and yield a client talking to it in-process."""
+    await main.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+    finally:
+        await main.app.router.shutdown()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from bug_tracker.utils.bug_events import BugEventFeed, format_event
+
+from .conftest import run
+
+
+def test_format_event_writes_iso_datetimes():
+    deadline = datetime(2024, 5, 1, 12, 30)
+    event = format_event("boot-1", "created", {"bug_id": "BUG-1", "deadline": deadline, "_id": ObjectId()})
+    lines = event.split("\n")
+    assert lines[:2] == ["id: boot-1", "event: created"]
+    assert event.endswith("\n\n")
+    data = json.loads(lines[2][len("data: "):])
+    assert data["deadline"] == "2024-05-01T12:30:00"
+    assert isinstance(data["_id"], str)
+
+
+def parse(message):
+    """(id, type, data) of an SSE message, or the comment of a keep-alive."""
+    if message.startswith(":"):
+        return message.strip()
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+def feed(repository, **options):
+    options = {"backend": "memory", "buffer_size": 3, "queue_size": 10, "heartbeat": 60, **options}
+    return BugEventFeed(repository, **options)
+
+
+async def subscribe(stream):
+    """Start the stream, so it's subscribed before anything is published."""
+    first = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    return first
+
+
+def test_live_events_reach_every_subscriber(repository):
+    events = feed(repository)
+
+    async def scenario():
+        streams = [events.stream(), events.stream()]
+        pending = [await subscribe(stream) for stream in streams]
+        events.publish("created", {"bug_id": "BUG-1"})
+        events.publish("assigned", {"bug_id": "BUG-1", "employee_id": "E1"})
+        received = []
+        for stream, first in zip(streams, pending):
+            received.append([parse(await first), parse(await stream.__anext__())])
+        return received
+
+    first, second = run(scenario())
+    assert first == second
+    assert [(event_type, data["bug_id"]) for _, event_type, data in first] == [("created", "BUG-1"), ("assigned", "BUG-1")]
+    assert first[0][0] == f"{events.boot_id}-1"
+
+
+def test_resume_replays_events_after_last_event_id(repository):
+    events = feed(repository)
+    for i in range(3):
+        events.publish("created", {"bug_id": f"BUG-{i}"})
+
+    async def scenario():
+        stream = events.stream(f"{events.boot_id}-1")
+        return [parse(await stream.__anext__()) for _ in range(2)]
+
+    assert [data["bug_id"] for _, _, data in run(scenario())] == ["BUG-1", "BUG-2"]
+
+
+def test_unknown_or_expired_resume_point_gets_reset(repository):
+    events = feed(repository)
+    for i in range(5):
+        events.publish("created", {"bug_id": f"BUG-{i}"})
+
+    async def first_message(last_event_id):
+        stream = events.stream(last_event_id)
+        try:
+            return parse(await stream.__anext__())
+        finally:
+            await stream.aclose()
+
+    # Issued by a previous run of the service
+    _, event_type, data = run(first_message("0123456789ab-4"))
+    assert (event_type, data["reason"]) == ("reset", "resume point no longer available")
+    # Only the last three events are buffered
+    assert run(first_message(f"{events.boot_id}-1"))[1] == "reset"
+    assert run(first_message(f"{events.boot_id}-2"))[2] == {"bug_id": "BUG-2"}
+    assert run(first_message(f"{events.boot_id}-99"))[1] == "reset"
+
+
+def test_idle_stream_sends_heartbeats(repository):
+    events = feed(repository, heartbeat=0.01)
+
+    async def scenario():
+        stream = events.stream()
+        try:
+            return [parse(await stream.__anext__()) for _ in range(2)]
+        finally:
+            await stream.aclose()
+
+    assert run(scenario()) == [": keepalive", ": keepalive"]
+
+
+def test_slow_subscriber_gets_reset_and_stream_ends(repository):
+    events = feed(repository, queue_size=2)
+
+    async def scenario():
+        stream = events.stream()
+        first = await subscribe(stream)
+        for i in range(3):
+            events.publish("created", {"bug_id": f"BUG-{i}"})
+        messages = [parse(await first)]
+        async for message in stream:
+            messages.append(parse(message))
+        return messages
+
+    messages = run(scenario())
+    # BUG-0 was already handed over; what's still queued is dropped for the reset
+    assert messages[0][2] == {"bug_id": "BUG-0"}
+    assert messages[1:] == [(None, "reset", {"reason": "client fell behind"})]
+    assert events.subscribers == set()
+
+
+def test_closed_stream_unsubscribes(repository):
+    events = feed(repository)
+
+    async def scenario():
+        stream = events.stream()
+        first = await subscribe(stream)
+        subscribed = len(events.subscribers)
+        events.publish("created", {"bug_id": "BUG-1"})
+        await first
+        await stream.aclose()
+        # Publishing after the client left must not fill its queue
+        events.publish("created", {"bug_id": "BUG-2"})
+        return subscribed
+
+    assert run(scenario()) == 1
+    assert events.subscribers == set()
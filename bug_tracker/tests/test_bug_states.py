@@ -0,0 +1,90 @@
+import pytest
+
+from bug_tracker.utils import bug_states
+
+from .conftest import run, serve
+
+
+def test_sources_of_each_status():
+    assert bug_states.sources("In Progress") == ["Pending"]
+    assert bug_states.sources("Completed") == ["In Progress"]
+    assert bug_states.sources("Pending") == []
+    with pytest.raises(bug_states.UnknownStatus):
+        bug_states.sources("Done")
+
+
+def test_transition_errors(repository):
+    async def scenario():
+        await repository.insert_bug({"bug_id": "BUG-1", "employee_id": "E1", "status": "Pending"})
+        outcomes = {}
+        for name, (bug_id, employee_id, status) in {
+            "missing": ("BUG-9", "E1", "In Progress"),
+            "not_assigned": ("BUG-1", "E2", "In Progress"),
+            "invalid": ("BUG-1", "E1", "Completed"),
+            "unknown": ("BUG-1", "E1", "Done"),
+        }.items():
+            try:
+                await bug_states.transition(repository, bug_id, employee_id, status, [])
+            except bug_states.TransitionError as e:
+                outcomes[name] = type(e)
+        return outcomes, await repository.find_bug("BUG-1")
+
+    outcomes, bug = run(scenario())
+    assert outcomes == {
+        "missing": bug_states.BugNotFound,
+        "not_assigned": bug_states.NotAssigned,
+        "invalid": bug_states.InvalidTransition,
+        "unknown": bug_states.UnknownStatus,
+    }
+    assert bug["status"] == "Pending"
+
+
+def update(client, employee_id, bug_id, status):
+    return client.post(f"/employee/{employee_id}/bugs/update", params={"bug_id": bug_id, "status": status})
+
+
+def test_status_endpoint_responses(app):
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/create", json={"bug_id": "BUG-1", "title": "Crash", "description": "Steps"})
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-1", "employee_id": "E1"})
+            responses = {
+                "illegal": await update(client, "E1", "BUG-1", "Completed"),
+                "wrong_employee": await update(client, "E2", "BUG-1", "In Progress"),
+                "malformed": await update(client, "E1", "BUG-1", "Done"),
+                "missing": await update(client, "E1", "BUG-9", "In Progress"),
+                "moved": await update(client, "E1", "BUG-1", "In Progress"),
+                "repeated": await update(client, "E1", "BUG-1", "In Progress"),
+            }
+            events = await app.repository.outbox.find({"event_type": "calendar.update_status"}).to_list(length=None)
+            return responses, events
+
+    responses, events = run(scenario())
+    assert responses["illegal"].status_code == 409
+    assert responses["wrong_employee"].status_code == 403
+    assert responses["malformed"].status_code == 400
+    assert responses["missing"].json() == {"message": "Bug not found"}
+    assert responses["moved"].json() == {"message": "Bug BUG-1 updated to status In Progress"}
+    # A retried request is a no-op rather than an error
+    assert responses["repeated"].status_code == 200
+    assert responses["repeated"].json() == {"message": "Bug BUG-1 is already In Progress"}
+    # Only the applied change queued a calendar update
+    assert [event["payload"]["status"] for event in events] == ["In Progress"]
+
+
+def test_rollup_deltas_come_from_the_previous_status(app):
+    async def scenario():
+        async with serve(app) as client:
+            # Only the deltas under test change the rollups
+            await app.workload_rollups.stop()
+            await client.post("/client/bugs/create", json={"bug_id": "BUG-1", "title": "Crash", "description": "Steps"})
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-1", "employee_id": "E1"})
+            snapshots = []
+            for status in ("In Progress", "In Progress", "Pending", "Completed"):
+                await update(client, "E1", "BUG-1", status)
+                rollup = await app.repository.employee_stats.find_one({"employee_id": "E1"})
+                snapshots.append(tuple(rollup.get(field, 0) for field in ("pending", "in_progress", "completed")))
+            return snapshots
+
+    # Repeats and refused changes leave the counts alone
+    assert run(scenario()) == [(0, 1, 0), (0, 1, 0), (0, 1, 0), (0, 0, 1)]
@@ -0,0 +1,62 @@
+import json
+
+from .conftest import run, serve
+
+
+def bug(bug_id, **fields):
+    return {"bug_id": bug_id, "title": f"Bug {bug_id}", "description": "Steps to reproduce", **fields}
+
+
+def test_bulk_reports_each_invalid_item(app):
+    items = [
+        bug("BUG-1"),
+        bug("bad id!"),
+        bug("BUG-2", status="Done"),
+        bug("BUG-3", priority="urgent"),
+        {"bug_id": "BUG-4"},
+        bug("BUG-5", status="In Progress"),
+    ]
+
+    async def scenario():
+        async with serve(app) as client:
+            return await client.post("/client/bugs/bulk", json=items)
+
+    response = run(scenario())
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == [
+        "created", "invalid", "invalid", "invalid", "invalid", "created"
+    ]
+    assert body["created"] == 2
+    assert body["invalid"] == 4
+    errors = {result["index"]: result["errors"] for result in body["results"] if result["status"] == "invalid"}
+    assert [error["loc"] for error in errors[1]] == [["bug_id"]]
+    assert [error["loc"] for error in errors[2]] == [["status"]]
+    assert [error["loc"] for error in errors[3]] == [["priority"]]
+    assert {tuple(error["loc"]) for error in errors[4]} == {("title",), ("description",)}
+
+
+def test_bulk_reports_duplicates(app):
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/bulk", json=[bug("BUG-1")])
+            return await client.post("/client/bugs/bulk", json=[bug("BUG-1"), bug("BUG-2")])
+
+    body = run(scenario()).json()
+    assert [(result["bug_id"], result["status"]) for result in body["results"]] == [
+        ("BUG-1", "duplicate"), ("BUG-2", "created")
+    ]
+    assert (body["created"], body["duplicate"]) == (1, 1)
+
+
+def test_bulk_accepts_ndjson(app):
+    payload = "\n".join(json.dumps(item) for item in [bug("BUG-1"), bug("bad id!")])
+
+    async def scenario():
+        async with serve(app) as client:
+            return await client.post(
+                "/client/bugs/bulk", content=payload, headers={"Content-Type": "application/x-ndjson"}
+            )
+
+    body = run(scenario()).json()
+    assert [result["status"] for result in body["results"]] == ["created", "invalid"]
@@ -0,0 +1,115 @@
+import types
+
+import httpx
+import pytest
+
+from bug_tracker.utils import circuit_breaker, service_health as service_health_module
+from bug_tracker.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+from .conftest import run
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def breaker():
+    return CircuitBreaker("calendar", window=10, min_calls=4, failure_rate=0.5, open_seconds=5, half_open_calls=1)
+
+
+def call(breaker, ok):
+    breaker.before_call()
+    if ok:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+
+def test_stays_closed_below_min_calls(clock):
+    cb = breaker()
+    for _ in range(3):
+        call(cb, False)
+    assert cb.state == CLOSED
+
+
+def test_opens_at_failure_rate_and_fails_fast(clock):
+    cb = breaker()
+    for ok in (True, False, True, False):
+        call(cb, ok)
+    assert cb.state == OPEN
+    clock.now += 2
+    with pytest.raises(CircuitOpenError) as excinfo:
+        cb.before_call()
+    assert excinfo.value.retry_in == pytest.approx(3)
+    assert cb.snapshot()["rejected_calls"] == 1
+
+
+def test_old_outcomes_leave_the_window(clock):
+    cb = breaker()
+    for _ in range(3):
+        call(cb, False)
+    clock.now += 11
+    # The earlier failures have expired, so this is one failure out of one call
+    call(cb, False)
+    assert cb.state == CLOSED
+    assert cb.snapshot()["calls_in_window"] == 1
+
+
+def test_half_open_trial_closes_on_success(clock):
+    cb = breaker()
+    for _ in range(4):
+        call(cb, False)
+    clock.now += 5
+    cb.before_call()
+    assert cb.state == HALF_OPEN
+    # Only one trial call at a time
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+    cb.record_success()
+    assert cb.state == CLOSED
+    assert cb.snapshot()["calls_in_window"] == 0
+
+
+def test_half_open_trial_reopens_on_failure(clock):
+    cb = breaker()
+    for _ in range(4):
+        call(cb, False)
+    clock.now += 5
+    call(cb, False)
+    assert cb.state == OPEN
+    assert cb.snapshot()["retry_in"] == pytest.approx(5)
+
+
+def test_service_requests_go_through_the_breaker(monkeypatch):
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(url)
+        return httpx.Response(503)
+
+    monkeypatch.setattr(service_health_module.http_client, "request", request)
+    health = service_health_module.ServiceHealth()
+    health.breakers["calendar"] = breaker()
+
+    async def scenario():
+        for _ in range(4):
+            response = await health.request("calendar", "GET", "http://calendar/health")
+            assert response.status_code == 503
+        # 5xx responses count as failures, so the circuit is open now
+        with pytest.raises(CircuitOpenError):
+            await health.request("calendar", "GET", "http://calendar/health")
+
+    run(scenario())
+    assert len(calls) == 4
+    assert health.breaker("calendar").state == OPEN
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from .conftest import run, serve
+
+BUG = {"bug_id": "BUG-1", "title": "Crash on save", "description": "Steps to reproduce", "priority": "critical"}
+
+
+def export(app, format):
+    async def scenario():
+        async with serve(app) as client:
+            response = await client.post("/client/bugs/create", json=BUG)
+            assert response.status_code == 200
+            return await client.get("/manager/bugs/export", params={"format": format})
+
+    response = run(scenario())
+    assert response.status_code == 200
+    return response.text
+
+
+def assert_iso(value):
+    assert "T" in value
+    datetime.fromisoformat(value)
+
+
+def test_ndjson_export_uses_iso_datetimes(app):
+    lines = export(app, "ndjson").splitlines()
+    assert len(lines) == 1
+    bug = json.loads(lines[0])
+    assert bug["bug_id"] == "BUG-1"
+    assert isinstance(bug["_id"], str)
+    assert_iso(bug["created_at"])
+    assert_iso(bug["deadline"])
+
+
+def test_csv_export_uses_iso_datetimes(app):
+    rows = list(csv.DictReader(io.StringIO(export(app, "csv"))))
+    assert [row["bug_id"] for row in rows] == ["BUG-1"]
+    assert rows[0]["priority"] == "critical"
+    assert_iso(rows[0]["deadline"])
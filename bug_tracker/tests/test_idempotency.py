@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from bug_tracker.utils.idempotency import IdempotencyStore
+
+from .conftest import run
+
+
+class Handler:
+    """Counts its calls and returns a response after an optional delay."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"message": "created", "call": self.calls}
+
+
+def test_replay_returns_stored_response(repository):
+    store = IdempotencyStore(repository)
+    handler = Handler()
+
+    async def scenario():
+        first = await store.execute("key", "fp", handler)
+        second = await store.execute("key", "fp", handler)
+        return first, second
+
+    first, second = run(scenario())
+    assert first == ({"message": "created", "call": 1}, False)
+    assert second == ({"message": "created", "call": 1}, True)
+    assert handler.calls == 1
+
+
+def test_replay_after_restart_reads_collection(repository):
+    handler = Handler()
+
+    async def scenario():
+        await IdempotencyStore(repository).execute("key", "fp", handler)
+        # A fresh store has an empty in-process cache
+        return await IdempotencyStore(repository).execute("key", "fp", handler)
+
+    assert run(scenario()) == ({"message": "created", "call": 1}, True)
+    assert handler.calls == 1
+
+
+def test_reused_key_with_other_body_is_rejected(repository):
+    store = IdempotencyStore(repository)
+
+    async def scenario():
+        await store.execute("key", "fp", Handler())
+        await store.execute("key", "other", Handler())
+
+    with pytest.raises(HTTPException) as excinfo:
+        run(scenario())
+    assert excinfo.value.status_code == 422
+
+
+def test_concurrent_requests_in_one_process_run_handler_once(repository):
+    store = IdempotencyStore(repository)
+    handler = Handler(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(store.execute("key", "fp", handler) for _ in range(5)))
+
+    results = run(scenario())
+    assert handler.calls == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+    assert {result["call"] for result, _ in results} == {1}
+
+
+def test_concurrent_requests_across_processes_run_handler_once(repository):
+    # Two stores on one database stand in for two worker processes
+    workers = [IdempotencyStore(repository, poll_interval=0.01) for _ in range(2)]
+    handler = Handler(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(worker.execute("key", "fp", handler) for worker in workers))
+
+    results = run(scenario())
+    assert handler.calls == 1
+    assert sorted(replayed for _, replayed in results) == [False, True]
+    assert {result["call"] for result, _ in results} == {1}
+
+
+def test_failed_request_releases_key(repository):
+    store = IdempotencyStore(repository)
+    handler = Handler()
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.execute("key", "fp", Handler(error=RuntimeError("boom")))
+        return await store.execute("key", "fp", handler)
+
+    assert run(scenario()) == ({"message": "created", "call": 1}, False)
+
+
+def test_waiter_gives_up_with_409(repository):
+    store = IdempotencyStore(repository, wait_seconds=0.05, poll_interval=0.01)
+    handler = Handler()
+
+    async def scenario():
+        # Held by another process that hasn't finished yet
+        assert await repository.reserve_idempotency_key("key", "fp", 60)
+        await store.execute("key", "fp", handler)
+
+    with pytest.raises(HTTPException) as excinfo:
+        run(scenario())
+    assert excinfo.value.status_code == 409
+    assert handler.calls == 0
+
+
+def test_expired_reservation_is_taken_over(repository):
+    store = IdempotencyStore(repository)
+    handler = Handler()
+
+    async def scenario():
+        # Left behind by a process that crashed mid-request
+        assert await repository.reserve_idempotency_key("key", "fp", 0.01)
+        await asyncio.sleep(0.02)
+        return await store.execute("key", "fp", handler)
+
+    assert run(scenario()) == ({"message": "created", "call": 1}, False)
@@ -0,0 +1,88 @@
+from starlette.routing import Route
+
+from bug_tracker.middleware.metrics import UNMATCHED_ROUTE, MetricsMiddleware
+from bug_tracker.utils.metrics import Counter, Gauge, Histogram, Registry
+
+from .conftest import run, serve
+
+
+def test_counter_and_gauge_render_per_label_set():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs run", ["queue"]))
+    gauge = registry.register(Gauge("workers", "Busy workers"))
+    counter.inc(queue="default")
+    counter.inc(2, queue='say "hi"\n')
+    gauge.inc(3)
+    gauge.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="default"} 1',
+        'jobs_total{queue="say \\"hi\\"\\n"} 2',
+        "# HELP workers Busy workers",
+        "# TYPE workers gauge",
+        "workers 2",
+    ]
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    histogram = Histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe(value, route="/bugs")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/bugs",le="0.1"} 2',
+        'latency_seconds_bucket{route="/bugs",le="0.5"} 3',
+        'latency_seconds_bucket{route="/bugs",le="+Inf"} 4',
+        'latency_seconds_sum{route="/bugs"} 2.45',
+        'latency_seconds_count{route="/bugs"} 4',
+    ]
+
+
+def test_requests_are_recorded_by_route_template(app):
+    async def scenario():
+        async with serve(app) as client:
+            await client.get("/employee/E1/bugs")
+            await client.get("/employee/E2/bugs")
+            await client.get("/no/such/route")
+            return await client.get("/metrics")
+
+    response = run(scenario())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    count = 'http_request_duration_seconds_count{method="GET",route="/employee/{employee_id}/bugs",status="200"}'
+    # The registry is process-wide, so other tests may have added to the count
+    assert any(line.startswith(count + " ") and int(line.split()[-1]) >= 2 for line in lines)
+    assert not any("/employee/E1/bugs" in line for line in lines)
+    assert any('route="<unmatched>",status="404"' in line for line in lines)
+
+
+def test_route_templates_are_cached_per_method_and_path(app):
+    routes = list(app.app.routes)
+    middleware = MetricsMiddleware(app.app, routes, max_cached_paths=2)
+    matched = []
+    match_template = middleware.match_template
+
+    def counting_match(scope):
+        matched.append(scope["path"])
+        return match_template(scope)
+
+    middleware.match_template = counting_match
+
+    def template(path, method="GET"):
+        return middleware.route_template({"type": "http", "method": method, "path": path, "root_path": ""})
+
+    assert template("/employee/E1/bugs") == "/employee/{employee_id}/bugs"
+    assert template("/employee/E1/bugs") == "/employee/{employee_id}/bugs"
+    assert template("/no/such/route") == UNMATCHED_ROUTE
+    assert matched == ["/employee/E1/bugs", "/no/such/route"]
+
+    # Least recently used entries are dropped beyond the limit
+    template("/employee/E2/bugs")
+    assert list(middleware.templates) == [("GET", "/no/such/route"), ("GET", "/employee/E2/bugs")]
+
+    # A route added later is found even for a path cached as unmatched
+    routes.append(Route("/no/such/route", lambda request: None))
+    assert template("/no/such/route") == "/no/such/route"
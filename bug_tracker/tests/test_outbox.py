@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bug_tracker.utils.outbox import OutboxWorker
+
+from .conftest import run
+
+
+def event(repository, aggregate_id, status, created_at):
+    document = repository.new_outbox_event("calendar.update_status", aggregate_id, {"referenceId": aggregate_id, "status": status})
+    document["created_at"] = created_at
+    return document
+
+
+def test_only_the_oldest_event_of_each_aggregate_is_claimed(repository):
+    async def scenario():
+        base = datetime.utcnow() - timedelta(seconds=10)
+        await repository.outbox.insert_many([
+            event(repository, "bug-1", "In Progress", base),
+            event(repository, "bug-1", "Completed", base + timedelta(seconds=1)),
+            event(repository, "bug-2", "In Progress", base + timedelta(seconds=2)),
+        ])
+
+        first = await repository.claim_outbox_events(10, 60)
+        # The heads are leased, so nothing else of those aggregates is claimable
+        second = await repository.claim_outbox_events(10, 60)
+        await repository.complete_outbox_event(next(e["_id"] for e in first if e["aggregate_id"] == "bug-1"))
+        third = await repository.claim_outbox_events(10, 60)
+        return first, second, third
+
+    first, second, third = run(scenario())
+    assert sorted((e["aggregate_id"], e["payload"]["status"]) for e in first) == [("bug-1", "In Progress"), ("bug-2", "In Progress")]
+    assert second == []
+    assert [(e["aggregate_id"], e["payload"]["status"]) for e in third] == [("bug-1", "Completed")]
+
+
+def test_a_retrying_event_holds_back_the_rest_of_its_aggregate(repository):
+    async def scenario():
+        base = datetime.utcnow() - timedelta(seconds=10)
+        await repository.outbox.insert_many([
+            event(repository, "bug-1", "In Progress", base),
+            event(repository, "bug-1", "Completed", base + timedelta(seconds=1)),
+        ])
+        head = (await repository.claim_outbox_events(10, 60))[0]
+        await repository.retry_outbox_event(head["_id"], 1, datetime.utcnow() + timedelta(minutes=5), "calendar down")
+        return await repository.claim_outbox_events(10, 60)
+
+    assert run(scenario()) == []
+
+
+def test_expired_leases_are_claimed_again_and_batches_are_limited(repository):
+    async def scenario():
+        base = datetime.utcnow() - timedelta(seconds=10)
+        await repository.outbox.insert_many([event(repository, f"bug-{n}", "In Progress", base) for n in range(5)])
+        batch = await repository.claim_outbox_events(3, 0)
+        # A zero-second lease has already expired
+        again = await repository.claim_outbox_events(10, 60)
+        return batch, again
+
+    batch, again = run(scenario())
+    assert len(batch) == 3
+    assert len(again) == 5
+    assert len({e["lease"] for e in again}) == 1
+
+
+def test_concurrent_claims_never_share_an_event(repository):
+    async def scenario():
+        base = datetime.utcnow() - timedelta(seconds=10)
+        await repository.outbox.insert_many([event(repository, f"bug-{n}", "In Progress", base) for n in range(20)])
+        batches = await asyncio.gather(*[repository.claim_outbox_events(20, 60) for _ in range(4)])
+        return [e["_id"] for batch in batches for e in batch]
+
+    claimed = run(scenario())
+    assert len(claimed) == len(set(claimed)) == 20
+
+
+def test_worker_delivers_status_changes_in_order_despite_failures(repository):
+    delivered = []
+    failures = {"In Progress": 2}
+
+    async def handler(payload):
+        if failures.get(payload["status"]):
+            failures[payload["status"]] -= 1
+            raise RuntimeError("calendar unavailable")
+        delivered.append((payload["referenceId"], payload["status"]))
+
+    async def scenario():
+        worker = OutboxWorker(repository, batch_size=10, base_delay=0.01, max_delay=0.01, max_attempts=5)
+        worker.register("calendar.update_status", handler)
+        base = datetime.utcnow() - timedelta(seconds=10)
+        await repository.outbox.insert_many([
+            event(repository, "bug-1", "In Progress", base),
+            event(repository, "bug-1", "Completed", base + timedelta(seconds=1)),
+            event(repository, "bug-2", "Completed", base + timedelta(seconds=2)),
+        ])
+        for _ in range(50):
+            await worker.drain_once()
+            if (await repository.outbox_counts())["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        return worker.stats()
+
+    stats = run(scenario())
+    assert [status for bug, status in delivered if bug == "bug-1"] == ["In Progress", "Completed"]
+    assert ("bug-2", "Completed") in delivered
+    assert stats == {"delivered": 3, "retried": 2, "dead_lettered": 0}
+
+
+def test_stop_right_after_notify_ends_the_worker(repository):
+    async def scenario():
+        worker = OutboxWorker(repository, poll_interval=60)
+        await worker.start()
+        # Let the worker drain the empty outbox and go idle
+        await asyncio.sleep(0.05)
+        worker.notify()
+        await asyncio.wait_for(worker.stop(), timeout=2)
+        return worker._task
+
+    assert run(scenario()) is None
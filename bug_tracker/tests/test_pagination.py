@@ -0,0 +1,58 @@
+import pytest
+from fastapi import HTTPException
+
+from bug_tracker.utils.pagination import decode_cursor, page_response, parse_fields
+
+from .conftest import run, serve
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("title, status") == {"title": 1, "status": 1}
+    assert parse_fields("-description") == {"description": 0}
+
+
+@pytest.mark.parametrize("fields", ["title,-description", "-_id"])
+def test_parse_fields_rejects(fields):
+    with pytest.raises(HTTPException) as excinfo:
+        parse_fields(fields)
+    assert excinfo.value.status_code == 400
+
+
+def test_decode_cursor_rejects_garbage():
+    assert decode_cursor(None) is None
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor("not-an-object-id")
+    assert excinfo.value.status_code == 400
+
+
+def test_page_response_uses_extra_item_as_more_marker():
+    docs = [{"_id": str(i)} for i in range(3)]
+    assert page_response(docs, 2) == {"items": docs[:2], "next_cursor": "1"}
+    assert page_response(docs, 3) == {"items": docs, "next_cursor": None}
+
+
+def test_list_bugs_walks_pages_by_cursor(app):
+    bugs = [{"bug_id": f"BUG-{i}", "title": f"Bug {i}", "description": "Steps"} for i in range(5)]
+
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/bulk", json=bugs)
+            pages, after = [], None
+            while True:
+                params = {"limit": 2, "fields": "bug_id"}
+                if after:
+                    params["after"] = after
+                response = await client.get("/manager/bugs", params=params)
+                assert response.status_code == 200
+                page = response.json()
+                pages.append(page["items"])
+                after = page["next_cursor"]
+                if after is None:
+                    return pages, await client.get("/manager/bugs", params={"after": "bogus"})
+
+    pages, invalid = run(scenario())
+    assert [[bug["bug_id"] for bug in page] for page in pages] == [["BUG-0", "BUG-1"], ["BUG-2", "BUG-3"], ["BUG-4"]]
+    # Only the projected fields (and _id, which the cursor needs) are returned
+    assert all(set(bug) == {"_id", "bug_id"} for page in pages for bug in page)
+    assert invalid.status_code == 400
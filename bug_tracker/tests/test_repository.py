@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from bug_tracker.utils import indexes
+
+from .conftest import run
+
+
+def bug(bug_id, **fields):
+    return {"bug_id": bug_id, "title": f"Bug {bug_id}", "description": "Steps", "status": "Pending", **fields}
+
+
+def test_detects_standalone_server(repository):
+    run(repository.detect_capabilities())
+    assert repository.supports_transactions is False
+
+
+def test_writes_bump_collection_versions(repository):
+    async def scenario():
+        await repository.insert_bug(bug("BUG-1"))
+        await repository.assign_bug("BUG-1", "E1")
+        await repository.insert_employee({"employee_id": "E1"})
+        names = ("bug_collection", "employee_collection", "client_collection")
+        return [await repository.version(name) for name in names]
+
+    (bug_epoch, bugs), (_, employees), clients = run(scenario())
+    assert (bugs, employees) == (2, 1)
+    assert bug_epoch
+    assert clients == ("", 0)
+
+
+def test_insert_bug_with_outbox_queues_events(repository):
+    async def scenario():
+        event = repository.new_outbox_event("calendar.create_event", "BUG-1", {"title": "Bug BUG-1"})
+        await repository.insert_bug_with_outbox(bug("BUG-1"), [event])
+        return await repository.find_bug("BUG-1"), await repository.outbox.find().to_list(length=None)
+
+    stored, events = run(scenario())
+    assert stored["title"] == "Bug BUG-1"
+    assert [(event["aggregate_id"], event["attempts"]) for event in events] == [("BUG-1", 0)]
+
+
+def test_insert_bugs_with_outbox_skips_events_of_failed_inserts(repository):
+    async def scenario():
+        await indexes.ensure_indexes(repository.db)
+        await repository.insert_bug(bug("BUG-1"))
+        bugs = [bug("BUG-0"), bug("BUG-1"), bug("BUG-2")]
+        events = [repository.new_outbox_event("calendar.create_event", b["bug_id"], {}) for b in bugs]
+        errors = await repository.insert_bugs_with_outbox(bugs, events)
+        queued = await repository.outbox.find().to_list(length=None)
+        return errors, [event["aggregate_id"] for event in queued]
+
+    errors, queued = run(scenario())
+    assert list(errors) == [1]
+    assert queued == ["BUG-0", "BUG-2"]
+
+
+def test_assign_returns_the_previous_document(repository):
+    async def scenario():
+        await repository.insert_bug(bug("BUG-1"))
+        first = await repository.assign_bug("BUG-1", "E1")
+        second = await repository.assign_bug("BUG-1", "E2")
+        missing = await repository.assign_bug("BUG-9", "E1")
+        return first, second, missing
+
+    first, second, missing = run(scenario())
+    assert "employee_id" not in first
+    assert second["employee_id"] == "E1"
+    assert missing is None
+
+
+def test_transition_only_matches_allowed_statuses(repository):
+    async def scenario():
+        await repository.insert_bug(bug("BUG-1", employee_id="E1"))
+        event = repository.new_outbox_event("calendar.update_status", "BUG-1", {})
+        wrong_employee = await repository.transition_bug_status("BUG-1", "E2", ["Pending"], "In Progress", [event])
+        wrong_status = await repository.transition_bug_status("BUG-1", "E1", ["In Progress"], "Completed", [event])
+        moved = await repository.transition_bug_status("BUG-1", "E1", ["Pending"], "In Progress", [event])
+        return wrong_employee, wrong_status, moved, await repository.find_bug("BUG-1"), await repository.outbox.count_documents({})
+
+    wrong_employee, wrong_status, moved, stored, queued = run(scenario())
+    assert wrong_employee is None and wrong_status is None
+    assert moved["status"] == "Pending"
+    assert stored["status"] == "In Progress"
+    # Only the matching transition queued its event
+    assert queued == 1
+
+
+def test_list_bugs_pages_by_id(repository):
+    async def scenario():
+        for i in range(3):
+            await repository.insert_bug(bug(f"BUG-{i}"))
+        first = await repository.list_bugs(None, 2, projection={"bug_id": 1})
+        rest = await repository.list_bugs(None, 2, after=first[1]["_id"])
+        return first, rest
+
+    first, rest = run(scenario())
+    # limit + 1 documents tell the caller there is another page
+    assert [doc["bug_id"] for doc in first] == ["BUG-0", "BUG-1", "BUG-2"]
+    assert set(first[0]) == {"_id", "bug_id"}
+    assert [doc["bug_id"] for doc in rest] == ["BUG-2"]
+
+
+def test_idempotent_responses_expire(repository):
+    async def scenario():
+        await repository.save_idempotent_response("fresh", "fp", {"ok": True}, 60)
+        await repository.save_idempotent_response("stale", "fp", {"ok": True}, 60)
+        await repository.idempotency.update_one(
+            {"_id": "stale"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        return await repository.find_idempotent_response("fresh"), await repository.find_idempotent_response("stale")
+
+    fresh, stale = run(scenario())
+    assert fresh["response"] == {"ok": True}
+    assert stale is None
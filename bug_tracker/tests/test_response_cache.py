@@ -0,0 +1,82 @@
+from starlette.requests import Request
+
+from bug_tracker.utils.repository import BugTrackerRepository
+from bug_tracker.utils.response_cache import ResponseCache, etag_matches
+
+from .conftest import run, serve
+
+
+def new_bug(bug_id):
+    return {"bug_id": bug_id, "title": f"Bug {bug_id}", "description": "Steps"}
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_conditional_get_and_invalidation_on_write(app):
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/create", json=new_bug("BUG-1"))
+            first = await client.get("/manager/bugs")
+            etag = first.headers["etag"]
+            unchanged = await client.get("/manager/bugs", headers={"If-None-Match": etag})
+            other_query = await client.get("/manager/bugs", params={"limit": 1})
+            await client.post("/client/bugs/create", json=new_bug("BUG-2"))
+            stale = await client.get("/manager/bugs", headers={"If-None-Match": etag})
+            return first, unchanged, other_query, stale
+
+    first, unchanged, other_query, stale = run(scenario())
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["etag"] == first.headers["etag"]
+    assert other_query.headers["etag"] != first.headers["etag"]
+    assert stale.status_code == 200
+    assert stale.headers["etag"] != first.headers["etag"]
+    assert [bug["bug_id"] for bug in stale.json()["items"]] == ["BUG-1", "BUG-2"]
+
+
+def test_writes_of_another_instance_invalidate(app):
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/create", json=new_bug("BUG-1"))
+            first = await client.get("/manager/bugs")
+            # A second worker process writing to the same database
+            other = BugTrackerRepository()
+            other.connect("mongodb://localhost:27017", app.MONGODB_DB_NAME, client=app.repository.client)
+            await other.insert_bug(new_bug("BUG-2"))
+            second = await client.get("/manager/bugs", headers={"If-None-Match": first.headers["etag"]})
+            return first, second
+
+    first, second = run(scenario())
+    assert second.status_code == 200
+    assert [bug["bug_id"] for bug in second.json()["items"]] == ["BUG-1", "BUG-2"]
+
+
+def request(path, query=b""):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+
+
+def test_lru_keeps_the_most_recently_used_bodies(repository):
+    cache = ResponseCache(repository, max_entries=2)
+    builds = []
+
+    def build(name):
+        async def build_page():
+            builds.append(name)
+            return {"page": name}
+        return build_page
+
+    async def scenario():
+        for name in ("a", "b", "a", "c", "a", "b"):
+            await cache.respond(request(f"/{name}"), "bug_collection", build(name))
+
+    run(scenario())
+    # "b" was evicted when "c" came in, "a" stayed as the most recently used
+    assert builds == ["a", "b", "c", "b"]
+    assert len(cache.bodies) == 2
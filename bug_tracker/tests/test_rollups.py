@@ -0,0 +1,95 @@
+from bug_tracker.utils import indexes
+from bug_tracker.utils.rollups import WorkloadRollups
+
+from .conftest import run, serve
+
+
+def new_bug(bug_id):
+    return {"bug_id": bug_id, "title": f"Bug {bug_id}", "description": "Steps"}
+
+
+def workload(stats):
+    return {employee["employee_id"]: (employee["pending"], employee["in_progress"], employee["completed"])
+            for employee in stats["employees"]}
+
+
+def test_stats_follow_assignments_and_status_changes(app):
+    async def scenario():
+        async with serve(app) as client:
+            # Only the deltas under test change the rollups
+            await app.workload_rollups.stop()
+            for employee_id in ("E1", "E2"):
+                await client.post("/manager/employee/create", json={"employee_id": employee_id, "name": employee_id})
+            await client.post("/client/bugs/bulk", json=[new_bug("BUG-1"), new_bug("BUG-2"), new_bug("BUG-3")])
+            for bug_id, employee_id in [("BUG-1", "E1"), ("BUG-2", "E1"), ("BUG-3", "E2")]:
+                await client.post("/manager/bugs/assign", params={"bug_id": bug_id, "employee_id": employee_id})
+            assigned = (await client.get("/manager/stats")).json()
+
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-2", "employee_id": "E2"})
+            for status in ("In Progress", "Completed"):
+                await client.post("/employee/E1/bugs/update", params={"bug_id": "BUG-1", "status": status})
+            changed = (await client.get("/manager/stats")).json()
+            employees = {
+                employee["employee_id"]: (employee["bugs_pending"], employee["bugs_completed"])
+                for employee in await app.repository.employees.find().to_list(length=None)
+            }
+            return assigned, changed, employees
+
+    assigned, changed, employees = run(scenario())
+    assert workload(assigned) == {"E1": (2, 0, 0), "E2": (1, 0, 0)}
+    assert workload(changed) == {"E1": (0, 0, 1), "E2": (2, 0, 0)}
+    assert changed["totals"] == {"pending": 2, "in_progress": 0, "completed": 1, "total": 3}
+    assert employees == {"E1": (0, 1), "E2": (2, 0)}
+
+
+def test_reconcile_corrects_drift_from_deleted_bugs(app):
+    async def scenario():
+        async with serve(app) as client:
+            # Only the deltas under test change the rollups
+            await app.workload_rollups.stop()
+            await client.post("/client/bugs/bulk", json=[new_bug("BUG-1"), new_bug("BUG-2")])
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-1", "employee_id": "E1"})
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-2", "employee_id": "E2"})
+            # Deleted outside the service, so no delta was applied
+            await app.repository.bugs.delete_one({"bug_id": "BUG-2"})
+            before = (await client.get("/manager/stats")).json()
+            await app.workload_rollups.reconcile()
+            return before, (await client.get("/manager/stats")).json()
+
+    before, after = run(scenario())
+    assert workload(before) == {"E1": (1, 0, 0), "E2": (1, 0, 0)}
+    assert workload(after) == {"E1": (1, 0, 0)}
+    assert after["reconciled_at"] is not None
+
+
+def test_reconcile_keeps_deltas_applied_while_it_runs(repository):
+    async def scenario():
+        await indexes.ensure_indexes(repository.db)
+        await repository.bugs.insert_many([
+            {"bug_id": "BUG-1", "employee_id": "E1", "status": "Pending"},
+            {"bug_id": "BUG-2", "employee_id": "E2", "status": "Pending"},
+        ])
+        await repository.apply_workload_delta("E1", {"pending": 1})
+        versions = await repository.workload_versions()
+        rows = await repository.aggregate_workload()
+        # Assignments that land between the aggregation and the write-back
+        await repository.bugs.insert_one({"bug_id": "BUG-3", "employee_id": "E1", "status": "Pending"})
+        await repository.apply_workload_delta("E1", {"pending": 1})
+        await repository.bugs.insert_one({"bug_id": "BUG-4", "employee_id": "E2", "status": "Pending"})
+        await repository.apply_workload_delta("E2", {"pending": 1})
+
+        rollups = {}
+        for row in rows:
+            rollups[row["_id"]["employee_id"]] = {"pending": row["count"], "in_progress": 0, "completed": 0}
+        skipped = await repository.reconcile_workload_rollups(rollups, versions)
+        stats = {doc["employee_id"]: doc["pending"] for doc in await repository.list_workload_rollups()}
+
+        # The next run catches up
+        await WorkloadRollups(repository).reconcile()
+        caught_up = {doc["employee_id"]: doc["pending"] for doc in await repository.list_workload_rollups()}
+        return sorted(skipped), stats, caught_up
+
+    skipped, stats, caught_up = run(scenario())
+    assert skipped == ["E1", "E2"]
+    assert stats == {"E1": 2, "E2": 1}
+    assert caught_up == {"E1": 2, "E2": 2}
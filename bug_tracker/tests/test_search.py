@@ -0,0 +1,71 @@
+from bug_tracker.utils.search import BugSearch, InvertedIndex, tokenize
+
+from .conftest import run, serve
+
+
+def bug(bug_id, title, description, **fields):
+    return {"bug_id": bug_id, "title": title, "description": description, **fields}
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("The login page is Broken") == ["login", "page", "broken"]
+
+
+def test_title_matches_rank_above_description_matches():
+    index = InvertedIndex()
+    index.add(bug("BUG-1", "Report export", "The login page times out"))
+    index.add(bug("BUG-2", "Login fails", "Nothing happens"))
+    index.add(bug("BUG-3", "Slow dashboard", "Charts render slowly"))
+    assert [bug_id for bug_id, _ in index.search("login", {})] == ["BUG-2", "BUG-1"]
+
+
+def test_filters_and_removal():
+    index = InvertedIndex()
+    index.add(bug("BUG-1", "Login fails", "", status="Pending"))
+    index.add(bug("BUG-2", "Login slow", "", status="Pending"))
+    index.update_filters("BUG-2", status="Completed", employee_id="E1")
+    assert [bug_id for bug_id, _ in index.search("login", {"status": "Completed"})] == ["BUG-2"]
+    assert [bug_id for bug_id, _ in index.search("login", {"employee_id": "E1"})] == ["BUG-2"]
+
+    # Re-adding replaces the old terms
+    index.add(bug("BUG-1", "Export fails", "", status="Pending"))
+    assert [bug_id for bug_id, _ in index.search("login", {})] == ["BUG-2"]
+    index.remove("BUG-2")
+    assert index.search("login", {}) == []
+    assert len(index) == 1
+
+
+def test_falls_back_to_memory_index_without_text_search(repository):
+    async def scenario():
+        await repository.insert_bug(bug("BUG-1", "Login fails", "Steps", status="Pending"))
+        search = BugSearch(repository, backend="auto")
+        await search.start()
+        return search, await search.search("login", {}, 10, 0)
+
+    search, (items, total) = run(scenario())
+    # mongomock has no $text support, so the index is built from the collection at startup
+    assert search.backend == "memory"
+    assert total == 1
+    assert items[0]["bug_id"] == "BUG-1"
+    assert items[0]["score"] > 0
+
+
+def test_search_endpoint_filters_and_pages(app):
+    bugs = [bug(f"BUG-{i}", f"Login fails {i}", "Steps to reproduce") for i in range(3)]
+    bugs.append(bug("BUG-9", "Export is slow", "Steps to reproduce"))
+
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/bulk", json=bugs)
+            await client.post("/manager/bugs/assign", params={"bug_id": "BUG-1", "employee_id": "E1"})
+            first = await client.get("/bugs/search", params={"q": "login", "limit": 2})
+            last = await client.get("/bugs/search", params={"q": "login", "limit": 2, "offset": 2})
+            assigned = await client.get("/bugs/search", params={"q": "login", "employee_id": "E1"})
+            return first.json(), last.json(), assigned.json()
+
+    first, last, assigned = run(scenario())
+    assert (first["total"], first["next_offset"], len(first["items"])) == (3, 2, 2)
+    assert (len(last["items"]), last["next_offset"]) == (1, None)
+    found = {item["bug_id"] for item in first["items"] + last["items"]}
+    assert found == {"BUG-0", "BUG-1", "BUG-2"}
+    assert [item["bug_id"] for item in assigned["items"]] == ["BUG-1"]
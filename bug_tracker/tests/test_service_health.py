@@ -0,0 +1,70 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from bug_tracker.utils import service_health as service_health_module
+
+from .conftest import run
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Health checks answered in-process; counts the calls per URL and can stall a service."""
+    probes = Counter()
+    stalled = set()
+
+    async def request(method, url, **kwargs):
+        probes[url] += 1
+        if url in stalled:
+            await asyncio.sleep(60)
+        return httpx.Response(200, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(service_health_module.http_client, "request", request)
+    probes.stalled = stalled
+    return probes
+
+
+def test_concurrent_callers_share_one_probe_round(probes):
+    health = service_health_module.ServiceHealth(ttl=60, deadline=1)
+
+    async def scenario():
+        return await asyncio.gather(*[health.check_all_services() for _ in range(10)])
+
+    results = run(scenario())
+    assert all(result == dict.fromkeys(health.service_urls, True) for result in results)
+    assert set(probes.values()) == {1}
+    assert len(probes) == len(health.service_urls)
+
+
+def test_results_are_cached_until_the_ttl_expires(probes):
+    health = service_health_module.ServiceHealth(ttl=0.05, deadline=1)
+
+    async def scenario():
+        await health.check_all_services()
+        await health.check_all_services()
+        rounds = [sum(probes.values())]
+        await asyncio.sleep(0.06)
+        await health.check_all_services()
+        rounds.append(sum(probes.values()))
+        return rounds
+
+    services = len(health.service_urls)
+    assert run(scenario()) == [services, 2 * services]
+
+
+def test_slow_service_is_reported_down_at_the_deadline(probes):
+    health = service_health_module.ServiceHealth(ttl=60, deadline=0.05)
+    probes.stalled.add(f"{health.service_urls['version_control']}/health")
+
+    async def scenario():
+        started = time.monotonic()
+        status = await health.check_all_services()
+        return status, time.monotonic() - started
+
+    status, elapsed = run(scenario())
+    assert elapsed < 1
+    assert status["version_control"] is False
+    assert all(status[service_name] for service_name in ["bug_tracker", "code_review", "architectural_model"])
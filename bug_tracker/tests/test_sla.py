@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from bug_tracker.utils.sla import SLAScheduler, deadline_for
+
+from .conftest import run, serve
+
+NOW = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def test_deadline_for_priority():
+    assert deadline_for("critical", NOW) == NOW + timedelta(days=1)
+    assert deadline_for(None, NOW) == NOW + timedelta(days=7)
+    assert deadline_for("unknown", NOW) == NOW + timedelta(days=7)
+
+
+def test_overdue_walks_due_heap_nodes_most_overdue_first(repository):
+    scheduler = SLAScheduler(repository, tick=1, slots=60)
+    for minutes, bug_id in [(-30, "BUG-1"), (-10, "BUG-2"), (-20, "BUG-3"), (5, "BUG-4"), (-40, "BUG-5")]:
+        scheduler.track(bug_id, NOW + timedelta(minutes=minutes))
+    scheduler.untrack("BUG-5")
+    # Moving a deadline leaves a stale heap entry behind, which is skipped
+    scheduler.track("BUG-3", NOW + timedelta(minutes=30))
+
+    assert [bug_id for bug_id, _ in scheduler.overdue(10, NOW)] == ["BUG-1", "BUG-2"]
+    assert [bug_id for bug_id, _ in scheduler.overdue(1, NOW)] == ["BUG-1"]
+    assert scheduler.overdue(10, NOW - timedelta(hours=1)) == []
+
+
+def test_untrack_compacts_stale_heap_entries(repository):
+    scheduler = SLAScheduler(repository, tick=1, slots=60)
+    for i in range(100):
+        scheduler.track(f"BUG-{i}", NOW + timedelta(minutes=i))
+    for i in range(99):
+        scheduler.untrack(f"BUG-{i}")
+    assert len(scheduler.heap) <= 2 * len(scheduler.deadlines) + 64
+    assert scheduler.overdue(10, NOW + timedelta(days=1)) == [("BUG-99", NOW + timedelta(minutes=99))]
+
+
+def test_advance_escalates_due_bugs_once(repository):
+    fired = []
+
+    async def handler(bug_id, deadline):
+        fired.append(bug_id)
+
+    async def scenario():
+        await repository.insert_bug({"bug_id": "BUG-1", "status": "Pending", "deadline": NOW - timedelta(minutes=5)})
+        await repository.insert_bug({"bug_id": "BUG-2", "status": "Pending", "deadline": NOW + timedelta(seconds=30)})
+        await repository.insert_bug({"bug_id": "BUG-3", "status": "Completed", "deadline": NOW - timedelta(minutes=5)})
+        scheduler = SLAScheduler(repository, tick=1, slots=60)
+        scheduler.on_overdue(handler)
+        await scheduler.rebuild()
+
+        # The first run picks up deadlines that passed while the service was down
+        await scheduler.advance(NOW)
+        assert fired == ["BUG-1"]
+        await scheduler.advance(NOW + timedelta(seconds=10))
+        assert fired == ["BUG-1"]
+        await scheduler.advance(NOW + timedelta(seconds=30))
+        assert fired == ["BUG-1", "BUG-2"]
+        # A restarted scheduler doesn't escalate them again
+        restarted = SLAScheduler(repository, tick=1, slots=60)
+        restarted.on_overdue(handler)
+        await restarted.rebuild()
+        await restarted.advance(NOW + timedelta(minutes=1))
+        return scheduler.escalated, await repository.bugs.find_one({"bug_id": "BUG-1"})
+
+    escalated, bug = run(scenario())
+    assert fired == ["BUG-1", "BUG-2"]
+    assert escalated == 2
+    assert bug["escalated_at"] is not None
+
+
+def test_moved_deadline_fires_at_the_new_time(repository):
+    fired = []
+
+    async def handler(bug_id, deadline):
+        fired.append((bug_id, deadline))
+
+    async def scenario():
+        later = NOW + timedelta(seconds=20)
+        await repository.insert_bug({"bug_id": "BUG-1", "status": "Pending", "deadline": later})
+        scheduler = SLAScheduler(repository, tick=1, slots=8)
+        scheduler.on_overdue(handler)
+        scheduler.track("BUG-1", NOW + timedelta(seconds=5))
+        await scheduler.advance(NOW)
+        scheduler.track("BUG-1", later)
+        # The new deadline is more than one revolution away, so its slot is passed once without firing
+        await scheduler.advance(NOW + timedelta(seconds=10))
+        assert fired == []
+        await scheduler.advance(later)
+        return later
+
+    later = run(scenario())
+    assert fired == [("BUG-1", later)]
+
+
+def test_bugs_created_as_completed_are_not_tracked(app):
+    def new_bug(bug_id, status):
+        return {"bug_id": bug_id, "title": f"Bug {bug_id}", "description": "Steps", "status": status}
+
+    async def scenario():
+        async with serve(app) as client:
+            await client.post("/client/bugs/create", json=new_bug("done", "Completed"))
+            await client.post("/client/bugs/create", json=new_bug("open", "Pending"))
+            await client.post("/client/bugs/bulk", json=[new_bug("done-bulk", "Completed"), new_bug("open-bulk", "In Progress")])
+            tracked = set(app.sla_scheduler.deadlines)
+            overdue = [bug_id for bug_id, _ in app.sla_scheduler.overdue(10, datetime.utcnow() + timedelta(days=60))]
+            # The writes must leave the index as a rebuild from the collection would
+            await app.sla_scheduler.rebuild()
+            return tracked, overdue, set(app.sla_scheduler.deadlines)
+
+    tracked, overdue, rebuilt = run(scenario())
+    assert tracked == rebuilt == {"open", "open-bulk"}
+    assert sorted(overdue) == ["open", "open-bulk"]
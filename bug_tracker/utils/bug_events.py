@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import PyMongoError
+
+from .repository import BugTrackerRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+ASSIGNED = "assigned"
+STATUS_CHANGED = "status_changed"
+# A bug missed its SLA deadline
+OVERDUE = "overdue"
+# Tells the client that events were missed and it has to reload the bug list
+RESET = "reset"
+
+Event = Tuple[str, str, Dict[str, Any]]  # (id, type, data)
+
+
+def _json_default(value: Any) -> str:
+    # ISO-8601 like the JSON API; ObjectIds and the rest as strings
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def format_event(event_id: Optional[str], event_type: str, data: Dict[str, Any]) -> str:
+    """One server-sent event in the text/event-stream format."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=_json_default)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def change_to_event(change: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Map a bug collection change stream document to an event type and payload."""
+    bug = change.get("fullDocument") or {}
+    bug.pop("_id", None)
+    if change["operationType"] in ("insert", "replace"):
+        return CREATED, bug
+    updated = change.get("updateDescription", {}).get("updatedFields", {})
+    if "employee_id" in updated:
+        return ASSIGNED, {"bug_id": bug.get("bug_id"), "employee_id": updated["employee_id"]}
+    if "escalated_at" in updated:
+        return OVERDUE, {"bug_id": bug.get("bug_id"), "deadline": bug.get("deadline")}
+    if "status" in updated:
+        return STATUS_CHANGED, {"bug_id": bug.get("bug_id"), "employee_id": bug.get("employee_id"), "status": updated["status"]}
+    return None
+
+
+class Subscription:
+    def __init__(self, size: int):
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+
+class BugEventFeed:
+    """Feed of bug create, assign, status-change and overdue events for /bugs/events.
+
+    With a replica set (or sharded cluster) each subscriber reads a MongoDB
+    change stream and event ids are resume tokens, so a reconnecting client
+    continues where it stopped, even across restarts of this service.
+    Otherwise the request handlers publish events to an in-process
+    broadcaster that keeps the last ``buffer_size`` events for resuming; ids
+    include a per-process boot id, so resuming after a restart (or from too
+    far back) yields a ``reset`` event instead.
+    """
+
+    def __init__(
+        self,
+        repository: BugTrackerRepository,
+        backend: Optional[str] = None,
+        buffer_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        heartbeat: Optional[float] = None
+    ):
+        self.repository = repository
+        self.backend = backend or os.getenv("BUG_EVENTS_BACKEND", "auto")
+        self.buffer_size = buffer_size or int(os.getenv("BUG_EVENTS_BUFFER_SIZE", "1000"))
+        self.queue_size = queue_size or int(os.getenv("BUG_EVENTS_QUEUE_SIZE", "1000"))
+        self.heartbeat = heartbeat or float(os.getenv("BUG_EVENTS_HEARTBEAT", "15"))
+        self.boot_id = uuid.uuid4().hex[:12]
+        self.sequence = 0
+        self.buffer: Deque[Tuple[int, Event]] = deque(maxlen=self.buffer_size)
+        self.subscribers: Set[Subscription] = set()
+
+    async def start(self):
+        if self.backend == "auto":
+            self.backend = "change_stream" if self.repository.supports_transactions else "memory"
+        logger.info(f"Bug event feed using the {self.backend} backend")
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Broadcast an event to in-process subscribers. No-op when change streams are used."""
+        if self.backend == "change_stream":
+            return
+        self.sequence += 1
+        event = (f"{self.boot_id}-{self.sequence}", event_type, data)
+        self.buffer.append((self.sequence, event))
+        for subscription in self.subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up; it gets a reset instead of a gap
+                subscription.overflowed = True
+
+    def _replay(self, last_event_id: str) -> Optional[List[Event]]:
+        """Buffered events after ``last_event_id``, or None if they are not all available."""
+        boot_id, _, sequence = last_event_id.rpartition("-")
+        if boot_id != self.boot_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self.sequence:
+            return None
+        oldest = self.buffer[0][0] if self.buffer else self.sequence + 1
+        if sequence < oldest - 1:
+            return None
+        return [event for event_sequence, event in self.buffer if event_sequence > sequence]
+
+    async def _stream_memory(self, last_event_id: Optional[str]) -> AsyncIterator[str]:
+        subscription = Subscription(self.queue_size)
+        # Replay and subscribe without awaiting in between, so no event falls in the gap
+        replay = self._replay(last_event_id) if last_event_id else []
+        self.subscribers.add(subscription)
+        try:
+            if replay is None:
+                yield format_event(f"{self.boot_id}-{self.sequence}", RESET, {"reason": "resume point no longer available"})
+                replay = []
+            for event in replay:
+                yield format_event(*event)
+            while not subscription.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(*event)
+            yield format_event(None, RESET, {"reason": "client fell behind"})
+        finally:
+            self.subscribers.discard(subscription)
+
+    async def _stream_change_stream(self, last_event_id: Optional[str]) -> AsyncIterator[str]:
+        resume_after = {"_data": last_event_id} if last_event_id else None
+        while True:
+            try:
+                change_stream = self.repository.watch_bugs(resume_after, max_await_time_ms=int(self.heartbeat * 1000))
+                async with change_stream:
+                    while True:
+                        change = await change_stream.try_next()
+                        if change is None:
+                            yield ": keepalive\n\n"
+                            continue
+                        resume_after = change["_id"]
+                        event = change_to_event(change)
+                        if event is not None:
+                            yield format_event(change["_id"]["_data"], *event)
+            except PyMongoError as e:
+                # Motor already resumes after transient errors; this is e.g. an unknown token
+                # or one that fell off the oplog
+                logger.error(f"Bug change stream failed: {str(e)}")
+                if resume_after is None:
+                    return
+                yield format_event(None, RESET, {"reason": "resume point no longer available"})
+                resume_after = None
+
+    def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Server-sent events for one client, starting after ``last_event_id`` if given."""
+        if self.backend == "change_stream":
+            return self._stream_change_stream(last_event_id)
+        return self._stream_memory(last_event_id)
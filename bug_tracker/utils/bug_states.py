@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .repository import BugTrackerRepository
+
+PENDING = "Pending"
+IN_PROGRESS = "In Progress"
+COMPLETED = "Completed"
+
+# Allowed status changes; Completed is final
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    PENDING: (IN_PROGRESS,),
+    IN_PROGRESS: (COMPLETED,),
+    COMPLETED: (),
+}
+
+
+class TransitionError(Exception):
+    """Base class of the reasons a status change is refused."""
+
+
+class UnknownStatus(TransitionError):
+    def __init__(self, status: str):
+        super().__init__(f"Unknown status '{status}', expected one of: {', '.join(TRANSITIONS)}")
+
+
+class BugNotFound(TransitionError):
+    def __init__(self, bug_id: str):
+        super().__init__(f"Bug {bug_id} not found")
+
+
+class NotAssigned(TransitionError):
+    def __init__(self, bug_id: str, employee_id: str):
+        super().__init__(f"Bug {bug_id} is not assigned to employee {employee_id}")
+
+
+class InvalidTransition(TransitionError):
+    def __init__(self, bug_id: str, current: str, requested: str):
+        super().__init__(f"Bug {bug_id} cannot move from '{current}' to '{requested}'")
+        self.current = current
+        self.requested = requested
+
+
+def sources(status: str) -> List[str]:
+    """Statuses from which ``status`` can be reached."""
+    if status not in TRANSITIONS:
+        raise UnknownStatus(status)
+    return [current for current, targets in TRANSITIONS.items() if status in targets]
+
+
+async def transition(
+    repository: BugTrackerRepository,
+    bug_id: str,
+    employee_id: str,
+    status: str,
+    events: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Move a bug assigned to ``employee_id`` to ``status`` and queue ``events`` with it.
+
+    The change is one conditional ``find_one_and_update`` that only matches
+    a valid current status, so concurrent updates can't both succeed.
+    Returns the bug as it was before, or None if it already had ``status``
+    (e.g. a retried request); raises a TransitionError otherwise. The bug
+    is only read again to explain a refused change.
+    """
+    old_bug = await repository.transition_bug_status(bug_id, employee_id, sources(status), status, events)
+    if old_bug is not None:
+        return old_bug
+
+    bug = await repository.find_bug(bug_id)
+    if bug is None:
+        raise BugNotFound(bug_id)
+    if bug.get("employee_id") != employee_id:
+        raise NotAssigned(bug_id, employee_id)
+    if bug.get("status") == status:
+        return None
+    raise InvalidTransition(bug_id, bug.get("status"), status)
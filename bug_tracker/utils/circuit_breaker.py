@@ -0,0 +1,121 @@
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a downstream service whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker over a sliding time window of call outcomes.
+
+    The circuit opens when at least ``min_calls`` calls were made in the last
+    ``window`` seconds and the share of failures reaches ``failure_rate``.
+    While open, calls fail fast with CircuitOpenError. After ``open_seconds``
+    up to ``half_open_calls`` trial calls are let through: a success closes
+    the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        half_open_calls: Optional[int] = None
+    ):
+        self.name = name
+        self.window = window or float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+        self.min_calls = min_calls or int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+        self.failure_rate = failure_rate or float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+        self.open_seconds = open_seconds or float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+        self.half_open_calls = half_open_calls or int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "1"))
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.outcomes: Deque[Tuple[float, bool]] = deque()
+        self.failures = 0
+        self.trials_in_flight = 0
+        self.rejected = 0
+
+    def _prune(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > self.window:
+            _, ok = self.outcomes.popleft()
+            if not ok:
+                self.failures -= 1
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.trials_in_flight = 0
+        logger.warning(f"Circuit for {self.name} opened")
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.trials_in_flight = 0
+        self.outcomes.clear()
+        self.failures = 0
+        logger.info(f"Circuit for {self.name} closed")
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out; otherwise reserve a slot for it."""
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.open_seconds - now
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.trials_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self.trials_in_flight += 1
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            self._close()
+            return
+        now = time.monotonic()
+        self.outcomes.append((now, True))
+        self._prune(now)
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._open(now)
+            return
+        self.outcomes.append((now, False))
+        self.failures += 1
+        self._prune(now)
+        if len(self.outcomes) >= self.min_calls and self.failures / len(self.outcomes) >= self.failure_rate:
+            self._open(now)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._prune(now)
+        calls = len(self.outcomes)
+        return {
+            "state": self.state,
+            "calls_in_window": calls,
+            "failure_rate": round(self.failures / calls, 3) if calls else 0.0,
+            "retry_in": round(max(self.opened_at + self.open_seconds - now, 0.0), 3) if self.state == OPEN else None,
+            "rejected_calls": self.rejected
+        }
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PooledHTTPClient:
+    """Process-wide keep-alive HTTP/1.1 client shared by all outbound integrations."""
+
+    def __init__(self, pool_size: Optional[int] = None, timeout: Optional[float] = None):
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", "20"))
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT", "5"))
+        self.keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.close_timeout = float(os.getenv("HTTP_CLOSE_TIMEOUT", "5"))
+        self.client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Pool-saturation metrics
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.waiting = 0
+        self.total_requests = 0
+        self.saturated_requests = 0
+        self.failed_requests = 0
+        self.pool_wait_seconds = 0.0
+
+    async def start(self):
+        """Create the underlying connection pool."""
+        if self.client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        self.client = httpx.AsyncClient(limits=limits, timeout=self.timeout, http2=False)
+        self._slots = asyncio.Semaphore(self.pool_size)
+        logger.info(f"Started HTTP client pool with {self.pool_size} connections")
+
+    async def close(self, timeout: Optional[float] = None):
+        """Close the connection pool, giving up after ``timeout`` seconds so shutdown can't hang on it."""
+        if self.client is not None:
+            try:
+                await asyncio.wait_for(self.client.aclose(), timeout if timeout is not None else self.close_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out closing the HTTP client pool")
+        self.client = None
+        self._slots = None
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs: Any) -> httpx.Response:
+        """Send a request through the pool, waiting for a free connection if it is saturated."""
+        if self.client is None:
+            await self.start()
+
+        self.total_requests += 1
+        if self._slots.locked():
+            self.saturated_requests += 1
+
+        self.waiting += 1
+        wait_started = time.perf_counter()
+        async with self._slots:
+            self.waiting -= 1
+            self.pool_wait_seconds += time.perf_counter() - wait_started
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                return await self.client.request(
+                    method, url, timeout=timeout if timeout is not None else self.timeout, **kwargs
+                )
+            except httpx.HTTPError:
+                self.failed_requests += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool-saturation metrics."""
+        return {
+            "pool_size": self.pool_size,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": self.waiting,
+            "utilization": self.in_flight / self.pool_size,
+            "total_requests": self.total_requests,
+            "saturated_requests": self.saturated_requests,
+            "failed_requests": self.failed_requests,
+            "pool_wait_seconds_total": round(self.pool_wait_seconds, 6)
+        }
+
+
+# Create a singleton instance
+http_client = PooledHTTPClient()
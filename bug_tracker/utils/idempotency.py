@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo.errors import PyMongoError
+
+from .repository import BugTrackerRepository, IDEMPOTENCY_PENDING
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyStore:
+    """Runs a request handler at most once per ``Idempotency-Key``.
+
+    Completed responses are stored in the idempotency collection (expired by
+    a TTL index) and in an in-process LRU, so a replay is answered from
+    memory without touching the bug collection, the outbox or any downstream
+    service. Concurrent requests with the same key wait for the first one
+    instead of running the handler again: in-process on a shared future,
+    across processes by reserving the key with a pending entry in the
+    collection (its unique ``_id`` decides who runs the handler) and polling
+    that entry until the response is stored. A waiter gives up with a 409
+    after ``wait_seconds``; a reservation left by a crashed process expires
+    after ``lock_seconds``. A key reused with a different request body is
+    rejected with a 422.
+    """
+
+    def __init__(
+        self,
+        repository: BugTrackerRepository,
+        ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        lock_seconds: Optional[float] = None,
+        wait_seconds: Optional[float] = None,
+        poll_interval: float = 0.1
+    ):
+        self.repository = repository
+        self.ttl = ttl or float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+        self.cache_size = cache_size or int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+        self.lock_seconds = lock_seconds or float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+        self.wait_seconds = wait_seconds or float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+        self.poll_interval = poll_interval
+        # key -> (monotonic expiry, request fingerprint, response)
+        self.cache: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        # key -> (request fingerprint, future resolved with the response)
+        self.in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _check_fingerprint(stored: str, fingerprint: str):
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+
+    def _cached(self, key: str) -> Optional[Tuple[float, str, Any]]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return entry
+
+    def _remember(self, key: str, fingerprint: str, response: Any, ttl: float):
+        self.cache[key] = (time.monotonic() + ttl, fingerprint, response)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def _run_once(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Reserve ``key`` across processes, then run ``handler``, or wait for the process holding it."""
+        deadline = time.monotonic() + self.wait_seconds
+        while not await self.repository.reserve_idempotency_key(key, fingerprint, self.lock_seconds):
+            stored = await self.repository.find_idempotent_response(key)
+            if stored is None:
+                # The holder failed and released the key, or its reservation expired; try again
+                continue
+            self._check_fingerprint(stored["fingerprint"], fingerprint)
+            # Entries written before reservations existed have no state and hold a response
+            if stored.get("state") != IDEMPOTENCY_PENDING:
+                remaining = (stored["expires_at"] - stored["created_at"]).total_seconds()
+                self._remember(key, fingerprint, stored["response"], min(remaining, self.ttl))
+                return stored["response"], True
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress, retry later"
+                )
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            response = await handler()
+        except BaseException:
+            # Failed requests are not stored, so the client can retry them
+            try:
+                await self.repository.release_idempotency_key(key)
+            except PyMongoError as e:
+                logger.error(f"Failed to release idempotency key {key}: {str(e)}")
+            raise
+        self._remember(key, fingerprint, response, self.ttl)
+        try:
+            await self.repository.save_idempotent_response(key, fingerprint, response, self.ttl)
+        except PyMongoError as e:
+            # The request itself succeeded; replays are still served from the in-process cache
+            logger.error(f"Failed to store response for idempotency key {key}: {str(e)}")
+        return response, False
+
+    async def execute(self, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return ``(response, replayed)``; ``handler`` only runs if no response is stored for ``key``."""
+        entry = self._cached(key)
+        if entry is not None:
+            self._check_fingerprint(entry[1], fingerprint)
+            return entry[2], True
+
+        if key in self.in_flight:
+            stored_fingerprint, future = self.in_flight[key]
+            self._check_fingerprint(stored_fingerprint, fingerprint)
+            # Shield so one waiter disconnecting doesn't cancel the shared result
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't warn about an unretrieved exception then
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.in_flight[key] = (fingerprint, future)
+        try:
+            response, replayed = await self._run_once(key, fingerprint, handler)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+        finally:
+            del self.in_flight[key]
+        return response, replayed
@@ -0,0 +1,105 @@
+import logging
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from .search import SEARCH_WEIGHTS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Indexes the service relies on, per collection
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "bug_collection": [
+        IndexModel([("bug_id", ASCENDING)], name="bug_id_unique", unique=True),
+        IndexModel([("employee_id", ASCENDING), ("status", ASCENDING)], name="employee_id_status"),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT)],
+            name="title_description_text",
+            weights=SEARCH_WEIGHTS
+        ),
+    ],
+    "employee_collection": [
+        IndexModel([("employee_id", ASCENDING)], name="employee_id_unique", unique=True),
+    ],
+    "client_collection": [
+        IndexModel([("client_id", ASCENDING)], name="client_id_unique", unique=True),
+    ],
+    "manager_collection": [
+        IndexModel([("manager_id", ASCENDING)], name="manager_id_unique", unique=True),
+    ],
+    "employee_stats_collection": [
+        IndexModel([("employee_id", ASCENDING)], name="employee_id_unique", unique=True),
+    ],
+    "outbox_collection": [
+        IndexModel([("next_attempt_at", ASCENDING)], name="next_attempt_at"),
+        # Finds the oldest event of each aggregate, which is the only one that may be delivered
+        IndexModel([("aggregate_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="aggregate_order"),
+        IndexModel([("lease", ASCENDING)], name="lease"),
+    ],
+    "idempotency_collection": [
+        # Each entry carries its own expiry time, so changing IDEMPOTENCY_TTL needs no index change
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Result of the last bootstrap, reported by the admin endpoint
+last_report: Dict[str, Dict[str, str]] = {}
+
+
+def _key_fields(key) -> List[tuple]:
+    if hasattr(key, "items"):
+        return [tuple(field) for field in key.items()]
+    return [tuple(field) for field in key]
+
+
+def _matches(existing: Dict[str, Any], spec: Dict[str, Any]) -> bool:
+    """Compare an index_information() entry with an IndexModel document."""
+    if "weights" in spec:
+        # Text indexes are stored under the internal _fts/_ftsx key
+        return existing.get("weights", {}) == dict(spec["weights"])
+    return (
+        _key_fields(existing["key"]) == _key_fields(spec["key"])
+        and bool(existing.get("unique")) == bool(spec.get("unique"))
+        and existing.get("expireAfterSeconds") == spec.get("expireAfterSeconds")
+    )
+
+
+async def ensure_indexes(db) -> Dict[str, Dict[str, str]]:
+    """Create missing indexes and verify existing ones. Safe to run on every startup."""
+    report: Dict[str, Dict[str, str]] = {}
+    for collection_name, models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        report[collection_name] = {}
+        try:
+            existing = await collection.index_information()
+        except PyMongoError:
+            existing = {}
+
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            if name in existing:
+                report[collection_name][name] = "ok" if _matches(existing[name], spec) else "mismatch"
+                continue
+            try:
+                await collection.create_indexes([model])
+                report[collection_name][name] = "created"
+            except (PyMongoError, NotImplementedError) as e:
+                # e.g. duplicate values already stored under a unique key
+                logger.error(f"Failed to create index {name} on {collection_name}: {str(e)}")
+                report[collection_name][name] = f"error: {str(e)}"
+
+    last_report.clear()
+    last_report.update(report)
+    return report
+
+
+async def describe_indexes(db) -> Dict[str, Any]:
+    """Indexes currently present on each managed collection."""
+    return {
+        collection_name: await db[collection_name].index_information()
+        for collection_name in INDEX_SPECS
+    }
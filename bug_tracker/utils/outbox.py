@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .repository import BugTrackerRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class OutboxWorker:
+    """Drains the outbox collection and delivers events to their handlers.
+
+    A handler signals failure by raising; the event is then retried with
+    exponential backoff and moved to the dead-letter collection once
+    ``max_attempts`` is reached. Events of the same aggregate are delivered
+    one at a time in the order they were written, a retry included, so a
+    bug's status updates can't reach the calendar out of order.
+    """
+
+    def __init__(
+        self,
+        repository: BugTrackerRepository,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.repository = repository
+        self.batch_size = batch_size or int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+        self.poll_interval = poll_interval or float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+        self.base_delay = base_delay or float(os.getenv("OUTBOX_RETRY_BASE_DELAY", "2"))
+        self.max_delay = max_delay or float(os.getenv("OUTBOX_RETRY_MAX_DELAY", "300"))
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+        self.lease_seconds = lease_seconds or float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+        self.handlers: Dict[str, Handler] = {}
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, event_type: str, handler: Handler):
+        """Register the coroutine function that delivers events of ``event_type``."""
+        self.handlers[event_type] = handler
+
+    def notify(self):
+        """Wake the worker early, e.g. right after new events were written."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+
+    async def _deliver(self, event: Dict[str, Any]):
+        handler = self.handlers.get(event["event_type"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for {event['event_type']}")
+            await handler(event["payload"])
+        except Exception as e:
+            attempts = event.get("attempts", 0) + 1
+            error = str(e) or type(e).__name__
+            if attempts >= self.max_attempts:
+                logger.error(f"Dead-lettering {event['event_type']} for {event['aggregate_id']} after {attempts} attempts: {error}")
+                await self.repository.dead_letter_outbox_event(event, attempts, error)
+                self.dead_lettered += 1
+            else:
+                next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_delay(attempts))
+                await self.repository.retry_outbox_event(event["_id"], attempts, next_attempt_at, error)
+                self.retried += 1
+            return
+
+        await self.repository.complete_outbox_event(event["_id"])
+        self.delivered += 1
+
+    async def drain_once(self) -> int:
+        """Claim one batch of due events, at most one per aggregate, and deliver them concurrently."""
+        events = await self.repository.claim_outbox_events(self.batch_size, self.lease_seconds)
+        if events:
+            await asyncio.gather(*(self._deliver(event) for event in events))
+        return len(events)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                drained = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {str(e)}")
+                drained = 0
+            if drained < self.batch_size:
+                # Not wait_for: before Python 3.12 it drops a cancellation that
+                # arrives as the wakeup fires, and stop() would wait forever
+                waiter = asyncio.ensure_future(self._wakeup.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=self.poll_interval)
+                finally:
+                    waiter.cancel()
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered
+        }
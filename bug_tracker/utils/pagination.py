@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def decode_cursor(after: Optional[str]) -> Optional[ObjectId]:
+    """Turn an ``after`` cursor back into the ``_id`` it points past."""
+    if not after:
+        return None
+    try:
+        return ObjectId(after)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {after}")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Build a projection from ``fields=a,b`` (include) or ``fields=-a,-b`` (exclude)."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    excluded = [name[1:] for name in names if name.startswith("-")]
+    if excluded and len(excluded) != len(names):
+        raise HTTPException(status_code=400, detail="fields cannot mix included and excluded names")
+    if "_id" in excluded:
+        raise HTTPException(status_code=400, detail="_id is required for pagination and cannot be excluded")
+    if excluded:
+        return {name: 0 for name in excluded}
+    return {name: 1 for name in names}
+
+
+class PageParams:
+    """Keyset pagination on ``_id`` plus an optional field projection."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return, or -field to omit")
+    ):
+        self.limit = limit
+        self.after = decode_cursor(after)
+        self.projection = parse_fields(fields)
+
+
+def page_response(docs: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """Wrap one page of serialized documents; ``docs`` holds up to ``limit + 1`` items, the extra one signals more."""
+    has_more = len(docs) > limit
+    items = docs[:limit]
+    return {
+        "items": items,
+        "next_cursor": items[-1]["_id"] if has_more else None
+    }
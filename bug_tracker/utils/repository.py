@@ -0,0 +1,530 @@
+import functools
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from .metrics import mongo_command_metrics
+
+DUPLICATE_KEY_ERROR = 11000
+
+# States of an idempotency entry: reserved by a running request, or holding its response
+IDEMPOTENCY_PENDING = "pending"
+IDEMPOTENCY_COMPLETED = "completed"
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def bumps(*collection_names: str):
+    """Increment the version of ``collection_names`` after the decorated write, even if it failed part-way."""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                for name in collection_names:
+                    await self.bump_version(name)
+        return wrapper
+    return decorator
+
+
+def _at_version(employee_id: str, seq: int) -> Dict[str, Any]:
+    # Rollups written before seq existed count as version 0
+    return {"employee_id": employee_id, "seq": seq if seq else {"$in": [0, None]}}
+
+
+class BugTrackerRepository:
+    """Async data-access layer for the bug tracker collections."""
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db = None
+        self.supports_transactions = False
+
+    def connect(self, mongodb_url: str, db_name: str, client: Optional[AsyncIOMotorClient] = None):
+        """Open the Motor client. An existing client may be passed in (e.g. for benchmarks)."""
+        self.client = client or AsyncIOMotorClient(mongodb_url, event_listeners=[mongo_command_metrics])
+        self.db = self.client[db_name]
+        logger.info(f"Connected repository to database '{db_name}'")
+
+    async def detect_capabilities(self):
+        """Multi-document transactions need a replica set or a sharded cluster."""
+        try:
+            hello = await self.client.admin.command("ismaster")
+            self.supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            logger.warning(f"Could not detect MongoDB topology: {str(e)}")
+            self.supports_transactions = False
+        logger.info(f"MongoDB transactions {'enabled' if self.supports_transactions else 'unavailable'}")
+
+    def close(self):
+        """Close the Motor client."""
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.db = None
+
+    @property
+    def employees(self):
+        return self.db["employee_collection"]
+
+    @property
+    def bugs(self):
+        return self.db["bug_collection"]
+
+    @property
+    def managers(self):
+        return self.db["manager_collection"]
+
+    @property
+    def clients(self):
+        return self.db["client_collection"]
+
+    @property
+    def employee_stats(self):
+        return self.db["employee_stats_collection"]
+
+    @property
+    def outbox(self):
+        return self.db["outbox_collection"]
+
+    @property
+    def outbox_dead_letter(self):
+        return self.db["outbox_dead_letter_collection"]
+
+    @property
+    def idempotency(self):
+        return self.db["idempotency_collection"]
+
+    @property
+    def collection_versions(self):
+        return self.db["collection_versions"]
+
+    async def _find_page(self, collection, query, limit, after, projection) -> List[Dict[str, Any]]:
+        """Fetch ``limit + 1`` documents past ``after`` in ``_id`` order (keyset pagination)."""
+        query = dict(query or {})
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        cursor = collection.find(query, projection).sort("_id", 1).limit(limit + 1)
+        return await cursor.to_list(length=limit + 1)
+
+    # --------------------- VERSIONS ---------------------
+
+    async def version(self, collection_name: str) -> Tuple[str, int]:
+        """``(epoch, version)`` of a collection, shared by every instance; used for ETags and response caching.
+
+        The epoch is set when the counter document is created, so tags issued
+        before it was lost (e.g. a restored database) can't match again.
+        """
+        document = await self.collection_versions.find_one({"_id": collection_name})
+        if document is None:
+            return "", 0
+        return document["epoch"], document["version"]
+
+    async def bump_version(self, collection_name: str):
+        try:
+            await self.collection_versions.update_one(
+                {"_id": collection_name},
+                {"$inc": {"version": 1}, "$setOnInsert": {"epoch": uuid.uuid4().hex[:12]}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            # The write itself went through; cached responses of the collection may be served until the next bump
+            logger.error(f"Failed to bump the version of {collection_name}: {str(e)}")
+
+    # --------------------- BUGS ---------------------
+
+    async def find_bug(self, bug_id: str) -> Optional[Dict[str, Any]]:
+        return await self.bugs.find_one({"bug_id": bug_id})
+
+    @bumps("bug_collection")
+    async def insert_bug(self, bug: Dict[str, Any]):
+        return await self.bugs.insert_one(bug)
+
+    @bumps("bug_collection")
+    async def insert_bug_with_outbox(self, bug: Dict[str, Any], events: List[Dict[str, Any]]):
+        """Insert a bug together with its outbox events.
+
+        Uses a transaction when the deployment supports one; on a standalone
+        server the outbox write follows the bug insert directly.
+        """
+        if self.supports_transactions:
+            async with await self.client.start_session() as session:
+                async with session.start_transaction():
+                    result = await self.bugs.insert_one(bug, session=session)
+                    if events:
+                        await self.outbox.insert_many(events, session=session)
+                    return result
+
+        result = await self.bugs.insert_one(bug)
+        if events:
+            await self.outbox.insert_many(events)
+        return result
+
+    @bumps("bug_collection")
+    async def insert_bugs_with_outbox(self, bugs: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Insert many bugs with an unordered ``insert_many`` and queue the events of the inserted ones.
+
+        ``events[i]`` belongs to ``bugs[i]``. Returns the write error per failed
+        position; every other position was inserted. The outbox events are
+        written in one batch after the bugs, since a transaction would roll back
+        the whole batch on a single duplicate.
+        """
+        errors: Dict[int, Dict[str, Any]] = {}
+        if not bugs:
+            return errors
+        try:
+            await self.bugs.insert_many(bugs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error
+
+        queued = [event for index, event in enumerate(events) if index not in errors]
+        if queued:
+            await self.outbox.insert_many(queued)
+        return errors
+
+    @bumps("bug_collection")
+    async def assign_bug(self, bug_id: str, employee_id: str) -> Optional[Dict[str, Any]]:
+        """Assign a bug and return the document as it was before the update."""
+        return await self.bugs.find_one_and_update(
+            {"bug_id": bug_id},
+            {"$set": {"employee_id": employee_id}},
+            projection={"status": 1, "employee_id": 1}
+        )
+
+    @bumps("bug_collection")
+    async def transition_bug_status(
+        self,
+        bug_id: str,
+        employee_id: str,
+        from_statuses: List[str],
+        status: str,
+        events: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Set a bug's status if its current one is in ``from_statuses`` and queue ``events``.
+
+        Returns the document as it was before the update, or None (and queues
+        nothing) if no bug matched. Like insert_bug_with_outbox, the outbox
+        write shares a transaction with the update when the deployment supports one.
+        """
+        query = {"bug_id": bug_id, "employee_id": employee_id, "status": {"$in": from_statuses}}
+        update = {"$set": {"status": status}}
+        projection = {"status": 1, "employee_id": 1}
+        if self.supports_transactions:
+            async with await self.client.start_session() as session:
+                async with session.start_transaction():
+                    old_bug = await self.bugs.find_one_and_update(query, update, projection=projection, session=session)
+                    if old_bug is not None and events:
+                        await self.outbox.insert_many(events, session=session)
+                    return old_bug
+
+        old_bug = await self.bugs.find_one_and_update(query, update, projection=projection)
+        if old_bug is not None and events:
+            await self.outbox.insert_many(events)
+        return old_bug
+
+    def watch_bugs(self, resume_after: Optional[Dict[str, Any]] = None, max_await_time_ms: Optional[int] = None):
+        """Change stream of bug inserts and updates (replica sets and sharded clusters only)."""
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "replace", "update"]}}}]
+        return self.bugs.watch(
+            pipeline,
+            full_document="updateLookup",
+            resume_after=resume_after,
+            max_await_time_ms=max_await_time_ms
+        )
+
+    async def iter_open_bug_deadlines(self) -> AsyncIterator[Dict[str, Any]]:
+        """Deadline fields of every bug that isn't completed."""
+        projection = {"bug_id": 1, "priority": 1, "deadline": 1, "escalated_at": 1}
+        async for bug in self.bugs.find({"status": {"$ne": "Completed"}}, projection):
+            yield bug
+
+    @bumps("bug_collection")
+    async def mark_bug_escalated(self, bug_id: str, deadline: datetime) -> bool:
+        """Record that an open bug missed ``deadline``; False if it was already escalated or changed meanwhile."""
+        result = await self.bugs.update_one(
+            {"bug_id": bug_id, "status": {"$ne": "Completed"}, "escalated_at": None,
+             "$or": [{"deadline": deadline}, {"deadline": {"$exists": False}}]},
+            {"$set": {"escalated_at": datetime.utcnow()}}
+        )
+        return result.modified_count == 1
+
+    async def list_bugs(self, query: Optional[Dict[str, Any]], limit: int, after=None, projection=None) -> List[Dict[str, Any]]:
+        return await self._find_page(self.bugs, query, limit, after, projection)
+
+    async def iter_bugs(self, query: Optional[Dict[str, Any]], batch_size: int, projection=None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream bugs from the cursor, ``batch_size`` documents per round trip."""
+        async for bug in self.bugs.find(query or {}, projection).sort("_id", 1).batch_size(batch_size):
+            yield bug
+
+    async def find_bugs(self, bug_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self.bugs.find({"bug_id": {"$in": bug_ids}}).to_list(length=None)
+
+    async def supports_text_search(self) -> bool:
+        """Whether ``$text`` queries work (they need the text index and a real MongoDB)."""
+        try:
+            await self.bugs.find_one({"$text": {"$search": "probe"}})
+            return True
+        except (PyMongoError, NotImplementedError):
+            return False
+
+    async def text_search_bugs(self, query: str, filters: Dict[str, Any], limit: int, offset: int):
+        """Search the text index; returns one page of bugs ordered by ``score`` and the total match count."""
+        match = dict(filters, **{"$text": {"$search": query}})
+        score = {"score": {"$meta": "textScore"}}
+        cursor = self.bugs.find(match, score).sort([("score", {"$meta": "textScore"})]).skip(offset).limit(limit)
+        return await cursor.to_list(length=limit), await self.bugs.count_documents(match)
+
+    # --------------------- EMPLOYEES ---------------------
+
+    async def find_employee(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        return await self.employees.find_one({"employee_id": employee_id})
+
+    @bumps("employee_collection")
+    async def insert_employee(self, employee: Dict[str, Any]):
+        return await self.employees.insert_one(employee)
+
+    # --------------------- WORKLOAD ROLLUPS ---------------------
+
+    @bumps("employee_collection")
+    async def apply_workload_delta(self, employee_id: str, delta: Dict[str, int]):
+        """Apply per-status count changes to the employee's rollup and counters, each in one atomic $inc."""
+        await self.employee_stats.update_one(
+            {"employee_id": employee_id},
+            # seq counts the deltas, so reconciliation can tell that one landed while it ran
+            {"$inc": dict(delta, seq=1), "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        await self.employees.update_one(
+            {"employee_id": employee_id},
+            {"$inc": {
+                "bugs_pending": delta.get("pending", 0) + delta.get("in_progress", 0),
+                "bugs_completed": delta.get("completed", 0)
+            }}
+        )
+
+    async def aggregate_workload(self) -> List[Dict[str, Any]]:
+        """Count assigned bugs per employee and status straight from the bug collection."""
+        pipeline = [
+            {"$match": {"employee_id": {"$exists": True, "$ne": None}}},
+            {"$group": {"_id": {"employee_id": "$employee_id", "status": "$status"}, "count": {"$sum": 1}}}
+        ]
+        return await self.bugs.aggregate(pipeline).to_list(length=None)
+
+    async def workload_versions(self) -> Dict[str, int]:
+        """The delta counter (``seq``) of every rollup, read before aggregating."""
+        cursor = self.employee_stats.find({}, {"employee_id": 1, "seq": 1})
+        return {doc["employee_id"]: doc.get("seq", 0) async for doc in cursor}
+
+    @bumps("employee_collection")
+    async def reconcile_workload_rollups(self, rollups: Dict[str, Dict[str, int]], versions: Dict[str, int]) -> List[str]:
+        """Overwrite rollups and employee counters with aggregated values, unless a delta landed meanwhile.
+
+        ``versions`` are the ``seq`` counters from ``workload_versions``, read
+        before the aggregation. Each rollup is set (or, without assigned bugs,
+        deleted) only if its counter hasn't moved since; otherwise the $inc
+        that moved it would be lost. Returns the employees left for the next run.
+        """
+        now = datetime.utcnow()
+        skipped: List[str] = []
+        for employee_id, counts in rollups.items():
+            document = dict(counts, updated_at=now)
+            if employee_id in versions:
+                result = await self.employee_stats.update_one(_at_version(employee_id, versions[employee_id]), {"$set": document})
+                reconciled = result.matched_count == 1
+            else:
+                # A delta's upsert creates the rollup first, so the unique index rejects this one
+                try:
+                    await self.employee_stats.insert_one(dict(document, employee_id=employee_id, seq=0))
+                    reconciled = True
+                except DuplicateKeyError:
+                    reconciled = False
+            if not reconciled:
+                skipped.append(employee_id)
+                continue
+            await self.employees.update_one({"employee_id": employee_id}, {"$set": {
+                "bugs_pending": counts["pending"] + counts["in_progress"],
+                "bugs_completed": counts["completed"]
+            }})
+
+        for employee_id, seq in versions.items():
+            if employee_id not in rollups:
+                result = await self.employee_stats.delete_one(_at_version(employee_id, seq))
+                if not result.deleted_count:
+                    skipped.append(employee_id)
+
+        await self.employees.update_many(
+            {"employee_id": {"$nin": list(rollups) + skipped}},
+            {"$set": {"bugs_pending": 0, "bugs_completed": 0}}
+        )
+        return skipped
+
+    async def list_workload_rollups(self) -> List[Dict[str, Any]]:
+        return await self.employee_stats.find({}, {"_id": 0}).sort("employee_id", 1).to_list(length=None)
+
+    async def list_employees(self, limit: int, after=None, projection=None) -> List[Dict[str, Any]]:
+        return await self._find_page(self.employees, None, limit, after, projection)
+
+    # --------------------- MANAGERS ---------------------
+
+    async def find_manager(self, manager_id: str) -> Optional[Dict[str, Any]]:
+        return await self.managers.find_one({"manager_id": manager_id})
+
+    @bumps("manager_collection")
+    async def insert_manager(self, manager: Dict[str, Any]):
+        return await self.managers.insert_one(manager)
+
+    async def list_managers(self, limit: int, after=None, projection=None) -> List[Dict[str, Any]]:
+        return await self._find_page(self.managers, None, limit, after, projection)
+
+    # --------------------- CLIENTS ---------------------
+
+    async def find_client(self, client_id: str) -> Optional[Dict[str, Any]]:
+        return await self.clients.find_one({"client_id": client_id})
+
+    @bumps("client_collection")
+    async def insert_client(self, client: Dict[str, Any]):
+        return await self.clients.insert_one(client)
+
+    async def list_clients(self, limit: int, after=None, projection=None) -> List[Dict[str, Any]]:
+        return await self._find_page(self.clients, None, limit, after, projection)
+
+    # --------------------- OUTBOX ---------------------
+
+    @staticmethod
+    def new_outbox_event(event_type: str, aggregate_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "event_type": event_type,
+            "aggregate_id": aggregate_id,
+            "payload": payload,
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+            "locked_until": now,
+            "last_error": None
+        }
+
+    async def claim_outbox_events(self, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` due events so concurrent workers don't deliver them twice.
+
+        Events of one aggregate (e.g. the status changes of one bug) are
+        delivered one at a time in creation order: only the oldest event of
+        each aggregate can be claimed, and only while it isn't leased or
+        waiting for a retry. The claim is one ``update_many`` stamping a
+        lease token, followed by a ``find`` on that token.
+        """
+        now = datetime.utcnow()
+        heads = await self.outbox.aggregate([
+            {"$sort": {"aggregate_id": 1, "created_at": 1, "_id": 1}},
+            {"$group": {
+                "_id": "$aggregate_id",
+                "event_id": {"$first": "$_id"},
+                "next_attempt_at": {"$first": "$next_attempt_at"},
+                "locked_until": {"$first": "$locked_until"}
+            }},
+            {"$match": {"next_attempt_at": {"$lte": now}, "locked_until": {"$lte": now}}},
+            {"$sort": {"next_attempt_at": 1}},
+            {"$limit": limit}
+        ]).to_list(length=limit)
+        if not heads:
+            return []
+
+        lease = uuid.uuid4().hex
+        # The due/unlocked conditions are checked again per event, so a concurrent claim can't win it too
+        await self.outbox.update_many(
+            {
+                "_id": {"$in": [head["event_id"] for head in heads]},
+                "next_attempt_at": {"$lte": now},
+                "locked_until": {"$lte": now}
+            },
+            {"$set": {"locked_until": now + timedelta(seconds=lease_seconds), "lease": lease}}
+        )
+        return await self.outbox.find({"lease": lease}).sort("next_attempt_at", 1).to_list(length=limit)
+
+    async def complete_outbox_event(self, event_id):
+        return await self.outbox.delete_one({"_id": event_id})
+
+    async def retry_outbox_event(self, event_id, attempts: int, next_attempt_at: datetime, error: str):
+        return await self.outbox.update_one(
+            {"_id": event_id},
+            {"$set": {
+                "attempts": attempts,
+                "next_attempt_at": next_attempt_at,
+                "locked_until": next_attempt_at,
+                "lease": None,
+                "last_error": error
+            }}
+        )
+
+    async def dead_letter_outbox_event(self, event: Dict[str, Any], attempts: int, error: str):
+        """Move an event that exhausted its retries to the dead-letter collection."""
+        dead = dict(event, attempts=attempts, last_error=error, dead_lettered_at=datetime.utcnow())
+        await self.outbox_dead_letter.insert_one(dead)
+        await self.outbox.delete_one({"_id": event["_id"]})
+
+    async def outbox_counts(self) -> Dict[str, int]:
+        return {
+            "pending": await self.outbox.count_documents({}),
+            "dead_lettered": await self.outbox_dead_letter.count_documents({})
+        }
+
+    # --------------------- IDEMPOTENCY ---------------------
+
+    async def find_idempotent_response(self, key: str) -> Optional[Dict[str, Any]]:
+        # The TTL monitor only runs once a minute, so expired entries are filtered here too
+        return await self.idempotency.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+
+    async def reserve_idempotency_key(self, key: str, fingerprint: str, lock_seconds: float) -> bool:
+        """Claim ``key`` with a pending entry; False if another request holds it or has completed it.
+
+        The unique ``_id`` makes the insert the arbiter between processes. An
+        entry past its expiry that the TTL monitor hasn't removed yet is
+        deleted and the insert retried once.
+        """
+        now = datetime.utcnow()
+        entry = {
+            "_id": key,
+            "state": IDEMPOTENCY_PENDING,
+            "fingerprint": fingerprint,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=lock_seconds)
+        }
+        for _ in range(2):
+            try:
+                await self.idempotency.insert_one(dict(entry))
+                return True
+            except DuplicateKeyError:
+                expired = await self.idempotency.delete_one({"_id": key, "expires_at": {"$lte": now}})
+                if not expired.deleted_count:
+                    return False
+        return False
+
+    async def release_idempotency_key(self, key: str):
+        """Drop a pending entry, so the key can be retried after the request failed."""
+        return await self.idempotency.delete_one({"_id": key, "state": IDEMPOTENCY_PENDING})
+
+    async def save_idempotent_response(self, key: str, fingerprint: str, response: Any, ttl_seconds: float):
+        now = datetime.utcnow()
+        return await self.idempotency.replace_one(
+            {"_id": key},
+            {
+                "state": IDEMPOTENCY_COMPLETED,
+                "fingerprint": fingerprint,
+                "response": response,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl_seconds)
+            },
+            upsert=True
+        )
+
+
+# Create a singleton instance
+repository = BugTrackerRepository()
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .repository import BugTrackerRepository
+
+# (path, sorted query parameters, collection epoch, collection version)
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...], str, int]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.replace("W/", "", 1) == etag for candidate in candidates)
+
+
+class ResponseCache:
+    """Conditional GET support and an LRU of rendered bodies for list endpoints.
+
+    A response is identified by its path, its query parameters and the write
+    version of the collection it reads (see ``BugTrackerRepository.version``).
+    The ETag is derived from those alone, so ``If-None-Match`` is answered
+    with a 304 after reading one counter document, without running the list
+    query. The counters live in MongoDB and are bumped by every instance's
+    writes, so tags and cached bodies stay valid across instances.
+    """
+
+    def __init__(self, repository: BugTrackerRepository, max_entries: Optional[int] = None):
+        self.repository = repository
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+        self.bodies: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+
+    def etag(self, key: CacheKey) -> str:
+        digest = hashlib.sha1(repr(key[:2]).encode()).hexdigest()[:16]
+        return f'"{key[2]}-{key[3]}-{digest}"'
+
+    def _get(self, key: CacheKey) -> Optional[bytes]:
+        body = self.bodies.get(key)
+        if body is not None:
+            self.bodies.move_to_end(key)
+        return body
+
+    def _put(self, key: CacheKey, body: bytes):
+        self.bodies[key] = body
+        while len(self.bodies) > self.max_entries:
+            self.bodies.popitem(last=False)
+
+    async def respond(self, request: Request, collection_name: str, build: Callable[[], Awaitable[Any]]) -> Response:
+        """Serve ``build()``'s result as JSON with an ETag, from the cache when possible."""
+        # Read the version before querying: a concurrent write then only ever makes the
+        # body newer than its tag, never older
+        epoch, version = await self.repository.version(collection_name)
+        key: CacheKey = (request.url.path, tuple(sorted(request.query_params.multi_items())), epoch, version)
+        etag = self.etag(key)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self._get(key)
+        if body is None:
+            content = jsonable_encoder(await build())
+            body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+            self._put(key, body)
+        return Response(body, media_type="application/json", headers=headers)
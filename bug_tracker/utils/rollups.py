@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .repository import BugTrackerRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rollup counter per bug status
+STATUS_FIELDS = {
+    "Pending": "pending",
+    "In Progress": "in_progress",
+    "Completed": "completed"
+}
+
+
+def empty_counts() -> Dict[str, int]:
+    return {field: 0 for field in STATUS_FIELDS.values()}
+
+
+class WorkloadRollups:
+    """Per-employee bug counts by status, kept in the employee_stats collection.
+
+    Every assignment or status change applies a delta with ``$inc``; a
+    periodic aggregation over the bug collection rebuilds the rollups to
+    correct any drift (e.g. writes made outside this service). A change
+    whose bug write and delta straddle a whole reconciliation can still be
+    counted twice; the next run corrects it.
+    """
+
+    def __init__(self, repository: BugTrackerRepository, interval: Optional[float] = None):
+        self.repository = repository
+        self.interval = interval or float(os.getenv("ROLLUP_RECONCILE_INTERVAL", "3600"))
+        self.reconciled_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def record_assignment(self, old_bug: Dict[str, Any], employee_id: str):
+        """Move a bug's count from its previous assignee (if any) to ``employee_id``."""
+        field = STATUS_FIELDS.get(old_bug.get("status"))
+        previous = old_bug.get("employee_id")
+        if field is None or previous == employee_id:
+            return
+        if previous:
+            await self.repository.apply_workload_delta(previous, {field: -1})
+        await self.repository.apply_workload_delta(employee_id, {field: 1})
+
+    async def record_status_change(self, employee_id: str, old_status: str, new_status: str):
+        """Move a bug's count between status counters of its assignee."""
+        old_field = STATUS_FIELDS.get(old_status)
+        new_field = STATUS_FIELDS.get(new_status)
+        if old_field == new_field:
+            return
+        delta = {}
+        if old_field:
+            delta[old_field] = -1
+        if new_field:
+            delta[new_field] = 1
+        await self.repository.apply_workload_delta(employee_id, delta)
+
+    async def reconcile(self):
+        """Rebuild all rollups from the bug collection with an aggregation pipeline.
+
+        Rollups that received a delta while the pipeline ran are left as they
+        are until the next run, instead of being overwritten with counts that
+        may predate it.
+        """
+        versions = await self.repository.workload_versions()
+        rollups: Dict[str, Dict[str, int]] = {}
+        for row in await self.repository.aggregate_workload():
+            field = STATUS_FIELDS.get(row["_id"].get("status"))
+            if field is None:
+                continue
+            counts = rollups.setdefault(row["_id"]["employee_id"], empty_counts())
+            counts[field] += row["count"]
+        skipped = await self.repository.reconcile_workload_rollups(rollups, versions)
+        self.reconciled_at = datetime.utcnow()
+        logger.info(f"Reconciled workload rollups for {len(rollups)} employees")
+        if skipped:
+            logger.info(f"Workload rollups of {len(skipped)} employees changed during reconciliation, left for the next run")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Workload reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def summary(self) -> Dict[str, Any]:
+        """Workload per employee plus totals, read from the rollups only."""
+        employees = []
+        totals = empty_counts()
+        for rollup in await self.repository.list_workload_rollups():
+            counts = {field: rollup.get(field, 0) for field in totals}
+            for field, count in counts.items():
+                totals[field] += count
+            employees.append({"employee_id": rollup["employee_id"], **counts, "total": sum(counts.values())})
+        return {
+            "employees": employees,
+            "totals": {**totals, "total": sum(totals.values())},
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None
+        }
@@ -0,0 +1,127 @@
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .repository import BugTrackerRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Field weights, shared with the MongoDB text index
+SEARCH_WEIGHTS = {"title": 5, "description": 1}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "with"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """In-memory full-text index over bug titles and descriptions.
+
+    Used when MongoDB text search is unavailable (e.g. mongomock in CI).
+    Scores are weighted term frequencies times inverse document frequency.
+    """
+
+    def __init__(self, weights: Dict[str, int] = SEARCH_WEIGHTS):
+        self.weights = weights
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.terms: Dict[str, List[str]] = {}
+        self.filters: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.filters)
+
+    def add(self, bug: Dict[str, Any]):
+        bug_id = bug["bug_id"]
+        self.remove(bug_id)
+        weighted: Counter = Counter()
+        for field, weight in self.weights.items():
+            for token in tokenize(bug.get(field) or ""):
+                weighted[token] += weight
+        for token, frequency in weighted.items():
+            self.postings.setdefault(token, {})[bug_id] = frequency
+        self.terms[bug_id] = list(weighted)
+        self.filters[bug_id] = {"status": bug.get("status"), "employee_id": bug.get("employee_id")}
+
+    def remove(self, bug_id: str):
+        for token in self.terms.pop(bug_id, []):
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(bug_id, None)
+                if not posting:
+                    del self.postings[token]
+        self.filters.pop(bug_id, None)
+
+    def update_filters(self, bug_id: str, **fields: Any):
+        if bug_id in self.filters:
+            self.filters[bug_id].update(fields)
+
+    def search(self, query: str, filters: Dict[str, Any]) -> List[Tuple[str, float]]:
+        """All matching bug ids with their score, best first."""
+        scores: Dict[str, float] = {}
+        total = len(self.filters) or 1
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + total / len(posting))
+            for bug_id, frequency in posting.items():
+                scores[bug_id] = scores.get(bug_id, 0.0) + frequency * idf
+
+        matches = [
+            (bug_id, score) for bug_id, score in scores.items()
+            if all(self.filters[bug_id].get(field) == value for field, value in filters.items())
+        ]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+
+class BugSearch:
+    """Relevance-ranked bug search over the MongoDB text index, or the in-memory index as a fallback."""
+
+    def __init__(self, repository: BugTrackerRepository, backend: Optional[str] = None):
+        self.repository = repository
+        self.backend = backend or os.getenv("SEARCH_BACKEND", "auto")
+        self.index = InvertedIndex()
+
+    @property
+    def uses_memory(self) -> bool:
+        return self.backend == "memory"
+
+    async def start(self):
+        """Pick the backend and, for the in-memory one, build the index from the bug collection."""
+        if self.backend == "auto":
+            self.backend = "mongo" if await self.repository.supports_text_search() else "memory"
+        if self.uses_memory:
+            async for bug in self.repository.iter_bugs(None, 1000, {"bug_id": 1, "title": 1, "description": 1, "status": 1, "employee_id": 1}):
+                self.index.add(bug)
+        logger.info(f"Bug search uses the {self.backend} backend")
+
+    def on_created(self, bug: Dict[str, Any]):
+        if self.uses_memory:
+            self.index.add(bug)
+
+    def on_updated(self, bug_id: str, **fields: Any):
+        if self.uses_memory:
+            self.index.update_filters(bug_id, **fields)
+
+    async def search(self, query: str, filters: Dict[str, Any], limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of matching bugs (each with a ``score``) and the total number of matches."""
+        if not self.uses_memory:
+            return await self.repository.text_search_bugs(query, filters, limit, offset)
+
+        matches = self.index.search(query, filters)
+        page = matches[offset:offset + limit]
+        bugs = {bug["bug_id"]: bug for bug in await self.repository.find_bugs([bug_id for bug_id, _ in page])}
+        items = [dict(bugs[bug_id], score=score) for bug_id, score in page if bug_id in bugs]
+        return items, len(matches)
@@ -1,14 +1,20 @@
-import requests
+import asyncio
+import httpx
 import logging
-from typing import Dict, Optional
+import os
+import time
+from typing import Any, Dict, Optional
 from fastapi import HTTPException
+from .http_client import http_client
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .metrics import outbound_request_duration
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ServiceHealth:
-    def __init__(self):
+    def __init__(self, ttl: Optional[float] = None, deadline: Optional[float] = None):
         self.service_urls = {
             "bug_tracker": "http://bug-tracker:8000",
             "code_review": "http://code-review:8001",
@@ -16,8 +22,52 @@ class ServiceHealth:
             "version_control": "http://version-control:8002"
         }
         self.service_status: Dict[str, bool] = {}
+        # Results of a probe round are reused for `ttl` seconds; a round never takes longer than `deadline`
+        self.ttl = ttl if ttl is not None else float(os.getenv("SERVICE_STATUS_TTL", "5"))
+        self.deadline = deadline if deadline is not None else float(os.getenv("SERVICE_STATUS_DEADLINE", "3"))
+        self.checked_at: Optional[float] = None
+        self._round: Optional[asyncio.Future] = None
+        # One circuit breaker per downstream service called from this process
+        self.breakers: Dict[str, CircuitBreaker] = {
+            service_name: CircuitBreaker(service_name)
+            for service_name in ["calendar", "forum", "code_review", "version_control"]
+        }
+
+    def breaker(self, service_name: str) -> CircuitBreaker:
+        """Get the circuit breaker of a downstream service, creating it on first use."""
+        if service_name not in self.breakers:
+            self.breakers[service_name] = CircuitBreaker(service_name)
+        return self.breakers[service_name]
+
+    async def request(self, service_name: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Call a downstream service through its circuit breaker.
+
+        Raises CircuitOpenError without sending anything while the circuit is
+        open. Transport errors and 5xx responses count as failures.
+        """
+        breaker = self.breaker(service_name)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            outbound_request_duration.observe(0.0, service=service_name, outcome="rejected")
+            raise
+        started = time.perf_counter()
+        try:
+            response = await http_client.request(method, url, **kwargs)
+        except BaseException:
+            # Includes cancellation, so a half-open trial slot is never leaked
+            breaker.record_failure()
+            outbound_request_duration.observe(time.perf_counter() - started, service=service_name, outcome="error")
+            raise
+        outcome = "failure" if response.status_code >= 500 else "success"
+        if outcome == "failure":
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        outbound_request_duration.observe(time.perf_counter() - started, service=service_name, outcome=outcome)
+        return response
 
-    async def check_service(self, service_name: str) -> bool:
+    async def check_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
         """Check if a specific service is available."""
         try:
             if service_name not in self.service_urls:
@@ -25,20 +75,47 @@ class ServiceHealth:
                 return False
 
             url = f"{self.service_urls[service_name]}/health"
-            response = requests.get(url, timeout=5)
+            response = await self.request(service_name, "GET", url, timeout=timeout or 5)
             is_available = response.status_code == 200
             self.service_status[service_name] = is_available
             return is_available
-        except (requests.exceptions.RequestException, requests.exceptions.Timeout) as e:
+        except (httpx.HTTPError, CircuitOpenError) as e:
             logger.error(f"Error checking {service_name} service availability: {str(e)}")
             self.service_status[service_name] = False
             return False
 
+    async def _probe_all(self):
+        """Probe every service concurrently; services that miss the deadline count as unavailable."""
+        probes = {
+            service_name: asyncio.ensure_future(self.check_service(service_name, timeout=self.deadline))
+            for service_name in self.service_urls
+        }
+        _, pending = await asyncio.wait(probes.values(), timeout=self.deadline)
+        for service_name, probe in probes.items():
+            if probe in pending:
+                probe.cancel()
+                logger.error(f"{service_name} health check missed the {self.deadline}s deadline")
+                self.service_status[service_name] = False
+        self.checked_at = time.monotonic()
+
+    def _is_fresh(self) -> bool:
+        return self.checked_at is not None and time.monotonic() - self.checked_at < self.ttl
+
     async def check_all_services(self) -> Dict[str, bool]:
-        """Check availability of all services."""
-        for service_name in self.service_urls:
-            await self.check_service(service_name)
-        return self.service_status
+        """Check availability of all services.
+
+        Cached for `ttl` seconds; concurrent callers share a single probe round.
+        """
+        if not self._is_fresh():
+            if self._round is None or self._round.done():
+                self._round = asyncio.ensure_future(self._probe_all())
+            # Shield so a disconnecting caller doesn't cancel the round for everyone else
+            await asyncio.shield(self._round)
+        return dict(self.service_status)
+
+    def breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every circuit breaker."""
+        return {service_name: breaker.snapshot() for service_name, breaker in self.breakers.items()}
 
     def get_service_status(self, service_name: str) -> Optional[bool]:
         """Get the last known status of a service."""
@@ -53,4 +130,4 @@ class ServiceHealth:
             )
 
 # Create a singleton instance
-service_health = ServiceHealth() 
\ No newline at end of file
+service_health = ServiceHealth()
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+class ServiceProber:
+    """Refreshes a shared service-status dict from background tasks.
+
+    Each registered service is probed on its own loop. Healthy services are
+    re-probed every ``interval`` seconds; failing ones back off exponentially
+    up to ``max_backoff``. All delays are jittered so replicas don't probe in
+    lockstep. Request handlers only read the cached status.
+    """
+
+    def __init__(
+        self,
+        status: Dict[str, bool],
+        interval: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        jitter: float = 0.2,
+        stale_after: Optional[float] = None
+    ):
+        self.status = status
+        self.interval = interval or float(os.getenv("SERVICE_PROBE_INTERVAL", "10"))
+        self.max_backoff = max_backoff or float(os.getenv("SERVICE_PROBE_MAX_BACKOFF", "60"))
+        self.jitter = jitter
+        stale_env = os.getenv("SERVICE_STATUS_STALE_AFTER")
+        self.stale_after = stale_after if stale_after is not None else (float(stale_env) if stale_env else None)
+        self.probes: Dict[str, Probe] = {}
+        self.checked_at: Dict[str, float] = {}
+        self.failures: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, service_name: str, probe: Probe):
+        """Register a coroutine function returning whether the service is up."""
+        self.probes[service_name] = probe
+
+    def record(self, service_name: str, available: bool):
+        """Record an observed status, e.g. a failure seen on the request path."""
+        self.status[service_name] = available
+        self.checked_at[service_name] = time.monotonic()
+        self.failures[service_name] = 0 if available else self.failures.get(service_name, 0) + 1
+
+    def next_delay(self, service_name: str) -> float:
+        """Seconds until the next probe, with exponential backoff and jitter."""
+        failures = self.failures.get(service_name, 0)
+        delay = self.interval if failures == 0 else min(self.interval * 2 ** failures, self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def probe(self, service_name: str) -> bool:
+        """Run one probe and record its result."""
+        try:
+            available = await self.probes[service_name]()
+        except Exception as e:
+            logger.error(f"Probe for {service_name} failed: {str(e)}")
+            available = False
+        self.record(service_name, available)
+        return available
+
+    async def _run(self, service_name: str):
+        while True:
+            await self.probe(service_name)
+            await asyncio.sleep(self.next_delay(service_name))
+
+    async def start(self):
+        """Start one background probe loop per registered service."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run(name)) for name in self.probes]
+        logger.info(f"Started service prober for {', '.join(self.probes)}")
+
+    async def stop(self):
+        """Cancel the background probe loops."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def is_stale(self, service_name: str) -> bool:
+        if self.stale_after is None:
+            return False
+        checked_at = self.checked_at.get(service_name)
+        return checked_at is None or time.monotonic() - checked_at > self.stale_after
+
+    def is_available(self, service_name: str) -> bool:
+        """Cached status of a service; a status older than ``stale_after`` counts as unavailable."""
+        return bool(self.status.get(service_name)) and not self.is_stale(service_name)
+
+    def snapshot(self) -> Dict[str, bool]:
+        """Effective cached status of every tracked service."""
+        return {name: self.is_available(name) for name in self.status}
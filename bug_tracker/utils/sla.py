@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .repository import BugTrackerRepository
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Time allowed to complete a bug, per priority
+PRIORITY_DEADLINES: Dict[str, timedelta] = {
+    "critical": timedelta(days=1),
+    "high": timedelta(days=7),
+    "medium": timedelta(days=14),
+    "low": timedelta(days=30),
+}
+DEFAULT_PRIORITY = "high"
+
+OverdueHandler = Callable[[str, datetime], Awaitable[Any]]
+
+
+def deadline_for(priority: Optional[str], created_at: datetime) -> datetime:
+    return created_at + PRIORITY_DEADLINES.get(priority or DEFAULT_PRIORITY, PRIORITY_DEADLINES[DEFAULT_PRIORITY])
+
+
+class SLAScheduler:
+    """Tracks the deadlines of open bugs and escalates the ones that pass them.
+
+    Deadlines are kept in a binary min-heap, so the overdue bugs are found by
+    walking only the heap nodes that are due (O(k) for k results) instead of
+    scanning the collection. Escalations are timed by a hashed timer wheel
+    of ``slots`` buckets of ``tick`` seconds: each tick looks at one bucket
+    and fires the entries due by then. The index is rebuilt from MongoDB at
+    startup and kept current by ``track``/``untrack`` on writes. Removals
+    are lazy: heap and wheel entries whose deadline no longer matches
+    ``deadlines`` are skipped, and the heap is compacted once they dominate.
+    """
+
+    def __init__(self, repository: BugTrackerRepository, tick: Optional[float] = None, slots: Optional[int] = None):
+        self.repository = repository
+        self.tick = tick or float(os.getenv("SLA_TICK_SECONDS", "1"))
+        self.slots = slots or int(os.getenv("SLA_WHEEL_SLOTS", "3600"))
+        # bug_id -> current deadline of every open bug
+        self.deadlines: Dict[str, datetime] = {}
+        self.heap: List[Tuple[datetime, str]] = []
+        # Each slot holds (tick number, bug_id, deadline) entries
+        self.wheel: List[List[Tuple[int, str, datetime]]] = [[] for _ in range(self.slots)]
+        self.current_tick: Optional[int] = None
+        self.handlers: List[OverdueHandler] = []
+        self.escalated = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def on_overdue(self, handler: OverdueHandler):
+        """Register a coroutine function called with (bug_id, deadline) when a bug is escalated."""
+        self.handlers.append(handler)
+
+    def _tick_of(self, moment: datetime) -> int:
+        # Naive datetimes in this service are UTC
+        return math.ceil(moment.replace(tzinfo=timezone.utc).timestamp() / self.tick)
+
+    def _schedule(self, bug_id: str, deadline: datetime):
+        tick = self._tick_of(deadline)
+        if self.current_tick is not None:
+            # Already due: fire on the next tick
+            tick = max(tick, self.current_tick + 1)
+        self.wheel[tick % self.slots].append((tick, bug_id, deadline))
+
+    def track(self, bug_id: str, deadline: datetime, escalated: bool = False):
+        """Add or move a bug's deadline. Already escalated bugs are indexed but not scheduled again."""
+        if self.deadlines.get(bug_id) == deadline:
+            return
+        self.deadlines[bug_id] = deadline
+        heapq.heappush(self.heap, (deadline, bug_id))
+        if not escalated:
+            self._schedule(bug_id, deadline)
+
+    def untrack(self, bug_id: str):
+        """Forget a bug, e.g. once it is completed."""
+        if self.deadlines.pop(bug_id, None) is not None and len(self.heap) > 2 * len(self.deadlines) + 64:
+            self._compact()
+
+    def _compact(self):
+        self.heap = [(deadline, bug_id) for bug_id, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
+
+    def overdue(self, limit: int, now: Optional[datetime] = None) -> List[Tuple[str, datetime]]:
+        """Up to ``limit`` open bugs past their deadline, most overdue first.
+
+        Walks the heap from the root and only descends into due nodes, so the
+        cost depends on the number of results rather than the number of bugs.
+        """
+        now = now or datetime.utcnow()
+        results: List[Tuple[str, datetime]] = []
+        frontier: List[Tuple[datetime, int]] = []
+        if self.heap and self.heap[0][0] <= now:
+            frontier.append((self.heap[0][0], 0))
+        while frontier and len(results) < limit:
+            deadline, index = heapq.heappop(frontier)
+            bug_id = self.heap[index][1]
+            if self.deadlines.get(bug_id) == deadline:
+                results.append((bug_id, deadline))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self.heap) and self.heap[child][0] <= now:
+                    heapq.heappush(frontier, (self.heap[child][0], child))
+        return results
+
+    async def rebuild(self):
+        """Reload the deadlines of all open bugs from MongoDB."""
+        self.deadlines.clear()
+        self.heap = []
+        self.wheel = [[] for _ in range(self.slots)]
+        async for bug in self.repository.iter_open_bug_deadlines():
+            deadline = bug.get("deadline") or deadline_for(bug.get("priority"), bug["_id"].generation_time.replace(tzinfo=None))
+            self.track(bug["bug_id"], deadline, escalated=bug.get("escalated_at") is not None)
+        logger.info(f"SLA index rebuilt with {len(self.deadlines)} open bugs")
+
+    async def _escalate(self, bug_id: str, deadline: datetime):
+        # Conditional update: another instance or a concurrent status change may have won
+        if not await self.repository.mark_bug_escalated(bug_id, deadline):
+            return
+        self.escalated += 1
+        logger.warning(f"Bug {bug_id} missed its deadline of {deadline.isoformat()}")
+        for handler in self.handlers:
+            try:
+                await handler(bug_id, deadline)
+            except Exception as e:
+                logger.error(f"SLA escalation handler failed for {bug_id}: {str(e)}")
+
+    async def advance(self, now: Optional[datetime] = None):
+        """Process every tick up to ``now``, firing the escalations that became due."""
+        target = self._tick_of(now or datetime.utcnow())
+        if self.current_tick is None:
+            # First run: visit every slot once to pick up deadlines that passed while we were down
+            self.current_tick = target - self.slots
+        # After a long pause a full revolution already visits every slot
+        first = max(self.current_tick + 1, target - self.slots + 1)
+        due = []
+        for tick in range(first, target + 1):
+            slot = self.wheel[tick % self.slots]
+            keep = []
+            for entry in slot:
+                entry_tick, bug_id, deadline = entry
+                if entry_tick > target:
+                    keep.append(entry)
+                elif self.deadlines.get(bug_id) == deadline:
+                    due.append((bug_id, deadline))
+            slot[:] = keep
+        self.current_tick = target
+        for bug_id, deadline in due:
+            await self._escalate(bug_id, deadline)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.advance()
+            except Exception as e:
+                logger.error(f"SLA tick failed: {str(e)}")
+            await asyncio.sleep(self.tick)
+
+    async def start(self):
+        if self._task is None:
+            await self.rebuild()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
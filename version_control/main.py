@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Body
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 import os
 import shutil
 import git
@@ -10,8 +10,13 @@ from pydantic import BaseModel
 import logging
 import json
 from datetime import datetime
+from contextlib import contextmanager
 from version_control.utils.service_health import service_health
 from version_control.middleware.service_check import ServiceCheckMiddleware
+from version_control.utils.commit_engine import CommitError, RefConflict, commit_changes
+from version_control.utils.commit_log import InvalidCursor, make_cursor, read_log, resolve_cursor
+from version_control.utils.repo_cache import repo_cache
+from version_control.utils.repo_locks import repo_locks
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +40,15 @@ app.add_middleware(
 # Add middleware
 app.add_middleware(ServiceCheckMiddleware)
 
+@app.on_event("startup")
+async def startup_event():
+    repo_cache.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await repo_locks.shutdown()
+    await repo_cache.stop()
+
 # Base directory for repositories
 REPOS_DIR = os.environ.get("REPOS_DIR", "/app/repositories")
 
@@ -67,17 +81,37 @@ def repo_exists(repo_name: str) -> bool:
     repo_path = get_repo_path(repo_name)
     return os.path.exists(repo_path) and os.path.isdir(repo_path)
 
-def get_repo(repo_name: str) -> git.Repo:
-    """Get a Git repository object."""
+@contextmanager
+def open_repo(repo_name: str) -> Iterator[git.Repo]:
+    """Lease a cached Git repository object for the duration of the block."""
     if not repo_exists(repo_name):
+        repo_cache.invalidate(repo_name)
         raise HTTPException(status_code=404, detail=f"Repository '{repo_name}' not found")
     
     repo_path = get_repo_path(repo_name)
     try:
-        return git.Repo(repo_path)
+        with repo_cache.lease(repo_name, repo_path) as repo:
+            yield repo
     except git.InvalidGitRepositoryError:
         raise HTTPException(status_code=400, detail=f"'{repo_name}' is not a valid Git repository")
 
+def get_branch_commit(repo: git.Repo, branch: str) -> git.Commit:
+    """Get the commit a branch points to."""
+    try:
+        return repo.heads[branch].commit
+    except IndexError:
+        raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
+
+def read_blob(commit: git.Commit, file_path: str) -> Optional[bytes]:
+    """Read a file from a commit's tree, or None if there is no such file."""
+    try:
+        item = commit.tree / file_path.strip("/")
+    except KeyError:
+        return None
+    if item.type != "blob":
+        return None
+    return item.data_stream.read()
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -103,229 +137,216 @@ async def list_repositories():
 @app.post("/repos/{repo_name}")
 async def create_repository(repo_name: str):
     """Create a new repository."""
-    repo_path = get_repo_path(repo_name)
-    
-    if repo_exists(repo_name):
-        raise HTTPException(status_code=400, detail=f"Repository '{repo_name}' already exists")
-    
-    try:
-        # Create the repository directory
-        os.makedirs(repo_path, exist_ok=True)
+    def write():
+        repo_path = get_repo_path(repo_name)
         
-        # Initialize a new Git repository
-        repo = git.Repo.init(repo_path)
+        if repo_exists(repo_name):
+            raise HTTPException(status_code=400, detail=f"Repository '{repo_name}' already exists")
         
-        # Create an initial README.md file
-        readme_path = os.path.join(repo_path, "README.md")
-        with open(readme_path, "w") as f:
-            f.write(f"# {repo_name}\n\nThis repository was created by the Version Control Microservice.")
-        
-        # Add and commit the README file
-        repo.git.add("README.md")
-        repo.git.config("user.name", "Version Control Service")
-        repo.git.config("user.email", "service@example.com")
-        repo.git.commit("-m", "Initial commit")
-        
-        return {"message": f"Repository '{repo_name}' created successfully"}
-    except Exception as e:
-        # Clean up if something went wrong
-        if os.path.exists(repo_path):
-            shutil.rmtree(repo_path, ignore_errors=True)
-        
-        logger.error(f"Error creating repository: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to create repository: {str(e)}")
+        try:
+            # Create the repository directory
+            os.makedirs(repo_path, exist_ok=True)
+            
+            # Initialize a new Git repository
+            repo = git.Repo.init(repo_path)
+            
+            # Create an initial README.md file
+            readme_path = os.path.join(repo_path, "README.md")
+            with open(readme_path, "w") as f:
+                f.write(f"# {repo_name}\n\nThis repository was created by the Version Control Microservice.")
+            
+            # Add and commit the README file
+            repo.git.add("README.md")
+            repo.git.config("user.name", "Version Control Service")
+            repo.git.config("user.email", "service@example.com")
+            repo.git.commit("-m", "Initial commit")
+            
+            return {"message": f"Repository '{repo_name}' created successfully"}
+        except Exception as e:
+            # Clean up if something went wrong
+            if os.path.exists(repo_path):
+                shutil.rmtree(repo_path, ignore_errors=True)
+            
+            logger.error(f"Error creating repository: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to create repository: {str(e)}")
+    
+    return await repo_locks.write(repo_name, write)
 
 @app.delete("/repos/{repo_name}")
 async def delete_repository(repo_name: str):
     """Delete a repository."""
-    repo_path = get_repo_path(repo_name)
-    
-    if not repo_exists(repo_name):
-        raise HTTPException(status_code=404, detail=f"Repository '{repo_name}' not found")
+    def write():
+        repo_path = get_repo_path(repo_name)
+        
+        if not repo_exists(repo_name):
+            raise HTTPException(status_code=404, detail=f"Repository '{repo_name}' not found")
+        
+        try:
+            shutil.rmtree(repo_path)
+            repo_cache.invalidate(repo_name)
+            return {"message": f"Repository '{repo_name}' deleted successfully"}
+        except Exception as e:
+            logger.error(f"Error deleting repository: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to delete repository: {str(e)}")
     
-    try:
-        shutil.rmtree(repo_path)
-        return {"message": f"Repository '{repo_name}' deleted successfully"}
-    except Exception as e:
-        logger.error(f"Error deleting repository: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to delete repository: {str(e)}")
+    result = await repo_locks.write(repo_name, write)
+    repo_locks.forget(repo_name)
+    return result
 
 @app.get("/repos/{repo_name}/branches")
 async def list_branches(repo_name: str):
     """List all branches in a repository."""
-    repo = get_repo(repo_name)
+    def read():
+        with open_repo(repo_name) as repo:
+            try:
+                branches = [branch.name for branch in repo.branches]
+                return {"branches": branches}
+            except Exception as e:
+                logger.error(f"Error listing branches: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to list branches: {str(e)}")
     
-    try:
-        branches = [branch.name for branch in repo.branches]
-        return {"branches": branches}
-    except Exception as e:
-        logger.error(f"Error listing branches: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to list branches: {str(e)}")
+    return await repo_locks.read(repo_name, read)
 
 @app.post("/repos/{repo_name}/branches")
 async def create_branch(repo_name: str, branch_data: BranchCreate):
     """Create a new branch in a repository."""
-    repo = get_repo(repo_name)
+    def write():
+        with open_repo(repo_name) as repo:
+            try:
+                # Check if the branch already exists
+                if branch_data.name in [branch.name for branch in repo.branches]:
+                    raise HTTPException(status_code=400, detail=f"Branch '{branch_data.name}' already exists")
+                
+                # Check if the source branch exists
+                if branch_data.source_branch not in [branch.name for branch in repo.branches]:
+                    raise HTTPException(status_code=404, detail=f"Source branch '{branch_data.source_branch}' not found")
+                
+                # Create the new branch
+                source_branch = repo.branches[branch_data.source_branch]
+                repo.create_head(branch_data.name, source_branch)
+                
+                return {"message": f"Branch '{branch_data.name}' created successfully"}
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error creating branch: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to create branch: {str(e)}")
     
-    try:
-        # Check if the branch already exists
-        if branch_data.name in [branch.name for branch in repo.branches]:
-            raise HTTPException(status_code=400, detail=f"Branch '{branch_data.name}' already exists")
-        
-        # Check if the source branch exists
-        if branch_data.source_branch not in [branch.name for branch in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Source branch '{branch_data.source_branch}' not found")
-        
-        # Create the new branch
-        source_branch = repo.branches[branch_data.source_branch]
-        repo.create_head(branch_data.name, source_branch)
-        
-        return {"message": f"Branch '{branch_data.name}' created successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating branch: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to create branch: {str(e)}")
+    return await repo_locks.write(repo_name, write)
 
 @app.get("/repos/{repo_name}/commits")
-async def list_commits(repo_name: str, branch: Optional[str] = None):
-    """List commits in a repository, optionally filtered by branch."""
-    repo = get_repo(repo_name)
+async def list_commits(
+    repo_name: str,
+    branch: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    path: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    stats: bool = False
+):
+    """List commits in a repository, optionally filtered by branch, paths and date, a page at a time."""
+    def read():
+        with open_repo(repo_name) as repo:
+            try:
+                if cursor:
+                    # The cursor pins the tip the first page was read from
+                    tip, offset = resolve_cursor(repo, cursor)
+                elif branch:
+                    tip, offset = get_branch_commit(repo, branch).hexsha, 0
+                else:
+                    tip, offset = repo.head.commit.hexsha, 0
+                
+                # One extra commit tells whether there is a next page
+                commits = read_log(repo, tip, offset, limit + 1, path, since, until, stats)
+                next_cursor = make_cursor(tip, offset + limit) if len(commits) > limit else None
+                
+                return {"commits": commits[:limit], "next_cursor": next_cursor}
+            except HTTPException:
+                raise
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error listing commits: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to list commits: {str(e)}")
     
-    try:
-        if branch:
-            if branch not in [b.name for b in repo.branches]:
-                raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-            commits = list(repo.iter_commits(branch))
-        else:
-            commits = list(repo.iter_commits())
-        
-        commit_list = []
-        for commit in commits:
-            commit_list.append({
-                "id": commit.hexsha,
-                "message": commit.message,
-                "author": {
-                    "name": commit.author.name,
-                    "email": commit.author.email
-                },
-                "date": commit.committed_datetime.isoformat(),
-                "stats": {
-                    "files_changed": len(commit.stats.files),
-                    "insertions": commit.stats.total["insertions"],
-                    "deletions": commit.stats.total["deletions"]
-                }
-            })
-        
-        return {"commits": commit_list}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error listing commits: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to list commits: {str(e)}")
+    return await repo_locks.read(repo_name, read)
 
 @app.get("/repos/{repo_name}/files")
 async def list_files(repo_name: str, branch: Optional[str] = "main"):
     """List files in a repository branch."""
-    repo = get_repo(repo_name)
+    def read():
+        with open_repo(repo_name) as repo:
+            try:
+                commit = get_branch_commit(repo, branch)
+                
+                # Walk the branch's tree objects; the working tree is not touched
+                files = [item.path for item in commit.tree.traverse() if item.type == "blob"]
+                
+                return {"files": files}
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error listing files: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to list files: {str(e)}")
     
-    try:
-        if branch not in [b.name for b in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-        
-        # Checkout the branch
-        repo.git.checkout(branch)
-        
-        # Get the repository root directory
-        repo_root = repo.working_dir
-        
-        # List all files (excluding .git directory)
-        files = []
-        for root, dirs, filenames in os.walk(repo_root):
-            # Skip .git directory
-            if '.git' in dirs:
-                dirs.remove('.git')
-            
-            for filename in filenames:
-                file_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(file_path, repo_root)
-                files.append(rel_path)
-        
-        return {"files": files}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error listing files: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to list files: {str(e)}")
+    return await repo_locks.read(repo_name, read)
 
 @app.get("/repos/{repo_name}/files/{file_path:path}")
 async def get_file_content(repo_name: str, file_path: str, branch: Optional[str] = "main"):
     """Get the content of a file in a repository branch."""
-    repo = get_repo(repo_name)
+    def read():
+        with open_repo(repo_name) as repo:
+            try:
+                commit = get_branch_commit(repo, branch)
+                
+                # Read the blob straight from the object database
+                data = read_blob(commit, file_path)
+                if data is None:
+                    raise HTTPException(status_code=404, detail=f"File '{file_path}' not found")
+                
+                try:
+                    content = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    raise HTTPException(status_code=415, detail=f"File '{file_path}' is not a UTF-8 text file")
+                
+                return {"content": content}
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error getting file content: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to get file content: {str(e)}")
     
-    try:
-        if branch not in [b.name for b in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-        
-        # Checkout the branch
-        repo.git.checkout(branch)
-        
-        # Get the full path to the file
-        full_path = os.path.join(repo.working_dir, file_path)
-        
-        # Check if the file exists
-        if not os.path.isfile(full_path):
-            raise HTTPException(status_code=404, detail=f"File '{file_path}' not found")
-        
-        # Read the file content
-        with open(full_path, "r") as f:
-            content = f.read()
-        
-        return {"content": content}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting file content: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get file content: {str(e)}")
+    return await repo_locks.read(repo_name, read)
 
 @app.put("/repos/{repo_name}/files/{file_path:path}")
 async def update_file(repo_name: str, file_path: str, file_data: FileContent, branch: Optional[str] = "main"):
     """Update a file in a repository branch and commit the changes."""
-    repo = get_repo(repo_name)
+    def write():
+        with open_repo(repo_name) as repo:
+            try:
+                get_branch_commit(repo, branch)
+                
+                # Commit the new content straight to the branch, no checkout needed
+                author = git.Actor(file_data.author_name, file_data.author_email)
+                commit = commit_changes(
+                    repo, branch, {file_path: file_data.content.encode("utf-8")}, file_data.commit_message, author
+                )
+                if commit is None:
+                    return {"message": f"File '{file_path}' is already up to date"}
+                
+                return {"message": f"File '{file_path}' updated and committed successfully", "commit": commit.hexsha}
+            except HTTPException:
+                raise
+            except CommitError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except RefConflict as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error updating file: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to update file: {str(e)}")
     
-    try:
-        if branch not in [b.name for b in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-        
-        # Checkout the branch
-        repo.git.checkout(branch)
-        
-        # Get the full path to the file
-        full_path = os.path.join(repo.working_dir, file_path)
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        
-        # Write the file content
-        with open(full_path, "w") as f:
-            f.write(file_data.content)
-        
-        # Add the file to the staging area
-        repo.git.add(file_path)
-        
-        # Configure the author
-        repo.git.config("user.name", file_data.author_name)
-        repo.git.config("user.email", file_data.author_email)
-        
-        # Commit the changes
-        repo.git.commit("-m", file_data.commit_message)
-        
-        return {"message": f"File '{file_path}' updated and committed successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating file: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to update file: {str(e)}")
+    return await repo_locks.write(repo_name, write)
 
 @app.delete("/repos/{repo_name}/files/{file_path:path}")
 async def delete_file(
@@ -337,85 +358,80 @@ async def delete_file(
     branch: Optional[str] = "main"
 ):
     """Delete a file from a repository branch and commit the changes."""
-    repo = get_repo(repo_name)
+    def write():
+        with open_repo(repo_name) as repo:
+            try:
+                commit = get_branch_commit(repo, branch)
+                
+                # Check if the file exists
+                if read_blob(commit, file_path) is None:
+                    raise HTTPException(status_code=404, detail=f"File '{file_path}' not found")
+                
+                # Commit the removal straight to the branch, no checkout needed
+                author = git.Actor(author_name, author_email)
+                commit = commit_changes(repo, branch, {file_path: None}, commit_message, author)
+                
+                return {"message": f"File '{file_path}' deleted and committed successfully", "commit": commit.hexsha}
+            except HTTPException:
+                raise
+            except CommitError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except RefConflict as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error deleting file: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
     
-    try:
-        if branch not in [b.name for b in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-        
-        # Checkout the branch
-        repo.git.checkout(branch)
-        
-        # Get the full path to the file
-        full_path = os.path.join(repo.working_dir, file_path)
-        
-        # Check if the file exists
-        if not os.path.isfile(full_path):
-            raise HTTPException(status_code=404, detail=f"File '{file_path}' not found")
-        
-        # Remove the file
-        os.remove(full_path)
-        
-        # Add the removal to the staging area
-        repo.git.add(file_path)
-        
-        # Configure the author
-        repo.git.config("user.name", author_name)
-        repo.git.config("user.email", author_email)
-        
-        # Commit the changes
-        repo.git.commit("-m", commit_message)
-        
-        return {"message": f"File '{file_path}' deleted and committed successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting file: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
+    return await repo_locks.write(repo_name, write)
 
 @app.post("/repos/{repo_name}/checkout")
 async def checkout_branch(repo_name: str, branch: str):
     """Checkout a branch in a repository."""
-    repo = get_repo(repo_name)
+    def write():
+        with open_repo(repo_name) as repo:
+            try:
+                if branch not in [b.name for b in repo.branches]:
+                    raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
+                
+                # Checkout the branch
+                repo.git.checkout(branch)
+                
+                return {"message": f"Checked out branch '{branch}' successfully"}
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error checking out branch: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to checkout branch: {str(e)}")
     
-    try:
-        if branch not in [b.name for b in repo.branches]:
-            raise HTTPException(status_code=404, detail=f"Branch '{branch}' not found")
-        
-        # Checkout the branch
-        repo.git.checkout(branch)
-        
-        return {"message": f"Checked out branch '{branch}' successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error checking out branch: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to checkout branch: {str(e)}")
+    return await repo_locks.write(repo_name, write)
 
 @app.get("/repos/{repo_name}/diff")
 async def get_diff(repo_name: str, commit1: str, commit2: Optional[str] = None):
     """Get the diff between two commits."""
-    repo = get_repo(repo_name)
+    def read():
+        with open_repo(repo_name) as repo:
+            try:
+                # If commit2 is not provided, compare with the previous commit
+                base = commit2
+                if not base:
+                    commit_obj = repo.commit(commit1)
+                    if len(commit_obj.parents) > 0:
+                        base = commit_obj.parents[0].hexsha
+                    else:
+                        # This is the first commit
+                        return {"diff": "This is the first commit, no diff available"}
+                
+                # Get the diff
+                diff = repo.git.diff(base, commit1)
+                
+                return {"diff": diff}
+            except git.BadName:
+                raise HTTPException(status_code=404, detail=f"Commit not found")
+            except Exception as e:
+                logger.error(f"Error getting diff: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to get diff: {str(e)}")
     
-    try:
-        # If commit2 is not provided, compare with the previous commit
-        if not commit2:
-            commit_obj = repo.commit(commit1)
-            if len(commit_obj.parents) > 0:
-                commit2 = commit_obj.parents[0].hexsha
-            else:
-                # This is the first commit
-                return {"diff": "This is the first commit, no diff available"}
-        
-        # Get the diff
-        diff = repo.git.diff(commit2, commit1)
-        
-        return {"diff": diff}
-    except git.BadName:
-        raise HTTPException(status_code=404, detail=f"Commit not found")
-    except Exception as e:
-        logger.error(f"Error getting diff: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get diff: {str(e)}")
+    return await repo_locks.read(repo_name, read)
 
 @app.post("/repos/{repo_name}/merge")
 async def merge_branches(
@@ -427,44 +443,46 @@ async def merge_branches(
     author_email: str = Form(...)
 ):
     """Merge a source branch into a target branch."""
-    repo = get_repo(repo_name)
-    
-    try:
-        # Check if branches exist
-        branches = [b.name for b in repo.branches]
-        if source_branch not in branches:
-            raise HTTPException(status_code=404, detail=f"Source branch '{source_branch}' not found")
-        if target_branch not in branches:
-            raise HTTPException(status_code=404, detail=f"Target branch '{target_branch}' not found")
-        
-        # Checkout the target branch
-        repo.git.checkout(target_branch)
-        
-        # Configure the author
-        repo.git.config("user.name", author_name)
-        repo.git.config("user.email", author_email)
-        
-        # Merge the source branch
-        try:
-            repo.git.merge(source_branch, "-m", commit_message)
-            return {"message": f"Merged '{source_branch}' into '{target_branch}' successfully"}
-        except git.GitCommandError as e:
-            if "CONFLICT" in str(e):
-                # Handle merge conflicts
-                repo.git.merge("--abort")
-                return {"message": f"Merge conflict detected. Merge aborted.", "status": "conflict"}
-            else:
+    def write():
+        with open_repo(repo_name) as repo:
+            try:
+                # Check if branches exist
+                branches = [b.name for b in repo.branches]
+                if source_branch not in branches:
+                    raise HTTPException(status_code=404, detail=f"Source branch '{source_branch}' not found")
+                if target_branch not in branches:
+                    raise HTTPException(status_code=404, detail=f"Target branch '{target_branch}' not found")
+                
+                # Checkout the target branch
+                repo.git.checkout(target_branch)
+                
+                # Configure the author
+                repo.git.config("user.name", author_name)
+                repo.git.config("user.email", author_email)
+                
+                # Merge the source branch
+                try:
+                    repo.git.merge(source_branch, "-m", commit_message)
+                    return {"message": f"Merged '{source_branch}' into '{target_branch}' successfully"}
+                except git.GitCommandError as e:
+                    if "CONFLICT" in str(e):
+                        # Handle merge conflicts
+                        repo.git.merge("--abort")
+                        return {"message": f"Merge conflict detected. Merge aborted.", "status": "conflict"}
+                    else:
+                        raise
+            except HTTPException:
                 raise
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error merging branches: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to merge branches: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error merging branches: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to merge branches: {str(e)}")
+    
+    return await repo_locks.write(repo_name, write)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for the service."""
-    return {"status": "healthy"}
+    return {"status": "healthy", "repo_cache": repo_cache.stats()}
 
 @app.get("/services/status")
 async def check_services():
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import types
+
+import git
+import pytest
+
+# main creates REPOS_DIR on import, and the service assumes "main" as the default branch
+os.environ.setdefault("REPOS_DIR", tempfile.mkdtemp(prefix="vc-repos-"))
+_gitconfig = os.path.join(tempfile.mkdtemp(prefix="vc-git-"), "gitconfig")
+with open(_gitconfig, "w") as f:
+    f.write("[init]\n\tdefaultBranch = main\n[user]\n\tname = Test\n\temail = test@example.com\n")
+os.environ["GIT_CONFIG_GLOBAL"] = _gitconfig
+os.environ["GIT_CONFIG_NOSYSTEM"] = "1"
+
+# The service health modules aren't part of this package yet; use inert stand-ins when they're missing
+try:
+    import version_control.utils.service_health  # noqa: F401
+except ImportError:
+    module = types.ModuleType("version_control.utils.service_health")
+
+    class _ServiceHealth:
+        async def check_all_services(self):
+            return {}
+
+    module.service_health = _ServiceHealth()
+    sys.modules[module.__name__] = module
+try:
+    import version_control.middleware.service_check  # noqa: F401
+except ImportError:
+    module = types.ModuleType("version_control.middleware.service_check")
+
+    class ServiceCheckMiddleware:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            await self.app(scope, receive, send)
+
+    module.ServiceCheckMiddleware = ServiceCheckMiddleware
+    sys.modules[module.__name__] = module
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from version_control import main  # noqa: E402
+from version_control.utils.repo_cache import RepoCache  # noqa: E402
+from version_control.utils.repo_locks import RepoLockManager  # noqa: E402
+
+
+@pytest.fixture
+def repos_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "REPOS_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client(repos_dir, monkeypatch):
+    # Fresh lock manager and cache: their asyncio state belongs to the client's event loop
+    monkeypatch.setattr(main, "repo_locks", RepoLockManager(max_workers=4, queue_size=10))
+    monkeypatch.setattr(main, "repo_cache", RepoCache(max_entries=8, idle_seconds=60))
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A non-bare repository with one commit on main."""
+    path = tmp_path / "repo"
+    repository = git.Repo.init(path)
+    (path / "README.md").write_text("# repo\n")
+    repository.index.add(["README.md"])
+    repository.index.commit("Initial commit")
+    yield repository
+    repository.close()
+
+
+def put_file(client, repo_name, path, content, branch="main", message="Update"):
+    return client.put(
+        f"/repos/{repo_name}/files/{path}",
+        params={"branch": branch},
+        json={"content": content, "commit_message": message, "author_name": "Ann", "author_email": "ann@example.com"}
+    )
@@ -0,0 +1,155 @@
+import os
+import shutil
+
+import git
+import pytest
+
+from version_control.utils.commit_engine import CommitError, RefConflict, commit_changes, split_path, update_ref
+
+AUTHOR = git.Actor("Ann", "ann@example.com")
+
+
+def fsck(repo):
+    # Raises GitCommandError on any broken or malformed object
+    repo.git.fsck("--strict", "--no-dangling")
+
+
+def files_at(repo, branch):
+    return sorted(item.path for item in repo.heads[branch].commit.tree.traverse() if item.type == "blob")
+
+
+def test_nested_writes_and_deletes_produce_valid_objects(repo):
+    commit_changes(repo, "main", {"a/b/c.txt": b"c", "a/d.txt": b"d", "a/b-z.txt": b"z", "a/b.txt": b"x"}, "Add", AUTHOR)
+    fsck(repo)
+    assert files_at(repo, "main") == ["README.md", "a/b-z.txt", "a/b.txt", "a/b/c.txt", "a/d.txt"]
+
+    commit_changes(repo, "main", {"a/b/c.txt": None}, "Remove", AUTHOR)
+    fsck(repo)
+    # The emptied directory is gone from the tree
+    assert files_at(repo, "main") == ["README.md", "a/b-z.txt", "a/b.txt", "a/d.txt"]
+    assert [item.path for item in repo.heads.main.commit.tree.trees] == ["a"]
+
+    commit_changes(repo, "main", {"a/b-z.txt": None, "a/b.txt": None, "a/d.txt": None}, "Remove all", AUTHOR)
+    fsck(repo)
+    assert files_at(repo, "main") == ["README.md"]
+
+
+def test_commit_matches_git_add_and_commit(repo):
+    commit = commit_changes(repo, "main", {"docs/guide.md": b"guide\n"}, "Add guide", AUTHOR)
+
+    # git computes the same tree from the worktree and index we synced
+    assert repo.git.write_tree() == commit.tree.hexsha
+    assert repo.git.status("--porcelain") == ""
+    assert commit.author.name == "Ann" and commit.committer.email == "ann@example.com"
+    assert list(commit.parents) == [repo.commit("HEAD~1")]
+    assert (repo.heads.main.commit.tree / "docs/guide.md").data_stream.read() == b"guide\n"
+
+
+def test_branch_that_is_not_checked_out_leaves_the_worktree_alone(repo):
+    repo.create_head("dev")
+    commit_changes(repo, "dev", {"dev.txt": b"dev"}, "Dev only", AUTHOR)
+
+    assert files_at(repo, "dev") == ["README.md", "dev.txt"]
+    assert files_at(repo, "main") == ["README.md"]
+    assert not os.path.exists(os.path.join(repo.working_tree_dir, "dev.txt"))
+    assert repo.git.status("--porcelain") == ""
+
+
+def test_deleting_a_checked_out_file_removes_it_and_its_empty_directories(repo):
+    commit_changes(repo, "main", {"x/y/z.txt": b"z"}, "Add", AUTHOR)
+    assert os.path.isfile(os.path.join(repo.working_tree_dir, "x/y/z.txt"))
+
+    commit_changes(repo, "main", {"x/y/z.txt": None}, "Remove", AUTHOR)
+
+    assert not os.path.exists(os.path.join(repo.working_tree_dir, "x"))
+    assert repo.git.status("--porcelain") == ""
+
+
+def test_deleting_a_file_whose_directory_is_gone_from_the_worktree(repo):
+    commit_changes(repo, "main", {"x/y/z.txt": b"z"}, "Add", AUTHOR)
+    shutil.rmtree(os.path.join(repo.working_tree_dir, "x"))
+
+    commit_changes(repo, "main", {"x/y/z.txt": None}, "Remove", AUTHOR)
+
+    assert files_at(repo, "main") == ["README.md"]
+    assert repo.git.status("--porcelain") == ""
+
+
+def test_unchanged_content_makes_no_commit(repo):
+    head = repo.heads.main.commit
+    assert commit_changes(repo, "main", {"README.md": b"# repo\n"}, "Same", AUTHOR) is None
+    assert repo.heads.main.commit == head
+
+
+def test_existing_file_mode_is_kept(repo):
+    repo.git.update_index("--chmod=+x", "README.md")
+    repo.index.update()
+    repo.git.commit("-m", "Make executable")
+
+    commit = commit_changes(repo, "main", {"README.md": b"#!/bin/sh\n"}, "Edit", AUTHOR)
+
+    assert (commit.tree / "README.md").mode == 0o100755
+
+
+def test_path_conflicts_and_invalid_paths_are_refused(repo):
+    commit_changes(repo, "main", {"dir/file.txt": b"f"}, "Add", AUTHOR)
+    head = repo.heads.main.commit
+
+    with pytest.raises(CommitError):
+        commit_changes(repo, "main", {"dir/file.txt/inner": b"x"}, "File as dir", AUTHOR)
+    with pytest.raises(CommitError):
+        commit_changes(repo, "main", {"dir": b"x"}, "Dir as file", AUTHOR)
+    with pytest.raises(CommitError):
+        commit_changes(repo, "main", {"missing.txt": None}, "Delete missing", AUTHOR)
+    for path in ("../escape", "a//b", ".git/config", "a/./b"):
+        with pytest.raises(CommitError):
+            split_path(path)
+    assert repo.heads.main.commit == head
+
+
+def test_update_ref_refuses_a_moved_branch(repo):
+    head = repo.heads.main.commit
+    other = commit_changes(repo, "main", {"a.txt": b"a"}, "Move", AUTHOR)
+
+    with pytest.raises(RefConflict):
+        update_ref(repo, "main", head.binsha, head.binsha, "stale", AUTHOR)
+    assert repo.heads.main.commit == other
+    assert not os.path.exists(os.path.join(repo.git_dir, "refs/heads/main.lock"))
+
+
+def test_update_ref_respects_git_lock_file(repo):
+    head = repo.heads.main.commit
+    lock = os.path.join(repo.git_dir, "refs/heads/main.lock")
+    open(lock, "w").close()
+
+    with pytest.raises(RefConflict):
+        commit_changes(repo, "main", {"a.txt": b"a"}, "Locked", AUTHOR)
+    assert repo.heads.main.commit == head
+    assert os.path.exists(lock)
+
+
+def test_packed_refs_are_updated(repo):
+    repo.git.pack_refs("--all")
+    commit = commit_changes(repo, "main", {"a.txt": b"a"}, "After pack", AUTHOR)
+    assert repo.heads.main.commit == commit
+    fsck(repo)
+
+
+def test_bare_repository(repo, tmp_path):
+    bare = git.Repo.clone_from(repo.working_tree_dir, tmp_path / "bare.git", bare=True)
+    try:
+        commit = commit_changes(bare, "main", {"src/app.py": b"print()\n"}, "Bare commit", AUTHOR)
+
+        assert bare.heads.main.commit == commit
+        assert files_at(bare, "main") == ["README.md", "src/app.py"]
+        fsck(bare)
+    finally:
+        bare.close()
+
+
+def test_reflog_records_the_commit(repo):
+    commit = commit_changes(repo, "main", {"a.txt": b"a"}, "Logged", AUTHOR)
+    entry = repo.heads.main.log()[-1]
+    assert entry.newhexsha == commit.hexsha
+    assert entry.message == "commit: Logged"
+    assert repo.head.log()[-1].newhexsha == commit.hexsha
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from version_control.utils.commit_log import InvalidCursor, make_cursor, parse_cursor, parse_log, read_log, resolve_cursor
+
+from .conftest import put_file
+
+
+def commit_file(repo, path, content, message):
+    full_path = repo.working_tree_dir + "/" + path
+    with open(full_path, "w") as f:
+        f.write(content)
+    repo.index.add([path])
+    return repo.index.commit(message)
+
+
+def test_parse_log_handles_multiline_messages_and_numstat():
+    output = [
+        "\x1eaaa\x1fAnn\x1fann@example.com\x1f2024-01-02T03:04:05+00:00\x1fSubject\n",
+        "\n",
+        "Body line\n",
+        "\x1d\n",
+        "\n",
+        "3\t1\tsrc/app.py\n",
+        "-\t-\tlogo.png\n",
+        "\x1ebbb\x1fBob\x1fbob@example.com\x1f2024-01-01T00:00:00+00:00\x1fOne line\n",
+        "\x1d\n",
+    ]
+
+    commits = list(parse_log(output, stats=True))
+
+    assert commits[0] == {
+        "id": "aaa",
+        "message": "Subject\n\nBody line\n",
+        "author": {"name": "Ann", "email": "ann@example.com"},
+        "date": "2024-01-02T03:04:05+00:00",
+        "stats": {"files_changed": 2, "insertions": 3, "deletions": 1},
+    }
+    assert commits[1]["message"] == "One line\n"
+    assert commits[1]["stats"] == {"files_changed": 0, "insertions": 0, "deletions": 0}
+    assert "stats" not in next(parse_log(output, stats=False))
+
+
+def test_read_log_stats_match_commit_stats(repo):
+    commit_file(repo, "a.txt", "1\n2\n3\n", "Add a")
+    commit_file(repo, "a.txt", "1\nchanged\n", "Edit a\n\nWith a body")
+    repo.create_head("dev").checkout()
+    commit_file(repo, "b.txt", "b\n", "Add b")
+    repo.heads.main.checkout()
+    commit_file(repo, "c.txt", "c\n", "Add c")
+    repo.git.merge("dev", "--no-ff", "-m", "Merge dev")
+
+    expected = [
+        {
+            "id": commit.hexsha,
+            "message": commit.message,
+            "author": {"name": commit.author.name, "email": commit.author.email},
+            "date": commit.committed_datetime.isoformat(),
+            "stats": {
+                "files_changed": len(commit.stats.files),
+                "insertions": commit.stats.total["insertions"],
+                "deletions": commit.stats.total["deletions"],
+            },
+        }
+        for commit in repo.iter_commits("main")
+    ]
+
+    assert read_log(repo, repo.heads.main.commit.hexsha, 0, 100, stats=True) == expected
+
+
+def test_read_log_filters(repo):
+    commit_file(repo, "a.txt", "a\n", "Add a")
+    commit_file(repo, "b.txt", "b\n", "Add b")
+    tip = repo.heads.main.commit.hexsha
+
+    assert [c["message"] for c in read_log(repo, tip, 0, 10, paths=["a.txt"])] == ["Add a"]
+    assert [c["message"] for c in read_log(repo, tip, 1, 1)] == ["Add a"]
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    assert read_log(repo, tip, 0, 10, since=future) == []
+    assert len(read_log(repo, tip, 0, 10, until=future.replace(tzinfo=None))) == 3
+
+
+def test_cursor_round_trip_and_validation(repo):
+    tip = repo.heads.main.commit.hexsha
+    assert parse_cursor(make_cursor(tip, 40)) == (tip, 40)
+    assert resolve_cursor(repo, make_cursor(tip, 5)) == (tip, 5)
+
+    for cursor in ("bad", f"{tip}-", f"{tip[:-1]}-1", make_cursor("0" * 40, 1)):
+        with pytest.raises(InvalidCursor):
+            resolve_cursor(repo, cursor)
+    # A tree is not a valid tip either
+    with pytest.raises(InvalidCursor):
+        resolve_cursor(repo, make_cursor(repo.heads.main.commit.tree.hexsha, 0))
+
+
+def test_commits_endpoint_pages_from_a_pinned_tip(client):
+    client.post("/repos/demo")
+    for n in range(5):
+        put_file(client, "demo", f"f{n}.txt", str(n), message=f"Commit {n}")
+
+    first = client.get("/repos/demo/commits", params={"limit": 4}).json()
+    # A commit pushed between pages doesn't shift the next one
+    put_file(client, "demo", "late.txt", "late", message="Late")
+    second = client.get("/repos/demo/commits", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+
+    messages = [c["message"] for c in first["commits"] + second["commits"]]
+    assert messages == [f"Commit {n}" for n in range(4, -1, -1)] + ["Initial commit\n"]
+    assert second["next_cursor"] is None
+    assert "stats" not in first["commits"][0]
+
+    with_stats = client.get("/repos/demo/commits", params={"limit": 1, "stats": "true"}).json()
+    assert with_stats["commits"][0]["stats"] == {"files_changed": 1, "insertions": 1, "deletions": 0}
+
+
+def test_commits_endpoint_rejects_bad_cursors(client):
+    client.post("/repos/demo")
+
+    malformed = client.get("/repos/demo/commits", params={"cursor": "bad"})
+    unknown = client.get("/repos/demo/commits", params={"cursor": make_cursor("0123456789" * 4, 10)})
+
+    assert malformed.status_code == 400
+    assert unknown.status_code == 400
+    assert unknown.json() == {"detail": f"Invalid cursor '{'0123456789' * 4}-10'"}
+    assert client.get("/repos/demo/commits", params={"branch": "missing"}).status_code == 404
@@ -0,0 +1,40 @@
+from .conftest import put_file
+
+
+def test_diff_against_parent_when_commit2_is_omitted(client):
+    client.post("/repos/demo")
+    commit = put_file(client, "demo", "notes.txt", "hello\n").json()["commit"]
+
+    response = client.get("/repos/demo/diff", params={"commit1": commit})
+
+    assert response.status_code == 200
+    assert "+hello" in response.json()["diff"]
+
+
+def test_diff_between_two_commits(client):
+    client.post("/repos/demo")
+    first = put_file(client, "demo", "notes.txt", "one\n").json()["commit"]
+    second = put_file(client, "demo", "notes.txt", "two\n").json()["commit"]
+
+    response = client.get("/repos/demo/diff", params={"commit1": second, "commit2": first})
+
+    assert response.status_code == 200
+    diff = response.json()["diff"]
+    assert "-one" in diff and "+two" in diff
+
+
+def test_diff_of_first_commit(client):
+    client.post("/repos/demo")
+    first = client.get("/repos/demo/commits").json()["commits"][-1]["id"]
+
+    response = client.get("/repos/demo/diff", params={"commit1": first})
+
+    assert response.json() == {"diff": "This is the first commit, no diff available"}
+
+
+def test_diff_of_unknown_commit(client):
+    client.post("/repos/demo")
+
+    response = client.get("/repos/demo/diff", params={"commit1": "no-such-commit"})
+
+    assert response.status_code == 404
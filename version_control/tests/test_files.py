@@ -0,0 +1,34 @@
+import os
+
+import git
+
+from .conftest import put_file
+
+
+def test_files_are_read_from_the_branch_not_the_checkout(client, repos_dir):
+    client.post("/repos/demo")
+    client.post("/repos/demo/branches", json={"name": "dev"})
+    put_file(client, "demo", "docs/guide.md", "guide", branch="dev")
+    # Untracked files in the working tree are not part of any branch
+    with open(os.path.join(repos_dir, "demo", "scratch.txt"), "w") as f:
+        f.write("scratch")
+
+    assert client.get("/repos/demo/files", params={"branch": "dev"}).json() == {"files": ["README.md", "docs/guide.md"]}
+    assert client.get("/repos/demo/files", params={"branch": "main"}).json() == {"files": ["README.md"]}
+    assert client.get("/repos/demo/files/docs/guide.md", params={"branch": "dev"}).json() == {"content": "guide"}
+    assert client.get("/repos/demo/files/scratch.txt", params={"branch": "main"}).status_code == 404
+    assert client.get("/repos/demo/files/docs", params={"branch": "dev"}).status_code == 404
+    assert client.get("/repos/demo/files", params={"branch": "missing"}).status_code == 404
+
+
+def test_binary_files_are_refused(client, repos_dir):
+    client.post("/repos/demo")
+    path = os.path.join(repos_dir, "demo")
+    with open(os.path.join(path, "logo.bin"), "wb") as f:
+        f.write(b"\xff\xfe\x00")
+    repo = git.Repo(path)
+    repo.index.add(["logo.bin"])
+    repo.index.commit("Add binary")
+    repo.close()
+
+    assert client.get("/repos/demo/files/logo.bin", params={"branch": "main"}).status_code == 415
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from version_control.utils.repo_cache import RepoCache
+
+
+def path_of(repo):
+    return repo.working_tree_dir
+
+
+def cat_file_processes(handle):
+    return [cmd for cmd in (handle.git.cat_file_all, handle.git.cat_file_header) if cmd is not None]
+
+
+def test_handles_are_reused_with_their_cat_file_processes(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+
+    with cache.lease("demo", path_of(repo)) as first:
+        first.heads.main.commit.tree.blobs
+        processes = cat_file_processes(first)
+    with cache.lease("demo", path_of(repo)) as second:
+        assert second is first
+        assert cat_file_processes(second) == processes
+
+    assert cache.stats() == {"size": 1, "max_entries": 4, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_concurrent_leases_get_separate_handles(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+
+    with cache.lease("demo", path_of(repo)) as first:
+        with cache.lease("demo", path_of(repo)) as second:
+            assert second is not first
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_handle_is_evicted_and_closed(repo):
+    cache = RepoCache(max_entries=2, idle_seconds=60)
+    handles = {}
+    for name in ("one", "two", "three"):
+        with cache.lease(name, path_of(repo)) as handle:
+            handle.heads.main.commit.tree.blobs
+            handles[name] = handle
+
+    assert sorted(cache.idle) == ["three", "two"]
+    assert cache.stats()["evictions"] == 1
+    assert cat_file_processes(handles["one"]) == []
+
+
+def test_invalidate_closes_the_repository_handles(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+    with cache.lease("demo", path_of(repo)) as handle:
+        handle.heads.main.commit.tree.blobs
+
+    cache.invalidate("demo")
+
+    assert cache.stats()["size"] == 0
+    assert cat_file_processes(handle) == []
+    with cache.lease("demo", path_of(repo)) as fresh:
+        assert fresh is not handle
+
+
+def test_sweep_closes_idle_handles(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+    with cache.lease("demo", path_of(repo)):
+        pass
+
+    cache.sweep()
+    assert cache.stats()["size"] == 1
+
+    cache.idle_seconds = 0
+    cache.sweep()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_failed_requests_decide_whether_the_handle_is_kept(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+
+    with pytest.raises(HTTPException):
+        with cache.lease("demo", path_of(repo)):
+            raise HTTPException(status_code=404, detail="missing")
+    assert cache.stats()["size"] == 1
+
+    for error in (HTTPException(status_code=500, detail="git failed"), RuntimeError("broken pipe")):
+        with pytest.raises(type(error)):
+            with cache.lease("demo", path_of(repo)):
+                raise error
+        assert cache.stats()["size"] == 0
+        with cache.lease("demo", path_of(repo)):
+            pass
+
+
+def test_stop_closes_everything(repo):
+    cache = RepoCache(max_entries=4, idle_seconds=60)
+
+    async def scenario():
+        cache.start()
+        with cache.lease("demo", path_of(repo)):
+            pass
+        await cache.stop()
+
+    asyncio.run(scenario())
+    assert cache.stats()["size"] == 0
+    assert cache._task is None
+
+
+def test_endpoints_share_handles_and_delete_invalidates(client):
+    client.post("/repos/demo")
+    for _ in range(3):
+        client.get("/repos/demo/files/README.md", params={"branch": "main"})
+
+    stats = client.get("/health").json()["repo_cache"]
+    assert stats["misses"] == 1 and stats["hits"] == 2 and stats["size"] == 1
+
+    client.delete("/repos/demo")
+    assert client.get("/health").json()["repo_cache"]["size"] == 0
+    assert client.get("/repos/demo/files", params={"branch": "main"}).status_code == 404
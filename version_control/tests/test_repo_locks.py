@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from version_control.utils.repo_locks import RepoLockManager, RWLock
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_reads_of_a_repository_run_concurrently():
+    async def scenario():
+        locks = RepoLockManager(max_workers=4)
+        barrier = threading.Barrier(3, timeout=5)
+        # Each read waits for the other two, so they only finish if they overlap
+        results = await asyncio.gather(*[locks.read("demo", barrier.wait) for _ in range(3)])
+        await locks.shutdown()
+        return results
+
+    assert sorted(run(scenario())) == [0, 1, 2]
+
+
+def test_writes_to_a_repository_apply_one_at_a_time_in_order():
+    async def scenario():
+        locks = RepoLockManager(max_workers=4)
+        applied = []
+        active = []
+
+        def write(n):
+            active.append(n)
+            overlapping = len(active)
+            time.sleep(0.01)
+            active.remove(n)
+            applied.append(n)
+            return overlapping
+
+        overlaps = await asyncio.gather(*[locks.write("demo", write, n) for n in range(5)])
+        await locks.shutdown()
+        return applied, overlaps
+
+    applied, overlaps = run(scenario())
+    assert applied == [0, 1, 2, 3, 4]
+    assert overlaps == [1] * 5
+
+
+def test_write_waits_for_running_reads():
+    async def scenario():
+        locks = RepoLockManager(max_workers=4)
+        events = []
+
+        def read():
+            time.sleep(0.05)
+            events.append("read")
+
+        def write():
+            events.append("write")
+
+        reader = asyncio.create_task(locks.read("demo", read))
+        await asyncio.sleep(0.01)
+        await locks.write("demo", write)
+        await reader
+        await locks.shutdown()
+        return events
+
+    assert run(scenario()) == ["read", "write"]
+
+
+def test_writes_to_different_repositories_overlap():
+    async def scenario():
+        locks = RepoLockManager(max_workers=4)
+        barrier = threading.Barrier(2, timeout=5)
+        await asyncio.gather(locks.write("one", barrier.wait), locks.write("two", barrier.wait))
+        await locks.shutdown()
+
+    run(scenario())
+
+
+def test_full_write_queue_is_rejected_with_503():
+    async def scenario():
+        locks = RepoLockManager(max_workers=2, queue_size=2)
+        release = threading.Event()
+        # The first job is taken off the queue by the drain task, the next two fill it
+        first = asyncio.create_task(locks.write("demo", release.wait))
+        await asyncio.sleep(0.05)
+        queued = [asyncio.create_task(locks.write("demo", lambda: None)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(HTTPException) as error:
+                await locks.write("demo", lambda: None)
+        finally:
+            release.set()
+            await asyncio.gather(first, *queued)
+            await locks.shutdown()
+        return error.value.status_code
+
+    assert run(scenario()) == 503
+
+
+def test_write_errors_reach_the_caller_and_the_queue_keeps_going():
+    async def scenario():
+        locks = RepoLockManager(max_workers=2)
+
+        def fail():
+            raise HTTPException(status_code=404, detail="missing")
+
+        results = await asyncio.gather(locks.write("demo", fail), locks.write("demo", lambda: "ok"), return_exceptions=True)
+        await locks.shutdown()
+        return results
+
+    error, result = run(scenario())
+    assert isinstance(error, HTTPException) and error.status_code == 404
+    assert result == "ok"
+
+
+def test_forget_drops_idle_locks_only():
+    async def scenario():
+        locks = RepoLockManager(max_workers=2)
+        await locks.read("demo", lambda: None)
+        assert "demo" in locks.locks
+        locks.forget("demo")
+        assert "demo" not in locks.locks
+
+        lock = locks.lock("busy")
+        async with lock.read():
+            locks.forget("busy")
+            assert "busy" in locks.locks
+        await locks.shutdown()
+
+    run(scenario())
+
+
+def test_waiting_writer_blocks_new_readers():
+    async def scenario():
+        lock = RWLock()
+        order = []
+
+        async def reader(name, delay):
+            await asyncio.sleep(delay)
+            async with lock.read():
+                order.append(name)
+                await asyncio.sleep(0.02)
+
+        async def writer():
+            await asyncio.sleep(0.005)
+            async with lock.write():
+                order.append("writer")
+
+        await asyncio.gather(reader("first", 0), writer(), reader("late", 0.01))
+        return order
+
+    assert run(scenario()) == ["first", "writer", "late"]
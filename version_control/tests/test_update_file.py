@@ -0,0 +1,42 @@
+import git
+
+from .conftest import put_file
+
+
+def delete_file(client, repo_name, path, branch="main"):
+    return client.request(
+        "DELETE",
+        f"/repos/{repo_name}/files/{path}",
+        params={"branch": branch},
+        data={"commit_message": "Remove", "author_name": "Bob", "author_email": "bob@example.com"}
+    )
+
+
+def test_update_and_delete_commit_to_the_branch(client, repos_dir):
+    client.post("/repos/demo")
+    client.post("/repos/demo/branches", json={"name": "dev"})
+
+    assert put_file(client, "demo", "src/app.py", "print()\n", branch="dev").status_code == 200
+    assert client.get("/repos/demo/files/src/app.py", params={"branch": "dev"}).json() == {"content": "print()\n"}
+    assert client.get("/repos/demo/files/src/app.py", params={"branch": "main"}).status_code == 404
+
+    assert delete_file(client, "demo", "src/app.py", branch="dev").status_code == 200
+    assert client.get("/repos/demo/files", params={"branch": "dev"}).json() == {"files": ["README.md"]}
+
+    repo = git.Repo(repos_dir / "demo")
+    authors = [commit.author.email for commit in repo.iter_commits("dev")]
+    assert authors[:2] == ["bob@example.com", "ann@example.com"]
+    # The author is set per commit, not written to the repository config
+    assert repo.config_reader("repository").get_value("user", "email") == "service@example.com"
+    repo.git.fsck("--strict", "--no-dangling")
+    repo.close()
+
+
+def test_update_errors(client):
+    client.post("/repos/demo")
+    put_file(client, "demo", "dir/file.txt", "x")
+
+    assert put_file(client, "demo", "dir", "x").status_code == 400
+    assert put_file(client, "demo", "a.txt", "x", branch="missing").status_code == 404
+    assert delete_file(client, "demo", "missing.txt").status_code == 404
+    assert put_file(client, "demo", "dir/file.txt", "x").json() == {"message": "File 'dir/file.txt' is already up to date"}
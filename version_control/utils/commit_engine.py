@@ -0,0 +1,222 @@
+import logging
+import os
+import stat
+from io import BytesIO
+from struct import pack
+from typing import Dict, List, Optional, Tuple
+
+import git
+from git.index.typ import IndexEntry
+from git.objects.fun import tree_entries_from_data, tree_to_stream
+from git.refs.log import RefLog
+from gitdb import IStream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BLOB_MODE = 0o100644
+TREE_MODE = 0o040000
+
+# path -> new content, or None to delete the file
+Changes = Dict[str, Optional[bytes]]
+
+
+class CommitError(Exception):
+    """A change that can't be applied to the branch's tree."""
+
+
+class RefConflict(Exception):
+    """The branch moved between reading its tip and updating it."""
+
+    def __init__(self, branch: str):
+        super().__init__(f"Branch '{branch}' was updated concurrently, retry the request")
+
+
+def split_path(path: str) -> List[str]:
+    """Split a repository path into tree entry names, rejecting ones git wouldn't store."""
+    parts = path.strip("/").split("/")
+    for part in parts:
+        if part in ("", ".", "..") or part.lower() == ".git":
+            raise CommitError(f"Invalid file path '{path}'")
+    return parts
+
+
+def _store(repo: git.Repo, type_name: bytes, data: bytes) -> bytes:
+    return repo.odb.store(IStream(type_name, len(data), BytesIO(data))).binsha
+
+
+def _read_tree(repo: git.Repo, binsha: Optional[bytes]) -> Dict[str, Tuple[bytes, int]]:
+    if binsha is None:
+        return {}
+    return {name: (sha, mode) for sha, mode, name in tree_entries_from_data(repo.odb.stream(binsha).read())}
+
+
+def _write_tree(repo: git.Repo, entries: Dict[str, Tuple[bytes, int]]) -> bytes:
+    # git orders directories as if their name ended with a slash
+    ordered = sorted(entries.items(), key=lambda item: item[0] + "/" if item[1][1] == TREE_MODE else item[0])
+    stream = BytesIO()
+    tree_to_stream([(sha, mode, name) for name, (sha, mode) in ordered], stream.write)
+    return _store(repo, b"tree", stream.getvalue())
+
+
+def _apply(
+    repo: git.Repo,
+    tree_sha: Optional[bytes],
+    changes: List[Tuple[List[str], Optional[bytes]]],
+    prefix: str
+) -> Optional[bytes]:
+    """Rewrite one tree level: only the subtrees on a changed path are read and written again."""
+    entries = _read_tree(repo, tree_sha)
+    nested: Dict[str, List[Tuple[List[str], Optional[bytes]]]] = {}
+    for parts, blob_sha in changes:
+        name = parts[0]
+        current = entries.get(name)
+        if len(parts) > 1:
+            if current is not None and current[1] != TREE_MODE:
+                raise CommitError(f"'{prefix}{name}' is a file, not a directory")
+            nested.setdefault(name, []).append((parts[1:], blob_sha))
+        elif blob_sha is None:
+            if current is None or current[1] == TREE_MODE:
+                raise CommitError(f"File '{prefix}{name}' not found")
+            del entries[name]
+        else:
+            if current is not None and current[1] == TREE_MODE:
+                raise CommitError(f"'{prefix}{name}' is a directory")
+            # Keep the mode of an existing file, e.g. its executable bit
+            entries[name] = (blob_sha, current[1] if current is not None else BLOB_MODE)
+
+    for name, subchanges in nested.items():
+        current = entries.get(name)
+        subtree = _apply(repo, current[0] if current is not None else None, subchanges, f"{prefix}{name}/")
+        if subtree is None:
+            # git doesn't store empty directories
+            entries.pop(name, None)
+        else:
+            entries[name] = (subtree, TREE_MODE)
+
+    if not entries:
+        return None
+    return _write_tree(repo, entries)
+
+
+def update_ref(repo: git.Repo, branch: str, new_sha: bytes, old_sha: bytes, message: str, committer: git.Actor):
+    """Point ``branch`` at ``new_sha`` if it still points at ``old_sha``.
+
+    Takes the ref's lock file the way git does, so git processes running on
+    the same repository respect the update, and checks the old value under
+    the lock.
+    """
+    ref_path = git.Head.to_full_path(branch)
+    path = os.path.join(repo.common_dir, ref_path)
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileExistsError:
+        raise RefConflict(branch)
+    try:
+        with os.fdopen(fd, "w") as f:
+            if git.Head(repo, ref_path).commit.binsha != old_sha:
+                raise RefConflict(branch)
+            f.write(new_sha.hex() + "\n")
+        os.replace(lock_path, path)
+    except BaseException:
+        if os.path.exists(lock_path):
+            os.remove(lock_path)
+        raise
+
+    if not repo.bare:
+        RefLog.append_entry(committer, RefLog.path(git.Head(repo, ref_path)), old_sha, new_sha, message)
+        if checked_out(repo, branch):
+            RefLog.append_entry(committer, RefLog.path(repo.head), old_sha, new_sha, message)
+
+
+def checked_out(repo: git.Repo, branch: str) -> bool:
+    return not repo.bare and not repo.head.is_detached and repo.head.ref.name == branch
+
+
+def _sync_worktree(repo: git.Repo, changes: Changes, blob_shas: Dict[str, bytes]):
+    """Bring the working tree and index of the checked out branch up to date with a new commit."""
+    index = repo.index
+    for path, content in changes.items():
+        full_path = os.path.join(repo.working_tree_dir, path)
+        if content is None:
+            if os.path.lexists(full_path):
+                os.remove(full_path)
+            # Like git, drop directories the removal left empty; the file's
+            # directory may already be gone from the worktree
+            directory = os.path.dirname(full_path)
+            while (
+                directory != repo.working_tree_dir
+                and os.path.isdir(directory)
+                and not os.listdir(directory)
+            ):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+            index.entries.pop((path, 0), None)
+            continue
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(content)
+        st = os.lstat(full_path)
+        mode = BLOB_MODE | (0o111 if st.st_mode & stat.S_IXUSR else 0)
+        index.entries[(path, 0)] = IndexEntry((
+            mode,
+            blob_shas[path],
+            0,
+            path,
+            pack(">LL", int(st.st_ctime), st.st_ctime_ns % 1000000000),
+            pack(">LL", int(st.st_mtime), st.st_mtime_ns % 1000000000),
+            st.st_dev & 0xFFFFFFFF,
+            st.st_ino & 0xFFFFFFFF,
+            st.st_uid,
+            st.st_gid,
+            st.st_size & 0xFFFFFFFF,
+        ))
+    # The cached tree extension is stale now, let git recompute it
+    index.write(ignore_extension_data=True)
+
+
+def commit_changes(
+    repo: git.Repo,
+    branch: str,
+    changes: Changes,
+    message: str,
+    author: git.Actor
+) -> Optional[git.Commit]:
+    """Commit ``changes`` on top of ``branch`` without checking it out.
+
+    The new blobs, the trees along the changed paths and the commit are
+    written straight to the object database, then the branch is moved with
+    ``update_ref``. Nothing is spawned, the author is passed per commit and
+    bare repositories work the same. If the branch is checked out in a
+    working tree, the changed files and their index entries are updated too.
+    Returns None when the changes leave the tree as it is.
+    """
+    changes = {"/".join(split_path(path)): content for path, content in changes.items()}
+    parent = git.Head(repo, git.Head.to_full_path(branch)).commit
+    blob_shas = {path: _store(repo, b"blob", content) for path, content in changes.items() if content is not None}
+    tree_sha = _apply(
+        repo,
+        parent.tree.binsha,
+        [(path.split("/"), blob_shas.get(path)) for path in changes],
+        ""
+    )
+    if tree_sha is None:
+        tree_sha = _write_tree(repo, {})
+    if tree_sha == parent.tree.binsha:
+        return None
+
+    commit = git.Commit.create_from_tree(
+        repo,
+        git.Tree(repo, tree_sha, mode=TREE_MODE, path=""),
+        message,
+        parent_commits=[parent],
+        author=author,
+        committer=author
+    )
+    update_ref(repo, branch, commit.binsha, parent.binsha, f"commit: {message}", author)
+    if checked_out(repo, branch):
+        _sync_worktree(repo, changes, blob_shas)
+    return commit
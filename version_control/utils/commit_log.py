@@ -0,0 +1,120 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import git
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Each commit starts with a record separator, its fields are split by unit
+# separators and the message ends with a group separator; --numstat lines follow
+RECORD = "\x1e"
+FIELD = "\x1f"
+END_OF_MESSAGE = "\x1d"
+LOG_FORMAT = "--format=%x1e%H%x1f%an%x1f%ae%x1f%cI%x1f%B%x1d"
+
+CURSOR_PATTERN = re.compile(r"^([0-9a-f]{40})-(\d+)$")
+
+
+class InvalidCursor(Exception):
+    def __init__(self, cursor: str):
+        super().__init__(f"Invalid cursor '{cursor}'")
+
+
+def make_cursor(tip: str, offset: int) -> str:
+    """Pages are counted from the tip of the first page, so commits pushed meanwhile don't shift them."""
+    return f"{tip}-{offset}"
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    match = CURSOR_PATTERN.match(cursor)
+    if match is None:
+        raise InvalidCursor(cursor)
+    return match.group(1), int(match.group(2))
+
+
+def resolve_cursor(repo: git.Repo, cursor: str) -> Tuple[str, int]:
+    """Parse a cursor and check its tip is a commit of ``repo``."""
+    tip, offset = parse_cursor(cursor)
+    try:
+        info = repo.odb.info(bytes.fromhex(tip))
+    except (ValueError, git.BadName, git.GitCommandError):
+        raise InvalidCursor(cursor)
+    if info.type != b"commit":
+        raise InvalidCursor(cursor)
+    return tip, offset
+
+
+def _git_date(moment: datetime) -> str:
+    # Naive datetimes are taken as UTC rather than the server's local time
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.isoformat()
+
+
+def parse_log(lines: Iterable[str], stats: bool) -> Iterator[Dict[str, Any]]:
+    """Turn ``git log`` output in LOG_FORMAT into commit dicts, one commit at a time."""
+    commit: Optional[Dict[str, Any]] = None
+    message: Optional[List[str]] = None
+    for line in lines:
+        if line.startswith(RECORD):
+            if commit is not None:
+                yield commit
+            sha, name, email, date, first_line = line[1:].split(FIELD, 4)
+            commit = {"id": sha, "message": "", "author": {"name": name, "email": email}, "date": date}
+            if stats:
+                commit["stats"] = {"files_changed": 0, "insertions": 0, "deletions": 0}
+            message = []
+            line = first_line
+        if commit is None:
+            continue
+        if message is not None:
+            head, end, _ = line.partition(END_OF_MESSAGE)
+            message.append(head)
+            if end:
+                commit["message"] = "".join(message)
+                message = None
+        elif stats and line.strip():
+            insertions, deletions, _ = line.split("\t", 2)
+            commit["stats"]["files_changed"] += 1
+            # Binary files are reported as "-"
+            commit["stats"]["insertions"] += int(insertions) if insertions != "-" else 0
+            commit["stats"]["deletions"] += int(deletions) if deletions != "-" else 0
+    if commit is not None:
+        yield commit
+
+
+def read_log(
+    repo: git.Repo,
+    tip: str,
+    skip: int,
+    limit: int,
+    paths: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    stats: bool = False
+) -> List[Dict[str, Any]]:
+    """Read up to ``limit`` commits reachable from ``tip`` after skipping ``skip``, with one ``git log``.
+
+    The output is streamed and parsed as it arrives. With ``stats`` the same
+    process adds ``--numstat``, counted against the first parent like
+    ``Commit.stats``, instead of one ``git diff`` per commit.
+    """
+    args = [LOG_FORMAT, f"--skip={skip}", f"--max-count={limit}"]
+    if since is not None:
+        args.append(f"--since={_git_date(since)}")
+    if until is not None:
+        args.append(f"--until={_git_date(until)}")
+    if stats:
+        # Whole-commit stats even when the log is limited to some paths
+        args += ["--numstat", "--no-renames", "--diff-merges=first-parent", "--full-diff"]
+    args += [tip, "--"] + (paths or [])
+
+    process = repo.git.log(*args, as_process=True)
+    lines = (raw.decode("utf-8", errors="replace") for raw in process.stdout)
+    commits = list(parse_log(lines, stats))
+    process.wait()
+    return commits
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import git
+from fastapi import HTTPException
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RepoCache:
+    """Bounded LRU of open ``git.Repo`` handles.
+
+    A handle keeps its persistent ``git cat-file --batch``/``--batch-check``
+    processes, so object reads on a hot repository don't start new ones.
+    Those pipes can't be shared between threads, so a handle is leased to one
+    thread at a time: ``lease`` takes an idle handle of the repository or
+    opens a new one, and puts it back when done. Idle handles are closed
+    when they fall off the end of the LRU, when unused for ``idle_seconds``
+    and when their repository is invalidated.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, idle_seconds: Optional[float] = None):
+        self.max_entries = max_entries or int(os.getenv("REPO_CACHE_SIZE", "64"))
+        self.idle_seconds = idle_seconds or float(os.getenv("REPO_CACHE_IDLE_SECONDS", "300"))
+        # id(handle) -> (repo_name, handle, last used), least recently used first
+        self.lru: "OrderedDict[int, Tuple[str, git.Repo, float]]" = OrderedDict()
+        self.idle: Dict[str, List[git.Repo]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _take(self, repo_name: str) -> Optional[git.Repo]:
+        with self._lock:
+            handles = self.idle.get(repo_name)
+            if not handles:
+                self.misses += 1
+                return None
+            # The most recently used handle is the likeliest to have warm caches
+            repo = handles.pop()
+            if not handles:
+                del self.idle[repo_name]
+            del self.lru[id(repo)]
+            self.hits += 1
+            return repo
+
+    def _remove(self, key: int) -> git.Repo:
+        repo_name, repo, _ = self.lru.pop(key)
+        handles = self.idle[repo_name]
+        handles.remove(repo)
+        if not handles:
+            del self.idle[repo_name]
+        return repo
+
+    def _put(self, repo_name: str, repo: git.Repo):
+        evicted = []
+        with self._lock:
+            self.idle.setdefault(repo_name, []).append(repo)
+            self.lru[id(repo)] = (repo_name, repo, time.monotonic())
+            while len(self.lru) > self.max_entries:
+                evicted.append(self._remove(next(iter(self.lru))))
+            self.evictions += len(evicted)
+        self._close(evicted)
+
+    def _close(self, handles: List[git.Repo]):
+        for repo in handles:
+            try:
+                repo.close()
+            except Exception as e:
+                logger.warning(f"Error closing repository handle: {str(e)}")
+
+    @contextmanager
+    def lease(self, repo_name: str, path: str) -> Iterator[git.Repo]:
+        """Use a handle of the repository at ``path`` for the duration of the block."""
+        repo = self._take(repo_name)
+        if repo is None:
+            repo = git.Repo(path)
+        try:
+            yield repo
+        except HTTPException as e:
+            # An expected outcome such as a 404 leaves the handle fine, a 5xx wraps a git failure
+            if e.status_code < 500:
+                self._put(repo_name, repo)
+            else:
+                self._close([repo])
+            raise
+        except BaseException:
+            # A git failure may leave the cat-file pipes out of step
+            self._close([repo])
+            raise
+        else:
+            self._put(repo_name, repo)
+
+    def invalidate(self, repo_name: str):
+        """Close the idle handles of a repository, e.g. once it's deleted."""
+        with self._lock:
+            handles = self.idle.pop(repo_name, [])
+            for repo in handles:
+                del self.lru[id(repo)]
+        self._close(handles)
+
+    def sweep(self):
+        """Close the handles that have been idle for longer than ``idle_seconds``."""
+        deadline = time.monotonic() - self.idle_seconds
+        evicted = []
+        with self._lock:
+            while self.lru:
+                key, (_, _, last_used) = next(iter(self.lru.items()))
+                if last_used > deadline:
+                    break
+                evicted.append(self._remove(key))
+            self.evictions += len(evicted)
+        self._close(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.lru),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.idle_seconds / 2)
+            self.sweep()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        with self._lock:
+            handles = [repo for _, repo, _ in self.lru.values()]
+            self.lru.clear()
+            self.idle.clear()
+        self._close(handles)
+
+
+# Create a singleton instance
+repo_cache = RepoCache()
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RWLock:
+    """Asyncio readers/writer lock. Waiting writers block new readers, so writes aren't starved."""
+
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.writers_waiting = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self.writer and self.writers_waiting == 0)
+            self.readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self.writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self.writer and self.readers == 0)
+            finally:
+                self.writers_waiting -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.writer = False
+                self._condition.notify_all()
+
+
+Job = Tuple[Callable[..., Any], Tuple[Any, ...], asyncio.Future]
+
+
+class RepoLockManager:
+    """Runs blocking git work on a bounded thread pool with per-repository consistency.
+
+    Reads of a repository run concurrently under its shared lock. Writes go
+    through the repository's FIFO queue, drained by one task per repository
+    that holds the exclusive lock for each job, so writes to one repository
+    apply one at a time in arrival order while different repositories
+    proceed in parallel up to ``max_workers`` threads.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("GIT_WORKER_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
+        self.queue_size = queue_size or int(os.getenv("GIT_WRITE_QUEUE_SIZE", "100"))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="git")
+        self.locks: Dict[str, RWLock] = {}
+        self.queues: Dict[str, "asyncio.Queue[Job]"] = {}
+        self.workers: Dict[str, asyncio.Task] = {}
+
+    def lock(self, repo_name: str) -> RWLock:
+        if repo_name not in self.locks:
+            self.locks[repo_name] = RWLock()
+        return self.locks[repo_name]
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Keep holding the lock until the thread is really done
+            await asyncio.wait([future])
+            raise
+
+    async def read(self, repo_name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool, concurrently with other reads of the repository."""
+        async with self.lock(repo_name).read():
+            return await self._run(fn, *args)
+
+    async def write(self, repo_name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Queue ``fn(*args)`` behind the repository's pending writes and wait for its result."""
+        queue = self.queues.get(repo_name)
+        if queue is None:
+            queue = self.queues[repo_name] = asyncio.Queue(maxsize=self.queue_size)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            queue.put_nowait((fn, args, future))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail=f"Too many pending writes to '{repo_name}', try again later")
+        if repo_name not in self.workers:
+            self.workers[repo_name] = asyncio.create_task(self._drain(repo_name, queue))
+        # The job runs even if this request goes away
+        return await asyncio.shield(future)
+
+    async def _drain(self, repo_name: str, queue: "asyncio.Queue[Job]"):
+        try:
+            while not queue.empty():
+                fn, args, future = queue.get_nowait()
+                try:
+                    async with self.lock(repo_name).write():
+                        result = await self._run(fn, *args)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # Nothing awaits between the empty check and here, so no job can be left behind
+            del self.workers[repo_name]
+            del self.queues[repo_name]
+
+    def forget(self, repo_name: str):
+        """Drop the lock of a deleted repository once nothing uses it."""
+        lock = self.locks.get(repo_name)
+        if lock is not None and not lock.readers and not lock.writer and not lock.writers_waiting and repo_name not in self.queues:
+            del self.locks[repo_name]
+
+    async def shutdown(self):
+        if self.workers:
+            await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+
+# Create a singleton instance
+repo_locks = RepoLockManager()